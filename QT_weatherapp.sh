@@ -1,7 +1,5 @@
 #!/bin/bash
 # WeatherBar - macOS Menu Bar Weather App
-# Kill any existing instance
-killall -9 Python 2>/dev/null || true
-
-# Run the new weather app
+# A running instance hands its caches and schedule over to the new one and
+# exits on its own, so there is no need to kill anything first.
 /Users/deniz/anaconda3/envs/ds310/bin/python3 /Users/deniz/Documents/GitHub/QuickTicker/weather_app/main.py
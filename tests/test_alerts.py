@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from weather_app.models.alert import AlertRule, AlertRuleError
+from weather_app.models.weather_data import (
+    CompleteWeatherData, CurrentWeather, DailyForecast, HourlyForecast,
+)
+from weather_app.services.alert_service import AlertService
+
+NOW = datetime(2024, 6, 1, 9, 30)
+HOUR = NOW.replace(minute=0)
+
+
+def make_weather(temperatures=(), precipitation=(), name="Testville"):
+    """Hourly forecast starting at HOUR; missing values default to 20° and 0%."""
+    count = max(len(temperatures), len(precipitation), 24)
+    hourly = [
+        HourlyForecast(
+            time=HOUR + timedelta(hours=i),
+            temperature=temperatures[i] if i < len(temperatures) else 20.0,
+            weather_code=0,
+            precipitation_probability=precipitation[i] if i < len(precipitation) else 0,
+        )
+        for i in range(count)
+    ]
+    daily = [
+        DailyForecast(
+            date=HOUR.replace(hour=0) + timedelta(days=d), temp_high=25.0, temp_low=10.0,
+            weather_code=0, precipitation_probability=0, uv_index_max=3.0,
+            sunrise=HOUR.replace(hour=5), sunset=HOUR.replace(hour=21),
+        )
+        for d in range(3)
+    ]
+    current = CurrentWeather(
+        temperature=20.0, feels_like=20.0, humidity=50, wind_speed=0.0, wind_direction=0,
+        pressure=1013.0, visibility=10000.0, uv_index=3.0, weather_code=0, is_day=True,
+        timestamp=NOW,
+    )
+    return CompleteWeatherData(current=current, hourly=hourly, daily=daily,
+                               location_name=name, fetched_at=NOW)
+
+
+class TestAlertRuleParse:
+
+    def test_threshold_rule(self):
+        rule = AlertRule.parse("Precip probability > 60% within 3h")
+        assert (rule.series, rule.column) == ("hourly", "precipitation_probability")
+        assert (rule.kind, rule.op, rule.value, rule.window_hours) == ("threshold", ">", 60.0, 3.0)
+        assert rule.text == "Precip probability > 60% within 3h"
+
+    def test_change_rule(self):
+        rule = AlertRule.parse("temp falls by 15° in 6 hours")
+        assert (rule.column, rule.kind, rule.op, rule.value, rule.window_hours) == \
+            ("temperature_2m", "change", "drops", 15.0, 6.0)
+
+    def test_daily_alias_and_day_window(self):
+        rule = AlertRule.parse("uv >= 8 within 2 days")
+        assert (rule.series, rule.column, rule.window_hours) == ("daily", "uv_index_max", 48.0)
+
+    def test_raw_column_name(self):
+        rule = AlertRule.parse("temperature_2m < -5 next 12h")
+        assert (rule.column, rule.op, rule.value) == ("temperature_2m", "<", -5.0)
+
+    def test_whitespace_and_case_are_ignored(self):
+        assert AlertRule.parse("  TEMP   >  30  within  3h ").rule_id == \
+            AlertRule.parse("temp > 30 within 3h").rule_id
+
+    @pytest.mark.parametrize("text", [
+        "", "temp > 30", "temp is hot within 3h", "humidity > 80 within 3h", "temp > lots within 3h",
+    ])
+    def test_rejects_unsupported_rules(self, text):
+        with pytest.raises(AlertRuleError):
+            AlertRule.parse(text)
+
+    def test_threshold_predicate(self):
+        predicate = AlertRule.parse("precip >= 50 within 3h").predicate()
+        assert predicate(50) and not predicate(49) and not predicate(None)
+
+    def test_change_predicates(self):
+        drops = AlertRule.parse("temp drops 10 within 6h").predicate()
+        rises = AlertRule.parse("temp rises 10 within 6h").predicate()
+        assert drops(20, 10) and not drops(20, 11) and not drops(20, None)
+        assert rises(10, 20) and not rises(10, 19) and not rises(20, 10)
+
+
+class TestAlertService:
+
+    def test_set_rules_reports_invalid_rules(self):
+        service = AlertService()
+        errors = service.set_rules(["temp > 30 within 3h", "nonsense"])
+        assert len(errors) == 1 and "nonsense" in errors[0]
+        assert [r.text for r in service.rules] == ["temp > 30 within 3h"]
+
+    def test_threshold_match_inside_window(self):
+        service = AlertService(["precip > 60 within 3h"])
+        alerts = service.evaluate("t", make_weather(precipitation=[0, 0, 70]), now=NOW)
+        assert [a.event_time for a in alerts] == [HOUR + timedelta(hours=2)]
+        assert alerts[0].value == 70 and alerts[0].location_name == "Testville"
+
+    def test_threshold_match_outside_window_is_ignored(self):
+        service = AlertService(["precip > 60 within 3h"])
+        assert service.evaluate("t", make_weather(precipitation=[0] * 6 + [70]), now=NOW) == []
+
+    def test_alert_is_reported_once_per_episode(self):
+        service = AlertService(["temp > 30 within 3h"])
+        weather = make_weather(temperatures=[20, 35])
+        assert len(service.evaluate("t", weather, now=NOW)) == 1
+        assert service.evaluate("t", make_weather(temperatures=[20, 36]), now=NOW) == []
+        # The episode ends, then a new one starts
+        assert service.evaluate("t", make_weather(), now=NOW) == []
+        assert len(service.evaluate("t", make_weather(temperatures=[20, 20, 31]), now=NOW)) == 1
+
+    def test_change_rule_is_indexed_by_window_start(self):
+        service = AlertService(["temp drops 10 within 3h"])
+        alerts = service.evaluate("t", make_weather(temperatures=[20, 20, 15, 9]), now=NOW)
+        assert [a.event_time for a in alerts] == [HOUR]
+
+    def test_locations_are_independent(self):
+        service = AlertService(["temp > 30 within 3h"])
+        hot = make_weather(temperatures=[35])
+        assert len(service.evaluate("a", hot, now=NOW)) == 1
+        assert len(service.evaluate("b", hot, now=NOW)) == 1
+
+    def test_next_rain_follows_updates(self):
+        service = AlertService()
+        service.evaluate("t", make_weather(precipitation=[0, 0, 0, 80]), now=NOW)
+        assert service.next_rain("t", after=HOUR) == HOUR + timedelta(hours=3)
+        service.evaluate("t", make_weather(precipitation=[0, 55]), now=NOW)
+        assert service.next_rain("t", after=HOUR) == HOUR + timedelta(hours=1)
+        service.evaluate("t", make_weather(), now=NOW)
+        assert service.next_rain("t", after=HOUR) is None
+
+    def test_new_rule_sees_existing_forecast(self):
+        service = AlertService()
+        weather = make_weather(temperatures=[35])
+        service.evaluate("t", weather, now=NOW)
+        service.set_rules(["temp > 30 within 3h"])
+        assert len(service.evaluate("t", weather, now=NOW)) == 1
+
+    def test_state_round_trip_suppresses_repeats(self):
+        service = AlertService(["temp > 30 within 3h"])
+        weather = make_weather(temperatures=[35])
+        service.evaluate("t", weather, now=NOW)
+
+        restored = AlertService(["temp > 30 within 3h"])
+        restored.import_state(service.export_state())
+        assert restored.evaluate("t", weather, now=NOW) == []
@@ -0,0 +1,39 @@
+import csv
+
+import pytest
+
+from weather_app.services.export_service import ForecastExporter
+
+np = pytest.importorskip("numpy")
+
+# One daily row as JSON decodes it and as a FlatBuffers response carries it
+JSON_COLUMNS = {"time": ["2026-10-19"], "weather_code": [3], "temperature_2m_max": [15.1]}
+ARRAY_COLUMNS = {
+    "time": np.array(["2026-10-19T00:00"], dtype="datetime64[s]"),
+    "weather_code": np.array([3.0], dtype=np.float32),
+    "temperature_2m_max": np.array([15.1], dtype=np.float32),
+}
+
+
+def export(tmp_path, fmt, columns):
+    with ForecastExporter(tmp_path, fmt, series=["daily"]) as exporter:
+        exporter.write_columns("daily", 1, columns, "New York")
+    return exporter.paths[0]
+
+
+@pytest.mark.parametrize("columns", [JSON_COLUMNS, ARRAY_COLUMNS], ids=["json", "arrays"])
+def test_csv_writes_api_text(tmp_path, columns):
+    with open(export(tmp_path, "csv", columns)) as f:
+        header, row = list(csv.reader(f))
+    values = dict(zip(header, row))
+    assert values["time"] == "2026-10-19"
+    assert values["weather_code"] == "3"
+    assert values["temperature_2m_max"] == "15.1"
+
+
+def test_parquet_is_the_same_for_both_wire_formats(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    tables = [pq.read_table(export(tmp_path / name, "parquet", columns))
+              for name, columns in (("json", JSON_COLUMNS), ("arrays", ARRAY_COLUMNS))]
+    assert tables[0].equals(tables[1])
+    assert str(tables[0].schema.field("temperature_2m_max").type) == "float"
@@ -0,0 +1,97 @@
+import socket
+import struct
+
+import pytest
+
+from weather_app.utils.framing import (
+    HEADER, MAX_FRAME_BYTES, FrameError, encode_frame, recv_frame, send_frame,
+)
+
+
+@pytest.fixture
+def pair():
+    a, b = socket.socketpair()
+    yield a, b
+    a.close()
+    b.close()
+
+
+def test_encode_frame_layout():
+    frame = encode_frame({"a": [1, 2]})
+    assert frame == struct.pack(">I", 11) + b'{"a":[1,2]}'
+
+
+def test_round_trip(pair):
+    a, b = pair
+    messages = [{"cmd": "weather", "force": True}, [1, "two", None], "héllo", 0]
+    for message in messages:
+        send_frame(a, message)
+    assert [recv_frame(b) for _ in messages] == messages
+
+
+def test_clean_close_between_frames_returns_none(pair):
+    a, b = pair
+    send_frame(a, {"ok": True})
+    a.close()
+    assert recv_frame(b) == {"ok": True}
+    assert recv_frame(b) is None
+
+
+def test_frame_split_across_sends(pair):
+    a, b = pair
+    frame = encode_frame({"value": "x" * 1000})
+    a.sendall(frame[:2])
+    a.sendall(frame[2:7])
+    a.sendall(frame[7:])
+    assert recv_frame(b) == {"value": "x" * 1000}
+
+
+def test_encode_refuses_oversized_payload():
+    with pytest.raises(FrameError):
+        encode_frame("x" * 100, max_bytes=10)
+    assert len(encode_frame("x" * 8, max_bytes=10)) == HEADER.size + 10
+
+
+def test_recv_refuses_oversized_header_without_reading_payload(pair):
+    a, b = pair
+    a.sendall(HEADER.pack(MAX_FRAME_BYTES + 1))
+    with pytest.raises(FrameError, match="exceeds"):
+        recv_frame(b)
+
+
+def test_recv_honours_caller_limit(pair):
+    a, b = pair
+    send_frame(a, "x" * 100)
+    with pytest.raises(FrameError):
+        recv_frame(b, max_bytes=50)
+
+
+def test_truncated_header(pair):
+    a, b = pair
+    a.sendall(b"\x00\x00")
+    a.close()
+    with pytest.raises(FrameError, match="mid-frame"):
+        recv_frame(b)
+
+
+def test_truncated_payload(pair):
+    a, b = pair
+    a.sendall(HEADER.pack(10) + b'{"a":')
+    a.close()
+    with pytest.raises(FrameError, match="mid-frame"):
+        recv_frame(b)
+
+
+@pytest.mark.parametrize("payload", [b"{not json", b"\xff\xfe"])
+def test_malformed_payload(pair, payload):
+    a, b = pair
+    a.sendall(HEADER.pack(len(payload)) + payload)
+    with pytest.raises(FrameError, match="Malformed"):
+        recv_frame(b)
+
+
+def test_empty_payload_is_malformed(pair):
+    a, b = pair
+    a.sendall(HEADER.pack(0))
+    with pytest.raises(FrameError):
+        recv_frame(b)
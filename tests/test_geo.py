@@ -0,0 +1,101 @@
+import pytest
+
+from weather_app.utils.geo import CellGrid, SpatialIndex, geohash, haversine_km
+
+
+def test_haversine_known_distance():
+    # London to Paris
+    assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1.0)
+    assert haversine_km(10.0, 20.0, 10.0, 20.0) == 0.0
+
+
+@pytest.mark.parametrize("latitude,longitude,expected", [
+    (57.64911, 10.40744, "u4pruydqqvj"),
+    (42.6, -5.6, "ezs42"),
+    (-25.382708, -49.265506, "6gkzwgjzn820"),
+])
+def test_geohash_known_values(latitude, longitude, expected):
+    assert geohash(latitude, longitude, len(expected)) == expected
+
+
+def test_geohash_prefixes_nest():
+    assert geohash(40.7128, -74.0060, 9).startswith(geohash(40.7128, -74.0060, 5))
+
+
+def test_degree_grid_cells():
+    grid = CellGrid(degrees=0.05)
+    assert grid.cell(40.71, -74.01) == grid.cell(40.72, -74.00)
+    assert grid.cell(40.71, -74.01) != grid.cell(40.80, -74.01)
+    assert grid.cell_km == pytest.approx(5.566, abs=0.01)
+
+
+def test_zero_degrees_disables_snapping():
+    grid = CellGrid(degrees=0)
+    assert grid.cell(40.71, -74.01) == (40.71, -74.01)
+    assert grid.neighbourhood(40.71, -74.01) == [(40.71, -74.01)]
+
+
+def test_geohash_grid_cells():
+    grid = CellGrid(geohash_precision=5)
+    assert grid.cell(57.64911, 10.40744) == "u4pru"
+    assert grid.cell_km == pytest.approx(180 / 2 ** 12 * 111.32, rel=1e-6)
+
+
+@pytest.mark.parametrize("grid", [CellGrid(degrees=0.05), CellGrid(geohash_precision=5)])
+def test_neighbourhood_is_cell_and_its_eight_neighbours(grid):
+    cells = grid.neighbourhood(40.71, -74.01)
+    assert cells[0] == grid.cell(40.71, -74.01)
+    assert len(cells) == len(set(cells)) == 9
+
+
+def test_neighbourhood_wraps_the_antimeridian():
+    grid = CellGrid(degrees=1.0)
+    cells = grid.neighbourhood(0.0, 179.9)
+    assert grid.cell(0.0, -179.9) in cells
+
+
+class TestSpatialIndex:
+
+    def test_default_radius_is_half_a_cell(self):
+        grid = CellGrid(degrees=0.05)
+        assert SpatialIndex(grid).radius_km == pytest.approx(grid.cell_km / 2)
+
+    def test_nearest_within_radius(self):
+        index = SpatialIndex(CellGrid(degrees=0.05), radius_km=3.0)
+        index.add("a", 40.7128, -74.0060)
+        index.add("b", 40.7300, -74.0060)
+        assert index.nearest(40.7130, -74.0060) == "a"
+        assert index.nearest(40.7290, -74.0060) == "b"
+        assert index.nearest(41.0, -74.0) is None
+
+    def test_nearest_across_a_cell_boundary(self):
+        grid = CellGrid(degrees=0.05)
+        index = SpatialIndex(grid, radius_km=2.0)
+        # 0.025 is the boundary between cells 0 and 1 on a 0.05° grid
+        index.add("edge", 0.0245, 10.0)
+        assert grid.cell(0.0255, 10.0) != grid.cell(0.0245, 10.0)
+        assert index.nearest(0.0255, 10.0) == "edge"
+
+    def test_add_replaces_previous_point(self):
+        index = SpatialIndex(CellGrid(degrees=0.05), radius_km=2.0)
+        index.add("k", 40.0, -74.0)
+        index.add("k", 50.0, 8.0)
+        assert len(index) == 1
+        assert index.point("k") == (50.0, 8.0)
+        assert index.nearest(40.0, -74.0) is None
+        assert index.nearest(50.0, 8.0) == "k"
+
+    def test_remove(self):
+        index = SpatialIndex(CellGrid(degrees=0.05))
+        index.add("k", 40.0, -74.0)
+        assert "k" in index
+        index.remove("k")
+        index.remove("missing")
+        assert "k" not in index and len(index) == 0
+        assert index.point("k") is None
+        assert index.nearest(40.0, -74.0) is None
+
+    def test_nearest_across_the_antimeridian(self):
+        index = SpatialIndex(CellGrid(degrees=0.05), radius_km=5.0)
+        index.add("fiji", -16.5, 179.99)
+        assert index.nearest(-16.5, -179.99) == "fiji"
@@ -0,0 +1,61 @@
+import time
+
+from weather_app.api.geolocation_client import GeolocationClient, GeolocationProvider
+from weather_app.models.location import Location
+
+LOSER_DELAY = 0.1
+
+
+class FakeProvider(GeolocationProvider):
+    """Answers with a set location after a set delay."""
+
+    def __init__(self, name):
+        super().__init__(base_url="http://unused")
+        self.NAME = name
+        self.answer = None
+        self.delay = 0.0
+
+    def locate(self, timeout, cancel=None):
+        time.sleep(self.delay)
+        return self.answer
+
+
+def place(name, latitude, longitude=-74.0):
+    return Location(name=name, latitude=latitude, longitude=longitude, country="US", timezone="auto")
+
+
+def let_losers_finish():
+    """Late answers are kept as their provider's last answer."""
+    time.sleep(LOSER_DELAY + 0.2)
+
+
+def race(client, winner, loser):
+    winner.delay, loser.delay = 0.0, LOSER_DELAY
+    return client.detect_location()
+
+
+def test_disagreeing_providers_keep_the_first_location():
+    a, b = FakeProvider("a"), FakeProvider("b")
+    client = GeolocationClient(providers=[a, b])
+    a.answer = place("Manhattan", 40.71)
+    b.answer = place("Jersey City", 40.72, -74.08)  # Same address, placed 7 km away
+
+    first = race(client, a, b)
+    let_losers_finish()
+    assert first.name == "Manhattan"
+    assert race(client, b, a) is first
+
+
+def test_a_moved_answer_is_a_real_move():
+    a, b = FakeProvider("a"), FakeProvider("b")
+    client = GeolocationClient(providers=[a, b])
+    a.answer = b.answer = place("Manhattan", 40.71)
+    assert race(client, a, b).name == "Manhattan"
+    let_losers_finish()
+
+    a.answer = b.answer = place("Yonkers", 40.93, -73.90)  # 26 km north
+    assert race(client, a, b).name == "Yonkers"
+    let_losers_finish()
+
+    a.answer = b.answer = place("Bronx", 40.84, -73.87)  # 10 km back south
+    assert race(client, b, a).name == "Bronx"
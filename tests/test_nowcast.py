@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+from weather_app.models.nowcast import NowcastBuffer
+
+START = datetime(2024, 6, 1, 12, 0)
+
+
+def iso_steps(start, count):
+    return [(start + timedelta(minutes=15 * i)).isoformat(timespec="minutes") for i in range(count)]
+
+
+def test_window_returns_merged_steps():
+    buffer = NowcastBuffer()
+    assert buffer.merge(iso_steps(START, 4), [0.0, 0.5, 1.0, 0.2], [20.0, 19.5, 19.0, 18.5]) == 4
+    rows = buffer.window(START, steps=4)
+    assert rows == [
+        (START, 0.0, 20.0),
+        (START + timedelta(minutes=15), 0.5, 19.5),
+        (START + timedelta(minutes=30), 1.0, 19.0),
+        (START + timedelta(minutes=45), 0.2, 18.5),
+    ]
+
+
+def test_window_starts_at_the_step_containing_start():
+    buffer = NowcastBuffer()
+    buffer.merge(iso_steps(START, 4), [0.1, 0.2, 0.3, 0.4], [1, 2, 3, 4])
+    rows = buffer.window(START + timedelta(minutes=20), steps=2)
+    assert [(t, p) for t, p, _ in rows] == [(START + timedelta(minutes=15), 0.2),
+                                           (START + timedelta(minutes=30), 0.3)]
+
+
+def test_unknown_steps_are_none():
+    buffer = NowcastBuffer()
+    buffer.merge(iso_steps(START, 2), [0.1, 0.2], [1, 2])
+    assert buffer.precipitation_window(START, steps=4) == [0.1, 0.2, None, None]
+    assert buffer.precipitation_window(START - timedelta(hours=1), steps=2) == [None, None]
+
+
+def test_missing_values_become_zero():
+    buffer = NowcastBuffer()
+    buffer.merge(iso_steps(START, 3), [None, 0.4], [None, 10.0, 11.0])
+    assert buffer.window(START, steps=3) == [
+        (START, 0.0, 0.0),
+        (START + timedelta(minutes=15), 0.4, 10.0),
+        (START + timedelta(minutes=30), 0.0, 11.0),
+    ]
+
+
+def test_newer_refresh_overwrites_overlapping_steps():
+    buffer = NowcastBuffer()
+    buffer.merge(iso_steps(START, 4), [0.1] * 4, [10.0] * 4)
+    buffer.merge(iso_steps(START + timedelta(minutes=30), 4), [0.9] * 4, [12.0] * 4)
+    assert buffer.precipitation_window(START, steps=6) == [0.1, 0.1, 0.9, 0.9, 0.9, 0.9]
+
+
+def test_ring_reuses_cells_for_later_steps():
+    buffer = NowcastBuffer(capacity=4)
+    buffer.merge(iso_steps(START, 4), [0.1] * 4, [10.0] * 4)
+    later = START + timedelta(hours=1)
+    buffer.merge(iso_steps(later, 2), [0.7, 0.8], [15.0, 16.0])
+    # The first two cells now hold the later steps; the old ones are gone
+    assert buffer.precipitation_window(START, steps=4) == [None, None, 0.1, 0.1]
+    assert buffer.precipitation_window(later, steps=2) == [0.7, 0.8]
+
+
+def test_stale_steps_do_not_overwrite_later_ones():
+    buffer = NowcastBuffer(capacity=4)
+    later = START + timedelta(hours=1)
+    buffer.merge(iso_steps(later, 4), [0.5] * 4, [15.0] * 4)
+    assert buffer.merge(iso_steps(START, 4), [0.1] * 4, [10.0] * 4) == 0
+    assert buffer.precipitation_window(later, steps=4) == [0.5] * 4
+
+
+def test_window_is_capped_at_capacity():
+    buffer = NowcastBuffer(capacity=4)
+    buffer.merge(iso_steps(START, 4), [0.1] * 4, [10.0] * 4)
+    assert len(buffer.window(START, steps=10)) == 4
+
+
+def test_local_time_uses_the_response_offset():
+    buffer = NowcastBuffer()
+    machine = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert buffer.local_time(machine) == machine  # No offset known yet
+    buffer.merge(iso_steps(START, 1), [0.1], [10.0], utc_offset_seconds=-4 * 3600)
+    assert buffer.utc_offset_seconds == -4 * 3600
+    assert buffer.local_time(machine) == datetime(2024, 6, 1, 8, 0)
+
+
+def test_window_at_local_now_reads_the_location_steps():
+    buffer = NowcastBuffer()
+    # Steps 9 hours ahead of UTC, as a Tokyo forecast would carry them
+    local_now = (datetime.now(timezone.utc) + timedelta(hours=9)).replace(tzinfo=None)
+    first = local_now.replace(minute=local_now.minute // 15 * 15, second=0, microsecond=0)
+    buffer.merge(iso_steps(first, 4), [0.5] * 4, [20.0] * 4, utc_offset_seconds=9 * 3600)
+    assert buffer.precipitation_window(buffer.local_time(), steps=2) == [0.5, 0.5]
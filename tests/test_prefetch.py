@@ -0,0 +1,127 @@
+from weather_app.models.location import Location
+from weather_app.models.usage import LocationUsage
+from weather_app.services.prefetch_service import Prefetcher, UsageTracker
+
+T0 = 1_700_000_000.0
+TTL = 5 * 60
+
+
+class FakeService:
+    """Just what Prefetcher reads: usage statistics and cache ages."""
+
+    CACHE_DURATION_MINUTES = TTL // 60
+
+    def __init__(self):
+        self.usage = UsageTracker()
+        self.stored_at = {}  # Location name -> Unix time
+        self.now = T0
+        self.batches = []
+
+    def cache_age(self, location, use_fahrenheit):
+        stored = self.stored_at.get(location.name)
+        return None if stored is None else self.now - stored
+
+    def fetches_in_flight(self):
+        return 0
+
+    def get_weather_batch(self, locations, use_fahrenheit, force_refresh=False, source=None):
+        self.batches.append([location.name for location in locations])
+        for location in locations:
+            self.stored_at[location.name] = self.now
+
+
+PLACES = {"Oslo": (59.91, 10.75), "Bergen": (60.39, 5.32)}
+
+
+def place(name="Oslo"):
+    latitude, longitude = PLACES[name]
+    return Location(name=name, latitude=latitude, longitude=longitude, country="NO", timezone="auto")
+
+
+def request(service, times, scheduled=False, name="Oslo"):
+    """Record requests at T0 + each offset; each one stores a fresh entry."""
+    for offset in times:
+        service.now = T0 + offset
+        service.usage.record(place(name), True, "daemon", when=service.now, scheduled=scheduled)
+        service.stored_at[name] = service.now
+
+
+def test_next_request_uses_median_gap():
+    usage = LocationUsage(location=place())
+    for when in (0, 600, 1200):
+        usage.record(T0 + when, "daemon", 3600)
+    assert usage.next_request() == T0 + 1800
+    usage.record(T0 + 1210, "daemon", 3600)
+    assert usage.next_request() == T0 + 1810
+
+
+def test_next_request_needs_two_gaps():
+    usage = LocationUsage(location=place())
+    usage.record(T0, "daemon", 3600)
+    usage.record(T0 + 600, "daemon", 3600)
+    assert usage.next_request() is None
+
+
+def test_recent_requests_survive_round_trip():
+    usage = LocationUsage(location=place())
+    for when in range(10):
+        usage.record(T0 + when, "menu", 3600, scheduled=True)
+    restored = LocationUsage.from_dict(usage.to_dict())
+    assert restored.recent == [T0 + w for w in range(4, 10)]
+    assert restored.scheduled
+
+
+def test_prefetches_once_just_before_a_predicted_miss():
+    service = FakeService()
+    request(service, (0, 600, 1200))  # Every 10 minutes; next one due at 1800
+    prefetcher = Prefetcher(service, interval_seconds=60)
+
+    service.now = T0 + 1200 + 60
+    assert prefetcher.run_once(service.now) == 0  # Request not due before the next cycle
+    service.now = T0 + 1800 - 60
+    assert prefetcher.run_once(service.now) == 1
+    service.now = T0 + 1800 - 30
+    assert prefetcher.run_once(service.now) == 0  # Not requested since the prefetch
+    assert service.batches == [["Oslo"]]
+
+
+def test_no_prefetch_while_requests_come_before_expiry():
+    service = FakeService()
+    request(service, (0, 60, 120, 180))
+    service.stored_at["Oslo"] = T0  # Served from the cache, stored at the first request
+    prefetcher = Prefetcher(service, interval_seconds=60)
+    service.now = T0 + 190
+    assert prefetcher.candidates(service.now)["expiring"] == []  # Next request (240) still hits
+    request(service, (240,))
+    service.stored_at["Oslo"] = T0
+    service.now = T0 + 250
+    assert [u.location.name for u in prefetcher.candidates(service.now)["expiring"]] == ["Oslo"]
+
+
+def test_scheduled_requesters_are_left_alone():
+    service = FakeService()
+    request(service, (0, 600, 1200), scheduled=True)
+    prefetcher = Prefetcher(service, interval_seconds=60)
+    service.now = T0 + 1800 - 60
+    assert prefetcher.run_once(service.now) == 0
+
+
+def test_location_the_menu_left_is_prefetched_again():
+    service = FakeService()
+    request(service, (0, 300, 600), scheduled=True, name="Oslo")  # The menu shows Oslo
+    request(service, (900,), name="Bergen")  # The user switches to Bergen...
+    request(service, (900, 1200, 1500), scheduled=True, name="Bergen")  # ...which the menu now polls
+    usages = {u.location.name: u for u in service.usage.top(10)}
+    assert usages["Bergen"].scheduled and not usages["Oslo"].scheduled
+
+    prefetcher = Prefetcher(service, interval_seconds=60)
+    service.now = T0 + 1510
+    assert prefetcher.run_once(service.now) == 1
+    assert service.batches == [["Oslo"]]
+
+    service.now = T0 + 1560  # Switching back finds a fresh entry
+    assert service.cache_age(place("Oslo"), True) < TTL
+    request(service, (1560,), name="Oslo")
+    request(service, (1560,), scheduled=True, name="Oslo")
+    usages = {u.location.name: u for u in service.usage.top(10)}
+    assert usages["Oslo"].scheduled and not usages["Bergen"].scheduled
@@ -0,0 +1,79 @@
+from weather_app.ui.terminal import ScreenDiff, cells
+
+
+class TestCells:
+
+    def test_ascii_is_one_cell_per_character(self):
+        assert cells("abc") == ["a", "b", "c"]
+
+    def test_wide_characters_take_two_cells(self):
+        assert cells("a東b") == ["a", "東", "", "b"]
+
+    def test_variation_selector_joins_previous_cell(self):
+        assert cells("☀️ 5°") == ["☀️", " ", "5", "°"]
+
+    def test_combining_mark_joins_previous_cell(self):
+        assert cells("e\u0301x") == ["e\u0301", "x"]
+
+    def test_zero_width_after_wide_character_joins_it(self):
+        assert cells("⛅️") == ["⛅️", ""]
+
+    def test_leading_zero_width_is_dropped(self):
+        assert cells("\ufe0fa") == ["a"]
+
+
+class TestScreenDiff:
+
+    def test_first_frame_writes_every_nonblank_row(self):
+        diff = ScreenDiff(20)
+        assert diff.update(["one", "", "three"]) == [(0, 0, "one", False), (2, 0, "three", False)]
+
+    def test_unchanged_frame_writes_nothing(self):
+        diff = ScreenDiff(20)
+        diff.update(["one", "two"])
+        assert diff.update(["one", "two"]) == []
+
+    def test_only_the_changed_run_is_written(self):
+        diff = ScreenDiff(20)
+        diff.update(["Temp 21° Sunny"])
+        assert diff.update(["Temp 22° Sunny"]) == [(0, 6, "2", False)]
+
+    def test_shorter_row_clears_to_end_of_line(self):
+        diff = ScreenDiff(20)
+        diff.update(["Rain at 14:00"])
+        assert diff.update(["Rain at 9"]) == [(0, 8, "9", True)]
+
+    def test_removed_row_is_cleared(self):
+        diff = ScreenDiff(20)
+        diff.update(["a", "b"])
+        assert diff.update(["a"]) == [(1, 0, "", True)]
+
+    def test_rows_are_clipped_to_width(self):
+        diff = ScreenDiff(5)
+        assert diff.update(["abcdefgh"]) == [(0, 0, "abcde", False)]
+
+    def test_clipping_never_splits_a_wide_character(self):
+        diff = ScreenDiff(4)
+        assert diff.update(["abc東"]) == [(0, 0, "abc ", False)]
+
+    def test_change_after_wide_character_starts_on_a_whole_cell(self):
+        diff = ScreenDiff(20)
+        diff.update(["東京 21°"])
+        assert diff.update(["東京 22°"]) == [(0, 6, "2", False)]
+
+    def test_changed_wide_character_is_rewritten_whole(self):
+        diff = ScreenDiff(20)
+        diff.update(["a東b"])
+        assert diff.update(["a京b"]) == [(0, 1, "京", False)]
+
+    def test_run_after_uncertain_width_cell_starts_before_it(self):
+        diff = ScreenDiff(20)
+        diff.update(["☀️ 21°"])
+        assert diff.update(["☀️ 22°"]) == [(0, 0, "☀️ 22°", False)]
+
+    def test_invalidate_redraws_everything(self):
+        diff = ScreenDiff(20)
+        diff.update(["one"])
+        diff.invalidate(width=2)
+        assert diff.width == 2
+        assert diff.update(["one"]) == [(0, 0, "on", False)]
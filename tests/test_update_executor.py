@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from weather_app.services.update_executor import UpdateExecutor
+
+TIMEOUT = 5
+
+
+class FakeUI:
+    """Collects dispatched callables so tests decide when the UI thread runs them."""
+
+    def __init__(self):
+        self.queued = []
+        self.lock = threading.Lock()
+
+    def dispatch(self, fn):
+        with self.lock:
+            self.queued.append(fn)
+
+    def run(self):
+        with self.lock:
+            queued, self.queued = self.queued, []
+        for fn in queued:
+            fn()
+
+
+@pytest.fixture
+def ui():
+    return FakeUI()
+
+
+@pytest.fixture
+def executor(ui):
+    executor = UpdateExecutor(ui.dispatch)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def blocking_job(started, release, value):
+    def job(token):
+        started.set()
+        assert release.wait(TIMEOUT)
+        token.check()
+        return value
+    return job
+
+
+def test_new_job_supersedes_running_one(executor, ui):
+    started, release = threading.Event(), threading.Event()
+    results = []
+    first = executor.submit(blocking_job(started, release, "old"), on_result=results.append)
+    assert started.wait(TIMEOUT)
+    second = executor.submit(lambda token: "new", on_result=results.append)
+    assert first.cancelled and not second.cancelled
+    release.set()
+    assert executor.wait_idle(TIMEOUT)
+    ui.run()
+    assert results == ["new"]
+
+
+def test_results_finished_before_supersede_are_delivered_in_order(executor, ui):
+    results = []
+    executor.submit(lambda token: "old", on_result=results.append)
+    assert executor.wait_idle(TIMEOUT)
+    executor.submit(lambda token: "new", on_result=results.append)
+    assert executor.wait_idle(TIMEOUT)
+    ui.run()
+    assert results == ["old", "new"]
+
+
+def test_full_queue_drops_the_oldest_job(executor, ui):
+    started, release = threading.Event(), threading.Event()
+    results = []
+    executor.submit(blocking_job(started, release, "running"), on_result=results.append, supersede=False)
+    assert started.wait(TIMEOUT)
+    tokens = [executor.submit(lambda token, n=n: n, on_result=results.append, supersede=False)
+              for n in range(3)]
+    assert [token.cancelled for token in tokens] == [True, False, False]
+    release.set()
+    assert executor.wait_idle(TIMEOUT)
+    ui.run()
+    assert results == ["running", 1, 2]
+
+
+def test_delivery_after_next_job_started_reaches_its_own_callback(executor, ui):
+    first_results, second_results = [], []
+    started, release = threading.Event(), threading.Event()
+    first = executor.submit(lambda token: "first", on_result=first_results.append, supersede=False)
+    executor.submit(blocking_job(started, release, "second"), on_result=second_results.append,
+                    supersede=False)
+    assert started.wait(TIMEOUT)
+    ui.run()  # The first job's result, while the second job is running
+    assert first_results == ["first"] and second_results == []
+    assert not first.cancelled
+    release.set()
+    assert executor.wait_idle(TIMEOUT)
+    ui.run()
+    assert first_results == ["first"] and second_results == ["second"]
+
+
+def test_errors_go_to_the_failing_jobs_handler(executor, ui):
+    errors, results = [], []
+    started, release = threading.Event(), threading.Event()
+
+    def failing(token):
+        raise ValueError("boom")
+
+    executor.submit(failing, on_result=results.append, on_error=errors.append, supersede=False)
+    executor.submit(blocking_job(started, release, "ok"), on_result=results.append,
+                    on_error=errors.append, supersede=False)
+    assert started.wait(TIMEOUT)
+    ui.run()
+    assert [str(e) for e in errors] == ["boom"] and results == []
+    release.set()
+    assert executor.wait_idle(TIMEOUT)
+    ui.run()
+    assert results == ["ok"] and len(errors) == 1
+
+
+def test_cancelled_job_is_not_reported_as_error(executor, ui):
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def job(token):
+        started.set()
+        assert release.wait(TIMEOUT)
+        token.check()
+        raise AssertionError("not cancelled")
+
+    executor.submit(job, on_error=errors.append)
+    assert started.wait(TIMEOUT)
+    executor.submit(lambda token: None)
+    release.set()
+    assert executor.wait_idle(TIMEOUT)
+    ui.run()
+    assert errors == []
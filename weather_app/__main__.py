@@ -0,0 +1,7 @@
+"""Allow ``python -m weather_app <command>``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
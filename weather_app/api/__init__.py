@@ -1,5 +1,27 @@
-from .weather_client import OpenMeteoClient
-from .geocoding_client import GeocodingClient
-from .geolocation_client import GeolocationClient
+"""Upstream API clients.
 
-__all__ = ['OpenMeteoClient', 'GeocodingClient', 'GeolocationClient']
+Clients are imported on first attribute access so that importing this
+package (e.g. for ``api.endpoints``) does not pull in ``requests``.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'OpenMeteoClient': '.weather_client',
+    'GeocodingClient': '.geocoding_client',
+    'GeolocationClient': '.geolocation_client',
+    'OpenMeteoArchiveClient': '.archive_client',
+    'AirQualityClient': '.air_quality_client',
+}
+
+__all__ = ['OpenMeteoClient', 'GeocodingClient', 'GeolocationClient', 'OpenMeteoArchiveClient',
+           'AirQualityClient']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,79 @@
+import requests
+import logging
+from typing import Optional
+
+from .endpoints import resolve_base_url
+from .transport import PARSE_SECONDS, fetch, decode_json
+from ..models.air_quality import AirQuality
+
+logger = logging.getLogger(__name__)
+
+
+class AirQualityClient:
+    """Client for the Open-Meteo air-quality API."""
+
+    BASE_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+    BASE_URL_ENV = "WEATHERBAR_AIR_QUALITY_URL"
+    TIMEOUT = 10
+
+    # Parameters for current air quality; pollen is only modelled for Europe
+    CURRENT_PARAMS = [
+        "us_aqi",
+        "european_aqi",
+        "pm2_5",
+        "pm10",
+        "alder_pollen",
+        "birch_pollen",
+        "grass_pollen",
+        "mugwort_pollen",
+        "olive_pollen",
+        "ragweed_pollen"
+    ]
+
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Endpoint URL; defaults to BASE_URL unless overridden
+                through the environment (see api.endpoints)
+        """
+        self.base_url = base_url or resolve_base_url(self.BASE_URL, self.BASE_URL_ENV)
+
+    def get_air_quality(self, latitude: float, longitude: float) -> AirQuality:
+        """
+        Fetch current air quality and pollen.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+
+        Returns:
+            AirQuality for the location
+
+        Raises:
+            AirQualityError: If the request fails
+        """
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": ",".join(self.CURRENT_PARAMS),
+            "timezone": "auto",
+        }
+        try:
+            logger.info("Fetching air quality for %s, %s", latitude, longitude)
+            response = fetch(self.base_url, "air_quality", params=params, timeout=self.TIMEOUT)
+            data = decode_json(response, "air_quality")
+        except requests.RequestException as e:
+            logger.error("Failed to fetch air quality: %s", e)
+            raise AirQualityError(f"Failed to fetch air quality: {e}") from e
+
+        if 'current' not in data:
+            raise AirQualityError(f"Air-quality response has no current data: {data.get('reason', '')}")
+        with PARSE_SECONDS.time(endpoint="air_quality", stage="model"):
+            return AirQuality.from_api_response(data['current'])
+
+
+class AirQualityError(Exception):
+    """Exception raised when air-quality data cannot be fetched."""
+    pass
@@ -0,0 +1,160 @@
+import logging
+import os
+import struct
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from .endpoints import resolve_base_url
+from .flatbuffers_decoder import FlatBuffersError, decode_forecast, is_json, load_decoder, split_messages
+from .transport import PARSE_SECONDS, decode_json, fetch
+
+logger = logging.getLogger(__name__)
+
+
+class OpenMeteoArchiveClient:
+    """Client for the Open-Meteo historical weather (archive) API."""
+
+    BASE_URL = "https://archive-api.open-meteo.com/v1/archive"
+    BASE_URL_ENV = "WEATHERBAR_ARCHIVE_URL"
+    TIMEOUT = 60  # Multi-year, multi-site requests take a while to compute
+    MAX_LOCATIONS = 50  # Locations per request (bounded by URL length)
+
+    # Default variables; every archive variable name is accepted
+    HOURLY_PARAMS = [
+        "temperature_2m",
+        "relative_humidity_2m",
+        "precipitation",
+        "weather_code",
+        "wind_speed_10m",
+        "pressure_msl"
+    ]
+
+    DAILY_PARAMS = [
+        "weather_code",
+        "temperature_2m_max",
+        "temperature_2m_min",
+        "precipitation_sum",
+        "sunrise",
+        "sunset"
+    ]
+
+    def __init__(self, base_url: Optional[str] = None, wire_format: Optional[str] = None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Endpoint URL; defaults to BASE_URL unless overridden
+                through the environment (see api.endpoints)
+            wire_format: "flatbuffers", "json" or "auto", as for
+                OpenMeteoClient (WEATHERBAR_WIRE_FORMAT)
+        """
+        from .weather_client import OpenMeteoClient
+
+        self.base_url = base_url or resolve_base_url(self.BASE_URL, self.BASE_URL_ENV)
+        wire_format = wire_format or os.environ.get(OpenMeteoClient.WIRE_FORMAT_ENV) or "auto"
+        self.flatbuffers = wire_format != "json" and load_decoder() is not None
+
+    def get_history(
+        self,
+        locations: Sequence[Tuple[float, float]],
+        start_date: date,
+        end_date: date,
+        hourly: Optional[Sequence[str]] = None,
+        daily: Optional[Sequence[str]] = None,
+        use_fahrenheit: bool = False
+    ) -> List[Dict[str, Dict[str, Sequence]]]:
+        """
+        Fetch observed weather for several locations over a date range.
+
+        Times are in UTC so that ranges split at any boundary line up. With
+        FlatBuffers the values are NumPy arrays viewing the response body;
+        with JSON they are lists.
+
+        Args:
+            locations: (latitude, longitude) per location, at most
+                MAX_LOCATIONS of them
+            start_date: First day, inclusive
+            end_date: Last day, inclusive
+            hourly: Hourly variables (default HOURLY_PARAMS; empty for none)
+            daily: Daily variables (default DAILY_PARAMS; empty for none)
+            use_fahrenheit: If True, use Fahrenheit, mph and inches
+
+        Returns:
+            {"hourly": {...}, "daily": {...}} column arrays per location,
+            in input order
+
+        Raises:
+            ArchiveAPIError: If the request fails; ``retry_after`` is set
+                when the request may be retried, and ``rate_limited`` when
+                the server answered 429
+        """
+        if not locations:
+            return []
+        if len(locations) > self.MAX_LOCATIONS:
+            raise ValueError(f"At most {self.MAX_LOCATIONS} locations per request")
+        hourly = list(self.HOURLY_PARAMS if hourly is None else hourly)
+        daily = list(self.DAILY_PARAMS if daily is None else daily)
+
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in locations),
+            "longitude": ",".join(str(lon) for _, lon in locations),
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "temperature_unit": "fahrenheit" if use_fahrenheit else "celsius",
+            "wind_speed_unit": "mph" if use_fahrenheit else "kmh",
+            "precipitation_unit": "inch" if use_fahrenheit else "mm",
+            "timezone": "GMT",
+        }
+        if hourly:
+            params["hourly"] = ",".join(hourly)
+        if daily:
+            params["daily"] = ",".join(daily)
+        if self.flatbuffers:
+            params["format"] = "flatbuffers"
+
+        try:
+            logger.debug("Fetching history for %d locations, %s to %s",
+                         len(locations), start_date, end_date)
+            response = fetch(self.base_url, "archive", params=params, timeout=self.TIMEOUT)
+            if self.flatbuffers and not is_json(response.content[:64]):
+                variables = {"hourly": hourly, "daily": daily}
+                with PARSE_SECONDS.time(endpoint="archive", stage="flatbuffers"):
+                    items = [decode_forecast(m, variables) for m in split_messages(response.content)]
+            else:
+                data = decode_json(response, "archive")
+                # A single location comes back as an object rather than a list
+                items = data if isinstance(data, list) else [data]
+        except requests.HTTPError as e:
+            raise ArchiveAPIError(f"Failed to fetch history: {e}",
+                                  retry_after=self._retry_after(e.response),
+                                  rate_limited=e.response is not None and e.response.status_code == 429) from e
+        except requests.RequestException as e:
+            raise ArchiveAPIError(f"Failed to fetch history: {e}", retry_after=0.0) from e
+        except (FlatBuffersError, struct.error, IndexError, ValueError) as e:
+            raise ArchiveAPIError(f"Failed to decode history: {e}") from e
+
+        if len(items) != len(locations):
+            raise ArchiveAPIError(f"Expected {len(locations)} locations, got {len(items)}")
+        return [{section: item[section] for section in ("hourly", "daily") if section in item}
+                for item in items]
+
+    @staticmethod
+    def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        """Back-off requested by a 429 or 5xx response, or None if not retryable."""
+        if response is None or not (response.status_code == 429 or response.status_code >= 500):
+            return None
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", 0)))
+        except ValueError:
+            return 0.0
+
+
+class ArchiveAPIError(Exception):
+    """Exception raised when an archive API call fails."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, rate_limited: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds to wait before retrying; None if not retryable
+        self.rate_limited = rate_limited  # The server answered 429, with or without Retry-After
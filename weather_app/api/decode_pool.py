@@ -0,0 +1,224 @@
+"""Process-pool decoding of large batch responses.
+
+A multi-location JSON response carries about 25 KB per location. Parsing
+it and cutting the displayed rows out of it runs under the GIL, so with
+several batches in flight the decode rather than the network bounds
+throughput. ``DecodePool`` hands the raw body to worker processes instead,
+through shared memory rather than the pool's pipe. A worker parses the
+JSON, packs every hourly, daily and nowcast series of every location into
+one shared-memory block (float32 values, ``datetime64[s]`` times) and cuts
+the few rows the menu shows (``displayed_rows``). Only a small manifest
+per location travels back through the pipe: those rows, the scalars, and
+offsets and dtypes into the block. The parent copies the block once and
+wraps each column with ``numpy.frombuffer``, so the full series look like
+those of a decoded FlatBuffers message (see ``flatbuffers_decoder``).
+
+FlatBuffers bodies are not pooled, because they decode without parsing
+already.
+
+Needs the optional ``numpy`` package; without it ``available`` is False
+and callers decode in-process.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .flatbuffers_decoder import INT64_VARIABLES, displayed_rows
+from ..utils.ensemble import load_numpy
+
+logger = logging.getLogger(__name__)
+
+COLUMNS_FORMAT = "columns"  # Value of "format" in pooled results
+ALIGNMENT = 8
+
+# Per location: (top-level scalars and "rows", {section: {name: (dtype, offset, count)}})
+_Manifest = Tuple[dict, Dict[str, Dict[str, Tuple[str, int, int]]]]
+
+
+def _column(np, name: str, values: list):
+    """A JSON series as an array; null becomes NaN (NaT for times)."""
+    if name == "time" or name in INT64_VARIABLES:
+        return np.array(values, dtype="datetime64[s]")
+    return np.array(values, dtype=np.float32)
+
+
+def _decode_batch(body_name: str, body_size: int, variables: Dict[str, Sequence[str]],
+                  now: datetime) -> Tuple[Optional[str], int, List[_Manifest]]:
+    """
+    Parse a JSON batch body and pack its series into shared memory (worker process).
+
+    Args:
+        body_name: Shared-memory block holding the body (owned by the parent)
+        body_size: Body length (blocks may be rounded up to a page)
+        variables: Requested variable names per section
+        now: Cut-off for the displayed hourly rows
+
+    Returns:
+        (block name or None if there are no series, block size, manifest per location)
+    """
+    np = load_numpy()
+    body = SharedMemory(name=body_name)
+    try:
+        with body.buf[:body_size] as view:
+            data = json.loads(view.tobytes())
+    finally:
+        body.close()
+    items = data if isinstance(data, list) else [data]
+
+    arrays = []
+    manifests: List[_Manifest] = []
+    size = 0
+    for item in items:
+        fields = {key: value for key, value in item.items() if not isinstance(value, (dict, list))}
+        fields["format"] = COLUMNS_FORMAT
+        series = {"current": item.get("current") or {}}
+        layout = {}
+        for section, names in variables.items():
+            values = item.get(section)
+            if section == "current" or not isinstance(values, dict) or "time" not in values:
+                continue
+            series[section], layout[section] = {}, {}
+            for name in ("time", *names):
+                if name not in values:
+                    continue
+                array = _column(np, name, values[name])
+                series[section][name] = array
+                layout[section][name] = (array.dtype.str, size, len(array))
+                arrays.append((size, array))
+                size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        fields["rows"] = displayed_rows(series, now)
+        manifests.append((fields, layout))
+
+    if not size:
+        return None, 0, manifests
+    block = SharedMemory(create=True, size=size)
+    try:
+        for offset, array in arrays:
+            target = np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=offset)
+            target[...] = array
+            del target  # Views must be gone before the block is closed
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    return block.name, size, manifests
+
+
+def _attach(name: Optional[str], size: int, manifests: List[_Manifest]) -> List[dict]:
+    """Copy a worker's block out of shared memory, free it and wrap the columns."""
+    np = load_numpy()
+    buffer = b""
+    if name is not None:
+        block = SharedMemory(name=name)
+        try:
+            with block.buf[:size] as view:
+                buffer = bytes(view)
+        finally:
+            block.close()
+            block.unlink()
+
+    items = []
+    for fields, layout in manifests:
+        item = dict(fields)
+        for section, columns in layout.items():
+            item[section] = {
+                column: np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=offset)
+                for column, (dtype, offset, count) in columns.items()
+            }
+        items.append(item)
+    return items
+
+
+class DecodePool:
+    """Decodes large JSON batch responses on a pool of worker processes."""
+
+    MIN_BYTES = 256 * 1024  # Smaller bodies decode faster in-process than the round trip takes
+
+    def __init__(self, processes: Optional[int] = None, min_bytes: int = MIN_BYTES):
+        """
+        Initialize the pool. Workers are started on first use.
+
+        Args:
+            processes: Worker processes (default: one per CPU)
+            min_bytes: Bodies smaller than this are left to the caller
+        """
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.min_bytes = min_bytes
+        self.available = load_numpy() is not None
+        if not self.available:
+            logger.warning("Pooled decoding needs numpy; decoding in-process")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def wants(self, body: bytes) -> bool:
+        """True if a body is worth sending to the pool."""
+        return self.available and len(body) >= self.min_bytes
+
+    def decode(self, body: bytes, variables: Dict[str, Sequence[str]],
+               now: Optional[datetime] = None) -> List[dict]:
+        """
+        Decode a JSON batch body into one columnar forecast dict per location.
+
+        Args:
+            body: Response body (a JSON object or a list of them)
+            variables: Requested variable names per section; other series are dropped
+            now: Cut-off for the displayed hourly rows (default: now)
+
+        Returns:
+            Forecast dicts with ``"format": "columns"``, the full series as
+            arrays and the displayed rows under ``"rows"``, in response order
+
+        Raises:
+            DecodePoolError: If a worker fails, including on malformed JSON
+                (decode in-process to get the caller's usual error)
+        """
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the parent runs fetch threads and pooled sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            executor = self._executor
+        shared = SharedMemory(create=True, size=max(len(body), 1))
+        try:
+            shared.buf[:len(body)] = body
+            name, size, manifests = executor.submit(_decode_batch, shared.name, len(body),
+                                                    dict(variables), now or datetime.now()).result()
+        except BrokenProcessPool as e:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None  # Restarted on the next call
+            raise DecodePoolError(f"Decode pool broke: {e}") from e
+        except Exception as e:
+            raise DecodePoolError(f"Pooled decode failed: {e}") from e
+        finally:
+            shared.close()
+            shared.unlink()
+        return _attach(name, size, manifests)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self) -> 'DecodePool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class DecodePoolError(Exception):
+    """Exception raised when a pooled decode fails."""
+    pass
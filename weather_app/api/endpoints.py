@@ -0,0 +1,38 @@
+"""Base URL resolution for upstream API endpoints.
+
+Every client keeps its production URL on ``BASE_URL``. The URL actually used
+can be overridden per client (``WEATHERBAR_FORECAST_URL`` etc.) or for all
+clients at once with ``WEATHERBAR_API_BASE``, which swaps the scheme and host
+but keeps each endpoint's path. This is how the app is pointed at the local
+fixture server in ``weather_app.testing.fixture_server``.
+"""
+
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+API_BASE_ENV = "WEATHERBAR_API_BASE"
+
+
+def resolve_base_url(default: str, env_var: str) -> str:
+    """
+    Resolve the base URL for an endpoint, honouring environment overrides.
+
+    Args:
+        default: Production URL of the endpoint
+        env_var: Name of the per-endpoint override variable
+
+    Returns:
+        URL to send requests to
+    """
+    explicit = os.environ.get(env_var)
+    if explicit:
+        return explicit
+
+    base = os.environ.get(API_BASE_ENV)
+    if not base:
+        return default
+
+    target = urlsplit(base)
+    original = urlsplit(default)
+    path = target.path.rstrip('/') + original.path
+    return urlunsplit((target.scheme, target.netloc, path, original.query, ''))
@@ -0,0 +1,184 @@
+"""Decoding of Open-Meteo FlatBuffers responses.
+
+With ``format=flatbuffers`` Open-Meteo answers with one size-prefixed
+FlatBuffer per location instead of JSON. Each section lists its variables
+in the order they were requested, as float32 vectors (int64 for sunrise and
+sunset) inside the received bytes. ``ValuesAsNumpy`` wraps those bytes
+with ``numpy.frombuffer``, so the decoded columns are views into the
+response body: nothing is copied or turned into Python objects except the
+few rows the menu actually shows (see ``displayed_rows``).
+
+Needs the optional ``openmeteo_sdk`` and ``numpy`` packages; without them
+the client keeps using JSON.
+"""
+
+import hashlib
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+from ..utils.ensemble import load_numpy
+
+INT64_VARIABLES = ("sunrise", "sunset")  # Sent as Unix times, not floats
+
+_decoder = None
+_loaded = False
+
+
+def load_decoder():
+    """
+    The SDK response class and numpy, or None if either is not installed.
+
+    Returns:
+        (WeatherApiResponse, numpy) or None
+    """
+    global _decoder, _loaded
+    if not _loaded:
+        try:
+            import numpy
+            from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+            _decoder = (WeatherApiResponse, numpy)
+        except ImportError:
+            _decoder = None
+        _loaded = True
+    return _decoder
+
+
+def is_json(body: bytes) -> bool:
+    """True if a body is JSON (a server that ignores ``format`` sends JSON)."""
+    return body.lstrip()[:1] in (b"{", b"[")
+
+
+def split_messages(body: bytes) -> list:
+    """
+    The per-location messages of a response, without copying the body.
+
+    Raises:
+        FlatBuffersError: If the body is truncated
+    """
+    WeatherApiResponse, _ = load_decoder()
+    messages, pos, total = [], 0, len(body)
+    while pos < total:
+        if pos + 4 > total:
+            raise FlatBuffersError("Truncated size prefix")
+        (length,) = struct.unpack_from("<I", body, pos)
+        if pos + 4 + length > total:
+            raise FlatBuffersError("Truncated message")
+        messages.append(WeatherApiResponse.GetRootAs(body, pos + 4))
+        pos += 4 + length
+    return messages
+
+
+def _section(message, name: str):
+    return {
+        "current": message.Current,
+        "minutely_15": message.Minutely15,
+        "hourly": message.Hourly,
+        "daily": message.Daily,
+    }[name]()
+
+
+def _local_time(unix_seconds: int, offset: int) -> datetime:
+    """Naive local time, as the JSON format reports with timezone=auto."""
+    return datetime(1970, 1, 1) + timedelta(seconds=unix_seconds + offset)
+
+
+def decode_forecast(message, variables: Dict[str, Sequence[str]]) -> dict:
+    """
+    Decode one message into the shape of a JSON forecast object.
+
+    ``current`` holds Python scalars; the other sections hold a
+    ``datetime64[s]`` time axis and one array per variable, viewing the
+    message bytes. The result carries ``"format": "flatbuffers"``.
+
+    Args:
+        message: WeatherApiResponse
+        variables: Requested variable names per section, in request order
+
+    Raises:
+        FlatBuffersError: If a section does not match the request
+    """
+    _, np = load_decoder()
+    offset = message.UtcOffsetSeconds()
+    data = {"format": "flatbuffers", "utc_offset_seconds": offset}
+    for section, names in variables.items():
+        block = _section(message, section)
+        if block is None or not names:
+            continue
+        if block.VariablesLength() != len(names):
+            raise FlatBuffersError(
+                f"{section}: expected {len(names)} variables, got {block.VariablesLength()}"
+            )
+        if section == "current":
+            values = {"time": _local_time(block.Time(), offset).isoformat(timespec="minutes")}
+            for i, name in enumerate(names):
+                values[name] = round(block.Variables(i).Value(), 4)
+        else:
+            start = block.Time() + offset
+            steps = np.arange(start, block.TimeEnd() + offset, block.Interval(), dtype=np.int64)
+            values = {"time": steps.astype("datetime64[s]")}
+            for i, name in enumerate(names):
+                variable = block.Variables(i)
+                if name in INT64_VARIABLES:
+                    values[name] = (variable.ValuesInt64AsNumpy() + offset).astype("datetime64[s]")
+                else:
+                    values[name] = variable.ValuesAsNumpy()
+        data[section] = values
+    return data
+
+
+def content_digest(message, variables: Dict[str, Sequence[str]]) -> bytes:
+    """
+    Digest of a message's time axes and values, skipping volatile fields
+    such as the generation time. Hashes the vectors in place.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for section, names in variables.items():
+        block = _section(message, section)
+        if block is None:
+            continue
+        h.update(struct.pack("<qqi", block.Time(), block.TimeEnd(), block.Interval()))
+        for i in range(block.VariablesLength()):
+            variable = block.Variables(i)
+            if section == "current":
+                h.update(struct.pack("<f", variable.Value()))
+            elif i < len(names) and names[i] in INT64_VARIABLES:
+                h.update(variable.ValuesInt64AsNumpy().data)
+            else:
+                h.update(variable.ValuesAsNumpy().data)
+    return h.digest()
+
+
+def _to_list(values, time_unit: str) -> List:
+    """Python values for a short array slice; NaN becomes None like JSON null."""
+    np = load_numpy()
+    if values.dtype.kind == "M":  # datetime64
+        return np.datetime_as_string(values, unit=time_unit).tolist()
+    return [None if v != v else v for v in values.astype(np.float64).round(4).tolist()]
+
+
+def displayed_rows(data: dict, now: datetime, hours: int = 24) -> dict:
+    """
+    JSON-style lists for just the rows the models are built from: the next
+    ``hours`` hourly steps, every day and every nowcast step. The full
+    arrays stay untouched in ``data``. Also used for pooled JSON decodes
+    (see ``decode_pool``), so only numpy is needed here.
+    """
+    np = load_numpy()
+    rows = {"current": data.get("current", {})}
+    hourly = data.get("hourly")
+    if hourly:
+        first = int(hourly["time"].searchsorted(np.datetime64(now.replace(microsecond=0))))
+        rows["hourly"] = {k: _to_list(v[first:first + hours], "m") for k, v in hourly.items()}
+    daily = data.get("daily")
+    if daily:
+        rows["daily"] = {k: _to_list(v, "D" if k == "time" else "m") for k, v in daily.items()}
+    minutely = data.get("minutely_15")
+    if minutely:
+        rows["minutely_15"] = {k: _to_list(v, "m") for k, v in minutely.items()}
+    return rows
+
+
+class FlatBuffersError(Exception):
+    """Exception raised when a FlatBuffers response cannot be decoded."""
+    pass
@@ -1,7 +1,11 @@
+import json
 import requests
 import logging
-from typing import List
+import threading
+from typing import List, Optional
 
+from .endpoints import resolve_base_url
+from .transport import PARSE_SECONDS, fetch, decode_json, open_stream
 from ..models.location import Location
 
 logger = logging.getLogger(__name__)
@@ -11,18 +15,40 @@ class GeocodingClient:
     """Client for Open-Meteo Geocoding API."""
 
     BASE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+    BASE_URL_ENV = "WEATHERBAR_GEOCODING_URL"
     TIMEOUT = 10
+    LOOKUP_READ_TIMEOUT = 3  # Longest wait between bytes for a cancellable search
 
-    def search(self, query: str, count: int = 5) -> List[Location]:
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Endpoint URL; defaults to BASE_URL unless overridden
+                through the environment (see api.endpoints)
+        """
+        self.base_url = base_url or resolve_base_url(self.BASE_URL, self.BASE_URL_ENV)
+
+    def search(self, query: str, count: int = 5,
+               cancel: Optional[threading.Event] = None) -> List[Location]:
         """
         Search for locations by name.
 
         Args:
             query: Location name to search for
             count: Maximum number of results to return
+            cancel: If given, the search may be superseded: it waits at
+                most LOOKUP_READ_TIMEOUT for each part of the response, and
+                once ``cancel`` is set the connection is dropped as soon as
+                the response (or its next chunk) arrives
 
         Returns:
             List of Location objects matching the query
+
+        Raises:
+            GeocodingError: If the request fails
+            SearchCancelled: If ``cancel`` was set before the results arrived,
+                including when the wait timed out after it was set
         """
         if not query or not query.strip():
             return []
@@ -35,10 +61,12 @@ class GeocodingClient:
         }
 
         try:
-            logger.info(f"Searching for location: {query}")
-            response = requests.get(self.BASE_URL, params=params, timeout=self.TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
+            logger.info("Searching for location: %s", query)
+            if cancel is None:
+                data = decode_json(fetch(self.base_url, "geocoding", params=params, timeout=self.TIMEOUT),
+                                   "geocoding")
+            else:
+                data = self._fetch_cancellable(params, cancel)
 
             results = data.get('results', [])
             locations = []
@@ -57,10 +85,45 @@ class GeocodingClient:
             return locations
 
         except requests.RequestException as e:
-            logger.error(f"Failed to search location: {e}")
+            logger.error("Failed to search location: %s", e)
             raise GeocodingError(f"Failed to search location: {e}") from e
 
+    def _fetch_cancellable(self, params: dict, cancel: threading.Event) -> dict:
+        """
+        Stream the response, checking ``cancel`` before the request and as
+        each chunk arrives.
+
+        The socket cannot be interrupted while it waits, so the read timeout
+        is short: a superseded search holds its thread for at most
+        LOOKUP_READ_TIMEOUT rather than TIMEOUT.
+        """
+        if cancel.is_set():
+            raise SearchCancelled()
+        timeout = (self.TIMEOUT, self.LOOKUP_READ_TIMEOUT)
+        try:
+            with open_stream(self.base_url, "geocoding", params=params, timeout=timeout) as response:
+                chunks = []
+                for chunk in response.iter_content(chunk_size=4096):
+                    if cancel.is_set():
+                        # Closing the response drops the connection mid-body
+                        raise SearchCancelled()
+                    chunks.append(chunk)
+        except requests.Timeout:
+            if cancel.is_set():
+                raise SearchCancelled()
+            raise
+        with PARSE_SECONDS.time(endpoint="geocoding", stage="json"):
+            try:
+                return json.loads(b"".join(chunks))
+            except ValueError as e:
+                raise GeocodingError(f"Invalid geocoding response: {e}") from e
+
 
 class GeocodingError(Exception):
     """Exception raised when geocoding API call fails."""
     pass
+
+
+class SearchCancelled(GeocodingError):
+    """Exception raised when a search is cancelled before it completes."""
+    pass
@@ -1,16 +1,219 @@
 import requests
 import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from .endpoints import resolve_base_url
+from .transport import fetch, decode_json
 from ..models.location import Location
+from ..utils.geo import haversine_km
+from ..utils.metrics import counter, histogram
 
 logger = logging.getLogger(__name__)
 
+PROVIDER_SECONDS = histogram(
+    "weatherbar_geolocation_provider_seconds",
+    "IP geolocation answer time per provider, by outcome (ok, failed)",
+    ["provider", "outcome"],
+)
+PROVIDER_WINS = counter(
+    "weatherbar_geolocation_wins_total",
+    "IP geolocation races won per provider",
+    ["provider"],
+)
 
-class GeolocationClient:
-    """Client for IP-based geolocation using ip-api.com."""
 
+class GeolocationProvider:
+    """One IP geolocation backend: where to ask and how to read the answer."""
+
+    NAME = ""
+    BASE_URL = ""
+    BASE_URL_ENV = ""
+
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Initialize the provider.
+
+        Args:
+            base_url: Endpoint URL; defaults to BASE_URL unless overridden
+                through the environment (see api.endpoints)
+        """
+        self.base_url = base_url or resolve_base_url(self.BASE_URL, self.BASE_URL_ENV)
+
+    def locate(self, timeout: float, cancel: Optional[threading.Event] = None) -> Location:
+        """
+        Ask the provider for the location of this machine's IP address.
+
+        Args:
+            timeout: Request timeout in seconds
+            cancel: If set before the request starts, it is not sent
+
+        Returns:
+            The detected Location
+
+        Raises:
+            GeolocationCancelled: If ``cancel`` was set first
+            GeolocationError: If the request fails or the answer is unusable
+        """
+        if cancel is not None and cancel.is_set():
+            raise GeolocationCancelled()
+        try:
+            data = decode_json(fetch(self.base_url, "geolocation", timeout=timeout), "geolocation")
+        except requests.RequestException as e:
+            raise GeolocationError(f"Request failed: {e}") from e
+        if not isinstance(data, dict):
+            raise GeolocationError("Unexpected response")
+        try:
+            location = self.parse(data)
+        except (KeyError, TypeError, ValueError) as e:
+            raise GeolocationError(f"Unexpected response: {e}") from e
+        if not (-90 <= location.latitude <= 90 and -180 <= location.longitude <= 180):
+            raise GeolocationError(f"Coordinates out of range: {location.latitude}, {location.longitude}")
+        return location
+
+    def parse(self, data: dict) -> Location:
+        """Build a Location from a decoded response."""
+        raise NotImplementedError
+
+
+class IpApiProvider(GeolocationProvider):
+    """ip-api.com (plain HTTP on the free tier)."""
+
+    NAME = "ip-api"
     BASE_URL = "http://ip-api.com/json/"
-    TIMEOUT = 10
+    BASE_URL_ENV = "WEATHERBAR_GEOLOCATION_URL"
+
+    def parse(self, data: dict) -> Location:
+        if data.get('status') != 'success':
+            raise GeolocationError(f"IP geolocation failed: {data.get('message', 'Unknown error')}")
+
+        # Map state abbreviations for US locations
+        admin1 = data.get('regionName', '')
+        if data.get('countryCode') == 'US':
+            admin1 = data.get('region', admin1)  # Use abbreviation for US states
+
+        return Location(
+            name=data.get('city', 'Unknown'),
+            latitude=float(data['lat']),
+            longitude=float(data['lon']),
+            country=data.get('country', ''),
+            timezone=data.get('timezone', 'UTC'),
+            country_code=data.get('countryCode'),
+            admin1=admin1
+        )
+
+
+class IpWhoIsProvider(GeolocationProvider):
+    """ipwho.is (HTTPS, no key)."""
+
+    NAME = "ipwho.is"
+    BASE_URL = "https://ipwho.is/"
+    BASE_URL_ENV = "WEATHERBAR_IPWHOIS_URL"
+
+    def parse(self, data: dict) -> Location:
+        if not data.get('success'):
+            raise GeolocationError(f"IP geolocation failed: {data.get('message', 'Unknown error')}")
+
+        admin1 = data.get('region', '')
+        if data.get('country_code') == 'US':
+            admin1 = data.get('region_code', admin1)
+
+        return Location(
+            name=data.get('city', 'Unknown'),
+            latitude=float(data['latitude']),
+            longitude=float(data['longitude']),
+            country=data.get('country', ''),
+            timezone=(data.get('timezone') or {}).get('id', 'UTC'),
+            country_code=data.get('country_code'),
+            admin1=admin1
+        )
+
+
+class FreeIpApiProvider(GeolocationProvider):
+    """freeipapi.com (HTTPS, no key; region names only)."""
+
+    NAME = "freeipapi"
+    BASE_URL = "https://freeipapi.com/api/json"
+    BASE_URL_ENV = "WEATHERBAR_FREEIPAPI_URL"
+
+    def parse(self, data: dict) -> Location:
+        timezones = data.get('timeZones') or ['UTC']
+        return Location(
+            name=data.get('cityName') or 'Unknown',
+            latitude=float(data['latitude']),
+            longitude=float(data['longitude']),
+            country=data.get('countryName', ''),
+            timezone=timezones[0],
+            country_code=data.get('countryCode'),
+            admin1=data.get('regionName', '')
+        )
+
+
+@dataclass
+class ProviderStats:
+    """Running record of one provider's answers."""
+    latency: Optional[float] = None  # Smoothed answer time in seconds; None until the first answer
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    backoff_until: float = 0.0  # time.monotonic() before which the provider is a last resort
+
+    def backing_off(self, now: float) -> bool:
+        return now < self.backoff_until
+
+
+class GeolocationClient:
+    """
+    Client for IP-based geolocation, racing several providers.
+
+    Providers are asked concurrently and the first valid answer wins; ones
+    not yet started are skipped and late answers only update the
+    per-provider statistics. Those statistics decide who runs next time:
+    providers much slower than the fastest start only if it has not
+    answered within HEDGE_FACTOR times its usual latency, and providers
+    that keep failing are backed off and asked only when every other one
+    has failed.
+
+    Providers place the same address a few kilometres apart, so the winner
+    changing between detections would rename the location and move its
+    cache key. Each provider's last answer (late ones included) is kept, and
+    a winner whose answer has not moved keeps the previous Location if it
+    is within STICKY_KM; an answer that moved is a real move.
+    """
+
+    TIMEOUT = 10  # Per request, and overall for an answer
+    LATENCY_SMOOTHING = 0.3  # Weight of the newest sample in a provider's latency
+    SLOW_FACTOR = 3.0  # Providers this many times slower than the fastest are held back...
+    HEDGE_FACTOR = 2.0  # ...until the fastest has taken this many times its usual latency
+    FAILURES_TO_DEMOTE = 2  # Consecutive failures before a provider is backed off
+    BACKOFF_SECONDS = 60.0  # First back-off; doubles with each further failure
+    MAX_BACKOFF_SECONDS = 3600.0
+    STICKY_KM = 25.0  # Unmoved answers this close to the previous Location keep it
+    MOVED_KM = 2.0  # A provider's answer moving further than this is a real move
+
+    def __init__(self, base_url: Optional[str] = None,
+                 providers: Optional[Sequence[GeolocationProvider]] = None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: ip-api.com endpoint URL, for the default providers
+            providers: Providers to race (default: ip-api.com, ipwho.is and
+                freeipapi.com), each with its own URL override
+        """
+        if providers is None:
+            providers = [IpApiProvider(base_url), IpWhoIsProvider(), FreeIpApiProvider()]
+        self.providers = list(providers)
+        self._stats: Dict[GeolocationProvider, ProviderStats] = {p: ProviderStats() for p in self.providers}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._last: Optional[Location] = None
+        self._answers: Dict[GeolocationProvider, Location] = {}  # Last answer per provider
 
     def detect_location(self) -> Location:
         """
@@ -20,37 +223,145 @@ class GeolocationClient:
             Location object for detected location
 
         Raises:
-            GeolocationError: If location detection fails
+            GeolocationError: If no provider answers within TIMEOUT
         """
+        logger.info("Detecting location from IP address")
+        plan = self._schedule()
+        executor = self._get_executor()
+        cancel = threading.Event()
+        start = time.monotonic()
+        deadline = start + self.TIMEOUT
+        running: Dict[Future, GeolocationProvider] = {}
+        errors: List[str] = []
         try:
-            logger.info("Detecting location from IP address")
-            response = requests.get(self.BASE_URL, timeout=self.TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get('status') != 'success':
-                raise GeolocationError(f"IP geolocation failed: {data.get('message', 'Unknown error')}")
-
-            # Map state abbreviations for US locations
-            admin1 = data.get('regionName', '')
-            if data.get('countryCode') == 'US':
-                admin1 = data.get('region', admin1)  # Use abbreviation for US states
-
-            return Location(
-                name=data.get('city', 'Unknown'),
-                latitude=data.get('lat', 0),
-                longitude=data.get('lon', 0),
-                country=data.get('country', ''),
-                timezone=data.get('timezone', 'UTC'),
-                country_code=data.get('countryCode'),
-                admin1=admin1
-            )
+            while True:
+                now = time.monotonic()
+                # Start what is due, or the next provider if nothing is left in flight
+                while plan and (plan[0][0] <= now - start or not running):
+                    _, provider = plan.pop(0)
+                    future = executor.submit(provider.locate, self.TIMEOUT, cancel)
+                    future.add_done_callback(partial(self._record, provider, time.monotonic()))
+                    running[future] = provider
+                if not running:
+                    raise GeolocationError("All providers failed: " + "; ".join(errors))
+                if now >= deadline:
+                    raise GeolocationError(f"No provider answered within {self.TIMEOUT}s")
 
-        except requests.RequestException as e:
-            logger.error(f"Failed to detect location: {e}")
-            raise GeolocationError(f"Failed to detect location: {e}") from e
+                next_start = start + plan[0][0] if plan else deadline
+                done, _ = wait(list(running), timeout=min(next_start, deadline) - now,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = running.pop(future)
+                    try:
+                        location = future.result()
+                    except GeolocationError as e:
+                        errors.append(f"{provider.NAME}: {e}")
+                        continue
+                    PROVIDER_WINS.inc(provider=provider.NAME)
+                    logger.debug("Location from %s after %.0f ms",
+                                 provider.NAME, (time.monotonic() - start) * 1000)
+                    for other, loser in running.items():
+                        other.add_done_callback(partial(self._remember, loser))
+                    return self._stable(provider, location)
+        except GeolocationError as e:
+            logger.error("Failed to detect location: %s", e)
+            raise
+        finally:
+            cancel.set()
+
+    def provider_stats(self) -> Dict[str, ProviderStats]:
+        """Copy of the statistics per provider name."""
+        with self._lock:
+            return {p.NAME: ProviderStats(**vars(s)) for p, s in self._stats.items()}
+
+    def _schedule(self) -> List[Tuple[float, GeolocationProvider]]:
+        """(start delay in seconds, provider) per provider, in start order."""
+        now = time.monotonic()
+        with self._lock:
+            known = [s.latency for s in self._stats.values()
+                     if s.latency is not None and not s.backing_off(now)]
+            fastest = min(known) if known else None
+            plan = []
+            for i, provider in enumerate(self.providers):
+                stats = self._stats[provider]
+                if stats.backing_off(now):
+                    delay = math.inf  # Only once nothing else is in flight
+                elif fastest is not None and stats.latency is not None and stats.latency > self.SLOW_FACTOR * fastest:
+                    delay = self.HEDGE_FACTOR * fastest
+                else:
+                    delay = 0.0  # Unknown providers start at once, to learn their latency
+                plan.append((delay, stats.latency or 0.0, i, provider))
+        plan.sort(key=lambda entry: entry[:3])
+        return [(delay, provider) for delay, _, _, provider in plan]
+
+    def _record(self, provider: GeolocationProvider, started: float, future: Future):
+        """Update a provider's statistics when its request ends (done callback)."""
+        if future.cancelled() or isinstance(future.exception(), GeolocationCancelled):
+            return
+        elapsed = time.monotonic() - started
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[provider]
+            if future.exception() is None:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                stats.backoff_until = 0.0
+                if stats.latency is None:
+                    stats.latency = elapsed
+                else:
+                    stats.latency += self.LATENCY_SMOOTHING * (elapsed - stats.latency)
+                outcome = "ok"
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                excess = stats.consecutive_failures - self.FAILURES_TO_DEMOTE
+                if excess >= 0:
+                    stats.backoff_until = now + min(self.BACKOFF_SECONDS * 2 ** excess, self.MAX_BACKOFF_SECONDS)
+                    logger.info("Backing off geolocation provider %s after %d failures",
+                                provider.NAME, stats.consecutive_failures)
+                outcome = "failed"
+        PROVIDER_SECONDS.observe(elapsed, provider=provider.NAME, outcome=outcome)
+
+    def _remember(self, provider: GeolocationProvider, future: Future):
+        """Keep a late answer from a race as the provider's last answer (done callback)."""
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self._answers[provider] = future.result()
+
+    def _stable(self, provider: GeolocationProvider, location: Location) -> Location:
+        """
+        The previous Location if the winner's answer has not moved and is
+        close to it, so providers that disagree by a few kilometres do not
+        change the name or the cache key.
+        """
+        with self._lock:
+            last, previous = self._last, self._answers.get(provider)
+            self._answers[provider] = location
+            if (last is not None and previous is not None
+                    and _km(previous, location) <= self.MOVED_KM
+                    and _km(last, location) <= self.STICKY_KM):
+                return last
+            self._last = location
+            return location
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Room for a full race while an abandoned one is still timing out
+                self._executor = ThreadPoolExecutor(max_workers=2 * len(self.providers),
+                                                    thread_name_prefix="geolocation")
+            return self._executor
+
+
+def _km(a: Location, b: Location) -> float:
+    return haversine_km(a.latitude, a.longitude, b.latitude, b.longitude)
 
 
 class GeolocationError(Exception):
     """Exception raised when geolocation fails."""
     pass
+
+
+class GeolocationCancelled(GeolocationError):
+    """Exception raised when a provider's request is skipped because the race is over."""
+    pass
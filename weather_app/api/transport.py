@@ -0,0 +1,177 @@
+"""Shared, instrumented HTTP session for the API clients.
+
+All clients go through ``fetch`` so that every upstream call reports
+connect time, time to first byte, total time, payload size and JSON decode
+time to the metrics registry, and reuses pooled keep-alive connections.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from ..utils.metrics import DEFAULT_SIZE_BUCKETS, counter, histogram
+
+logger = logging.getLogger(__name__)
+
+HTTP_PHASE_SECONDS = histogram(
+    "weatherbar_http_request_seconds",
+    "Upstream request latency by phase (ttfb, total)",
+    ["endpoint", "phase"],
+)
+HTTP_CONNECT_SECONDS = histogram(
+    "weatherbar_http_connect_seconds",
+    "Time to establish a new upstream connection (TCP + TLS)",
+    ["host"],
+)
+HTTP_RESPONSE_BYTES = histogram(
+    "weatherbar_http_response_bytes",
+    "Upstream response payload size",
+    ["endpoint"],
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+HTTP_REQUESTS = counter(
+    "weatherbar_http_requests_total",
+    "Upstream requests by outcome",
+    ["endpoint", "status"],
+)
+PARSE_SECONDS = histogram(
+    "weatherbar_parse_seconds",
+    "Time spent decoding responses and building models",
+    ["endpoint", "stage"],
+)
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+
+class _TimedConnectMixin:
+    """Records how long ``connect()`` takes for each new connection."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            HTTP_CONNECT_SECONDS.observe(time.perf_counter() - start, host=self.host)
+
+
+class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use connect-timed connections."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _TimedAdapter(pool_connections=POOL_CONNECTIONS,
+                                        pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = "WeatherBar"
+                _session = session
+    return _session
+
+
+def fetch(url: str, endpoint: str, params: Optional[dict] = None,
+          timeout: float = 10, **kwargs) -> requests.Response:
+    """
+    Perform a GET request and record its timings.
+
+    Args:
+        url: Request URL
+        endpoint: Short endpoint name used as the metrics label
+        params: Query parameters
+        timeout: Request timeout in seconds
+        **kwargs: Passed through to ``requests.Session.get``
+
+    Returns:
+        Response with its body already read
+
+    Raises:
+        requests.RequestException: On connection errors or non-2xx status
+    """
+    start = time.perf_counter()
+    try:
+        response = get_session().get(url, params=params, timeout=timeout, stream=True, **kwargs)
+        HTTP_PHASE_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, phase="ttfb")
+        body = response.content
+    except requests.RequestException as e:
+        HTTP_REQUESTS.inc(endpoint=endpoint, status=type(e).__name__)
+        raise
+
+    HTTP_PHASE_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, phase="total")
+    HTTP_RESPONSE_BYTES.observe(len(body), endpoint=endpoint)
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    response.raise_for_status()
+    return response
+
+
+@contextmanager
+def open_stream(url: str, endpoint: str, params: Optional[dict] = None,
+                timeout: Union[float, Tuple[float, float]] = 10, **kwargs) -> Iterator[requests.Response]:
+    """
+    Open a streaming GET request whose body the caller reads incrementally.
+
+    The response is closed on exit, so a caller that stops reading early
+    drops the connection instead of downloading the rest of the body.
+
+    Raises:
+        requests.RequestException: On connection errors or non-2xx status
+    """
+    start = time.perf_counter()
+    try:
+        response = get_session().get(url, params=params, timeout=timeout, stream=True, **kwargs)
+    except requests.RequestException as e:
+        HTTP_REQUESTS.inc(endpoint=endpoint, status=type(e).__name__)
+        raise
+    HTTP_PHASE_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, phase="ttfb")
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    try:
+        response.raise_for_status()
+        yield response
+    finally:
+        response.close()
+        HTTP_PHASE_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, phase="total")
+
+
+def decode_json(response: requests.Response, endpoint: str):
+    """Decode a JSON response body, recording the decode time."""
+    with PARSE_SECONDS.time(endpoint=endpoint, stage="json"):
+        return response.json()
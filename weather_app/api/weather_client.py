@@ -1,8 +1,23 @@
 import requests
 import logging
-from typing import List, Optional
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime
 
+from .decode_pool import COLUMNS_FORMAT, DecodePool, DecodePoolError
+from .endpoints import resolve_base_url
+from .flatbuffers_decoder import (
+    FlatBuffersError, content_digest, decode_forecast, displayed_rows, is_json, load_decoder, split_messages
+)
+from .transport import PARSE_SECONDS, fetch, decode_json
+from ..utils.ensemble import load_numpy, source_label, summarize
+from ..utils.fingerprint import ContentFingerprint, digest
+from ..models.ensemble import EnsembleSummary
+from ..models.nowcast import NowcastBuffer
 from ..models.weather_data import (
     CurrentWeather,
     HourlyForecast,
@@ -12,12 +27,49 @@ from ..models.weather_data import (
 
 logger = logging.getLogger(__name__)
 
+# Response fields that change on every call without the forecast changing
+VOLATILE_FIELDS = re.compile(rb'"generationtime_ms":\s*[-+0-9.eE]+,?')
+
 
 class OpenMeteoClient:
     """Client for Open-Meteo Weather API."""
 
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
+    BASE_URL_ENV = "WEATHERBAR_FORECAST_URL"
+    ENSEMBLE_URL = "https://ensemble-api.open-meteo.com/v1/ensemble"
+    ENSEMBLE_URL_ENV = "WEATHERBAR_ENSEMBLE_URL"
     TIMEOUT = 10
+    MAX_FINGERPRINTS = 64  # Request keys whose last response is remembered
+    MAX_BATCH = 50  # Locations per multi-coordinate request (bounded by URL length)
+    WIRE_FORMAT_ENV = "WEATHERBAR_WIRE_FORMAT"
+    WIRE_FORMATS = ("auto", "json", "flatbuffers")
+
+    def __init__(self, base_url: Optional[str] = None, wire_format: Optional[str] = None,
+                 decode_pool: Optional[DecodePool] = None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Endpoint URL; defaults to BASE_URL unless overridden
+                through the environment (see api.endpoints)
+            wire_format: "flatbuffers", "json" or "auto" (the default, also
+                settable through WEATHERBAR_WIRE_FORMAT): FlatBuffers when
+                openmeteo_sdk and numpy are installed, JSON otherwise
+            decode_pool: Worker processes that decode large JSON batch
+                responses (see api.decode_pool); None decodes in-process
+        """
+        self.base_url = base_url or resolve_base_url(self.BASE_URL, self.BASE_URL_ENV)
+        self.ensemble_url = resolve_base_url(self.ENSEMBLE_URL, self.ENSEMBLE_URL_ENV)
+        wire_format = wire_format or os.environ.get(self.WIRE_FORMAT_ENV) or "auto"
+        if wire_format not in self.WIRE_FORMATS:
+            logger.warning("Unknown wire format %r, using auto", wire_format)
+            wire_format = "auto"
+        self.flatbuffers = wire_format != "json" and load_decoder() is not None
+        if wire_format == "flatbuffers" and not self.flatbuffers:
+            logger.warning("FlatBuffers needs openmeteo_sdk and numpy; using JSON")
+        self.decode_pool = decode_pool
+        self._previous: 'OrderedDict[tuple, Tuple[ContentFingerprint, Optional[CompleteWeatherData]]]' = OrderedDict()
+        self._previous_lock = threading.Lock()
 
     # Parameters for current weather
     CURRENT_PARAMS = [
@@ -40,6 +92,19 @@ class OpenMeteoClient:
         "precipitation_probability"
     ]
 
+    # Parameters for the 15-minute nowcast
+    MINUTELY_15_PARAMS = [
+        "precipitation",
+        "temperature_2m"
+    ]
+    NOWCAST_STEPS = 8  # Two hours of 15-minute steps
+
+    # Parameters per member for multi-model and ensemble requests
+    ENSEMBLE_PARAMS = [
+        "temperature_2m",
+        "precipitation"
+    ]
+
     # Parameters for daily forecast
     DAILY_PARAMS = [
         "weather_code",
@@ -74,34 +139,338 @@ class OpenMeteoClient:
             "latitude": latitude,
             "longitude": longitude,
             "current": ",".join(self.CURRENT_PARAMS),
+            "minutely_15": ",".join(self.MINUTELY_15_PARAMS),
+            "forecast_minutely_15": self.NOWCAST_STEPS,
             "hourly": ",".join(self.HOURLY_PARAMS),
             "daily": ",".join(self.DAILY_PARAMS),
+            "forecast_days": 7,
+            **self._unit_params(use_fahrenheit)
+        }
+
+        key = (latitude, longitude, use_fahrenheit, location_name)
+        variables = self._variables(current=True, minutely_15=True, hourly=True, daily=True)
+        fingerprint, previous = self._previous_for(key)
+
+        try:
+            logger.info("Fetching weather for %s, %s", latitude, longitude)
+            response = fetch(self.base_url, "forecast", params=params, timeout=self.TIMEOUT,
+                             headers=fingerprint.conditional_headers())
+
+            if response.status_code == 304 and previous is not None:
+                fingerprint.not_modified()
+                return self._confirmed(previous)
+
+            messages = self._flatbuffer_messages(response, "forecast")
+            if messages is not None:
+                content = content_digest(messages[0], variables)
+            else:
+                content = VOLATILE_FIELDS.sub(b"", response.content)
+            # The hour is mixed in because the hourly list is cut at "now"
+            body_digest = digest(content, datetime.now().strftime("%Y%m%d%H").encode())
+            if not fingerprint.changed(body_digest) and previous is not None:
+                logger.debug("Forecast unchanged, reusing parsed data")
+                fingerprint.commit(body_digest, response.headers, skipped=True)
+                return self._confirmed(previous)
+
+            if messages is not None:
+                data = self._decode_flatbuffer(messages[0], variables, "forecast")
+            else:
+                data = decode_json(response, "forecast")
+
+            with PARSE_SECONDS.time(endpoint="forecast", stage="model"):
+                nowcast = previous.nowcast if previous is not None and previous.nowcast else NowcastBuffer()
+                weather = self._build_weather(data, location_name, nowcast)
+            # Only a body that parsed is remembered, so a failed one is not "unchanged" next time
+            fingerprint.commit(body_digest, response.headers)
+            self._remember(key, fingerprint, weather)
+            return weather
+
+        except requests.RequestException as e:
+            logger.error("Failed to fetch weather data: %s", e)
+            raise WeatherAPIError(f"Failed to fetch weather: {e}") from e
+        except FlatBuffersError as e:
+            logger.error("Failed to decode weather data: %s", e)
+            raise WeatherAPIError(f"Failed to decode weather: {e}") from e
+
+    def get_complete_weather_batch(
+        self,
+        locations: List[Tuple[float, float, str]],
+        use_fahrenheit: bool = True
+    ) -> List[CompleteWeatherData]:
+        """
+        Fetch complete weather for several locations in one request.
+
+        Open-Meteo accepts comma-separated coordinates and answers with one
+        forecast object per location, in order. Batched responses bypass
+        the fingerprint cache used by get_complete_weather. Large JSON
+        bodies are decoded on ``decode_pool`` if one is set.
+
+        Args:
+            locations: (latitude, longitude, location_name) per location,
+                at most MAX_BATCH of them
+            use_fahrenheit: If True, use Fahrenheit; otherwise Celsius
+
+        Returns:
+            CompleteWeatherData per location, in input order
+        """
+        if not locations:
+            return []
+        if len(locations) > self.MAX_BATCH:
+            raise ValueError(f"At most {self.MAX_BATCH} locations per batch")
+
+        params = {
+            "latitude": ",".join(str(lat) for lat, _, _ in locations),
+            "longitude": ",".join(str(lon) for _, lon, _ in locations),
+            "current": ",".join(self.CURRENT_PARAMS),
+            "minutely_15": ",".join(self.MINUTELY_15_PARAMS),
+            "forecast_minutely_15": self.NOWCAST_STEPS,
+            "hourly": ",".join(self.HOURLY_PARAMS),
+            "daily": ",".join(self.DAILY_PARAMS),
+            "forecast_days": 7,
+            **self._unit_params(use_fahrenheit)
+        }
+
+        try:
+            logger.info("Fetching weather for %d locations", len(locations))
+            response = fetch(self.base_url, "forecast_batch", params=params, timeout=self.TIMEOUT * 3)
+            messages = self._flatbuffer_messages(response, "forecast_batch")
+            variables = self._variables(current=True, minutely_15=True, hourly=True, daily=True)
+            if messages is not None:
+                items = [self._decode_flatbuffer(m, variables, "forecast_batch") for m in messages]
+            elif self.decode_pool is not None and self.decode_pool.wants(response.content):
+                items = self._decode_pooled(response, variables, "forecast_batch")
+            else:
+                data = decode_json(response, "forecast_batch")
+                # A single location comes back as an object rather than a list
+                items = data if isinstance(data, list) else [data]
+        except requests.RequestException as e:
+            logger.error("Failed to fetch batch weather data: %s", e)
+            raise WeatherAPIError(f"Failed to fetch weather: {e}") from e
+        except FlatBuffersError as e:
+            logger.error("Failed to decode batch weather data: %s", e)
+            raise WeatherAPIError(f"Failed to decode weather: {e}") from e
+
+        if len(items) != len(locations):
+            raise WeatherAPIError(f"Expected {len(locations)} forecasts, got {len(items)}")
+
+        with PARSE_SECONDS.time(endpoint="forecast_batch", stage="model"):
+            return [
+                self._build_weather(item, name, NowcastBuffer())
+                for item, (_, _, name) in zip(items, locations)
+            ]
+
+    def _build_weather(self, data: dict, location_name: str, nowcast: NowcastBuffer) -> CompleteWeatherData:
+        """Build the model for one decoded forecast object."""
+        # The decoded arrays are kept as-is (no copy) for columnar consumers
+        columns = {section: data[section] for section in ('hourly', 'daily') if section in data}
+        utc_offset = data.get('utc_offset_seconds')
+        if data.get('format') == 'flatbuffers':
+            # Only the rows the models hold become Python values
+            data = displayed_rows(data, datetime.now())
+        elif data.get('format') == COLUMNS_FORMAT:
+            data = data['rows']  # Cut by the decode pool
+        self._merge_nowcast(nowcast, data.get('minutely_15', {}), utc_offset)
+        return CompleteWeatherData(
+            current=CurrentWeather.from_api_response(data, data.get('current', {})),
+            hourly=self._parse_hourly(data.get('hourly', {})),
+            daily=self._parse_daily(data.get('daily', {})),
+            location_name=location_name,
+            nowcast=nowcast,
+            columns=columns
+        )
+
+    def get_nowcast(
+        self,
+        latitude: float,
+        longitude: float,
+        use_fahrenheit: bool = True,
+        location_name: str = ""
+    ) -> NowcastBuffer:
+        """
+        Refresh only the 15-minute nowcast, without the hourly and daily sets.
+
+        The result is merged into the buffer of the last complete forecast
+        for the same request, so that forecast sees the new steps too.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            use_fahrenheit: If True, use Fahrenheit and inches
+            location_name: Name of location (part of the request key)
+
+        Returns:
+            The merged NowcastBuffer
+        """
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "minutely_15": ",".join(self.MINUTELY_15_PARAMS),
+            "forecast_minutely_15": self.NOWCAST_STEPS,
+            **self._unit_params(use_fahrenheit)
+        }
+        _, previous = self._previous_for((latitude, longitude, use_fahrenheit, location_name))
+        nowcast = previous.nowcast if previous is not None and previous.nowcast else NowcastBuffer()
+
+        try:
+            response = fetch(self.base_url, "nowcast", params=params, timeout=self.TIMEOUT)
+            messages = self._flatbuffer_messages(response, "nowcast")
+            if messages is not None:
+                data = self._decode_flatbuffer(messages[0], self._variables(minutely_15=True), "nowcast")
+            else:
+                data = decode_json(response, "nowcast")
+        except requests.RequestException as e:
+            logger.error("Failed to fetch nowcast: %s", e)
+            raise WeatherAPIError(f"Failed to fetch nowcast: {e}") from e
+        except FlatBuffersError as e:
+            logger.error("Failed to decode nowcast: %s", e)
+            raise WeatherAPIError(f"Failed to decode nowcast: {e}") from e
+
+        with PARSE_SECONDS.time(endpoint="nowcast", stage="model"):
+            utc_offset = data.get('utc_offset_seconds')
+            if data.get('format') == 'flatbuffers':
+                data = displayed_rows(data, datetime.now())
+            self._merge_nowcast(nowcast, data.get('minutely_15', {}), utc_offset)
+        return nowcast
+
+    def get_ensemble(
+        self,
+        latitude: float,
+        longitude: float,
+        models: Sequence[str],
+        use_fahrenheit: bool = True,
+        ensemble: bool = False
+    ) -> Optional[EnsembleSummary]:
+        """
+        Fetch several models (or every member of ensemble models) in one
+        request and summarize their spread over the next hours.
+
+        Members are always requested as JSON: their series are told apart
+        by key suffix, which FlatBuffers encodes differently.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            models: Open-Meteo model names, e.g. ["gfs_seamless", "icon_seamless"]
+            use_fahrenheit: If True, use Fahrenheit and inches
+            ensemble: Query the ensemble API, whose models have many members
+
+        Returns:
+            EnsembleSummary, or None if numpy is not installed
+        """
+        if load_numpy() is None:
+            return None
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": ",".join(self.ENSEMBLE_PARAMS),
+            "models": ",".join(models),
+            "forecast_days": 2,
+            **self._unit_params(use_fahrenheit)
+        }
+        params.pop("format", None)
+        endpoint = "ensemble" if ensemble else "models"
+
+        try:
+            logger.info("Fetching %s for %s, %s", endpoint, latitude, longitude)
+            response = fetch(self.ensemble_url if ensemble else self.base_url, endpoint,
+                             params=params, timeout=self.TIMEOUT * 2)
+            data = decode_json(response, endpoint)
+        except requests.RequestException as e:
+            logger.error("Failed to fetch %s: %s", endpoint, e)
+            raise WeatherAPIError(f"Failed to fetch {endpoint}: {e}") from e
+
+        with PARSE_SECONDS.time(endpoint=endpoint, stage="aggregate"):
+            return summarize(data.get('hourly', {}), source_label(models, ensemble), use_fahrenheit)
+
+    def _unit_params(self, use_fahrenheit: bool) -> dict:
+        """Unit, timezone and format parameters shared by every forecast request."""
+        params = {
             "temperature_unit": "fahrenheit" if use_fahrenheit else "celsius",
             "wind_speed_unit": "mph" if use_fahrenheit else "kmh",
+            "precipitation_unit": "inch" if use_fahrenheit else "mm",
             "timezone": "auto",
-            "forecast_days": 7
         }
+        if self.flatbuffers:
+            params["format"] = "flatbuffers"
+        return params
 
+    def _variables(self, current: bool = False, minutely_15: bool = False,
+                   hourly: bool = False, daily: bool = False) -> dict:
+        """Requested variables per section, in request order (FlatBuffers keeps that order)."""
+        sections = {
+            "current": current and self.CURRENT_PARAMS,
+            "minutely_15": minutely_15 and self.MINUTELY_15_PARAMS,
+            "hourly": hourly and self.HOURLY_PARAMS,
+            "daily": daily and self.DAILY_PARAMS,
+        }
+        return {section: names for section, names in sections.items() if names}
+
+    def _flatbuffer_messages(self, response: requests.Response, endpoint: str) -> Optional[list]:
+        """
+        Per-location messages of a FlatBuffers response, or None for JSON
+        (not requested, or sent by a server that ignores ``format``).
+        """
+        if not self.flatbuffers or is_json(response.content[:64]):
+            return None
+        with PARSE_SECONDS.time(endpoint=endpoint, stage="flatbuffers"):
+            try:
+                return split_messages(response.content)
+            except (struct.error, IndexError, ValueError) as e:
+                raise FlatBuffersError(f"Malformed response: {e}") from e
+
+    @staticmethod
+    def _decode_flatbuffer(message, variables: dict, endpoint: str) -> dict:
+        with PARSE_SECONDS.time(endpoint=endpoint, stage="flatbuffers"):
+            try:
+                return decode_forecast(message, variables)
+            except (struct.error, IndexError, ValueError) as e:
+                raise FlatBuffersError(f"Malformed response: {e}") from e
+
+    def _decode_pooled(self, response: requests.Response, variables: dict, endpoint: str) -> list:
+        """Forecast objects of a JSON batch body, decoded on the pool (in-process if it fails)."""
         try:
-            logger.info(f"Fetching weather for {latitude}, {longitude}")
-            response = requests.get(self.BASE_URL, params=params, timeout=self.TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
-
-            current = CurrentWeather.from_api_response(data, data.get('current', {}))
-            hourly = self._parse_hourly(data.get('hourly', {}))
-            daily = self._parse_daily(data.get('daily', {}))
-
-            return CompleteWeatherData(
-                current=current,
-                hourly=hourly,
-                daily=daily,
-                location_name=location_name
-            )
+            with PARSE_SECONDS.time(endpoint=endpoint, stage="pool"):
+                return self.decode_pool.decode(response.content, variables)
+        except DecodePoolError as e:
+            logger.warning("%s; decoding in-process", e)
+        data = decode_json(response, endpoint)
+        return data if isinstance(data, list) else [data]
 
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch weather data: {e}")
-            raise WeatherAPIError(f"Failed to fetch weather: {e}") from e
+    @staticmethod
+    def _merge_nowcast(nowcast: NowcastBuffer, minutely_data: dict,
+                       utc_offset_seconds: Optional[int] = None) -> int:
+        """Merge a minutely_15 section into a nowcast buffer in place."""
+        return nowcast.merge(
+            minutely_data.get('time', []),
+            minutely_data.get('precipitation', []),
+            minutely_data.get('temperature_2m', []),
+            utc_offset_seconds,
+        )
+
+    @staticmethod
+    def _confirmed(previous: CompleteWeatherData) -> CompleteWeatherData:
+        """
+        The previous forecast, stamped with this fetch's time. Updated in
+        place so callers can still tell by identity that nothing changed.
+        """
+        previous.fetched_at = datetime.now()
+        return previous
+
+    def _previous_for(self, key: tuple) -> Tuple[ContentFingerprint, Optional[CompleteWeatherData]]:
+        """Fingerprint and last parsed result for a request key."""
+        with self._previous_lock:
+            entry = self._previous.get(key)
+            if entry is None:
+                return ContentFingerprint("forecast"), None
+            self._previous.move_to_end(key)
+            return entry
+
+    def _remember(self, key: tuple, fingerprint: ContentFingerprint, weather: CompleteWeatherData):
+        with self._previous_lock:
+            self._previous[key] = (fingerprint, weather)
+            self._previous.move_to_end(key)
+            while len(self._previous) > self.MAX_FINGERPRINTS:
+                self._previous.popitem(last=False)
 
     def _parse_hourly(self, hourly_data: dict) -> List[HourlyForecast]:
         """Parse hourly forecast data from API response."""
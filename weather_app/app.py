@@ -1,59 +1,106 @@
 """WeatherBar - macOS Menu Bar Weather Application."""
 
 import rumps
-import threading
 import logging
+import threading
+import time
 from typing import Optional
 
+from PyObjCTools import AppHelper
+
 from .services.settings_service import SettingsService
+from .services.prefetch_service import Prefetcher
 from .services.weather_service import WeatherService, WeatherServiceError
+from .services.update_executor import UpdateExecutor, CancelToken
+from .services.alert_service import AlertService
 from .ui.icons import get_icon, get_description
-from .ui.menu_builder import MenuBuilder
 from .models.weather_data import CompleteWeatherData
+from .models.ensemble import EnsembleSummary
+from .models.nowcast import NowcastBuffer
+from .models.settings import Settings
+from .utils.instance import HandoffServer, InstanceLock
+from .utils.metrics import counter, gauge, histogram
+from .utils.fingerprint import UNCHANGED_SKIPS
 from .utils.formatters import (
     format_temp, format_wind, format_time, format_hour,
     format_pressure, format_visibility, format_uv_index,
-    format_day_name
+    format_day_name, format_precip_strip, format_temp_band, format_aqi
 )
 
 logger = logging.getLogger(__name__)
 
-# Global app reference for thread updates
-_app = None
+UPDATE_CYCLE_SECONDS = histogram(
+    "weatherbar_update_cycle_seconds",
+    "Duration of a full update cycle (fetch + render)",
+)
+UPDATES = counter("weatherbar_updates_total", "Update cycles by outcome", ["outcome"])
+LAST_SUCCESS = gauge(
+    "weatherbar_last_success_timestamp_seconds",
+    "Unix time of the last successful update",
+)
+RENDER_SECONDS = histogram("weatherbar_render_seconds", "Time spent updating the menu")
+
+NOWCAST_INTERVAL_SECONDS = 5 * 60  # 15-minute steps are refreshed between full updates
+
+
+def _call_on_main(fn):
+    """Run a callable on the AppKit main thread."""
+    AppHelper.callAfter(fn)
 
 
 class WeatherMenuBarApp(rumps.App):
     """macOS menu bar weather application."""
 
-    def __init__(self):
-        """Initialize the weather app."""
+    def __init__(self, handoff: Optional[dict] = None):
+        """
+        Initialize the weather app.
+
+        Args:
+            handoff: State handed over by the instance this one replaces
+        """
         super().__init__(
             name="WeatherBar",
             title="Loading...",
             quit_button="Quit"
         )
 
-        global _app
-        _app = self
-
         # Initialize services
         self.settings_service = SettingsService()
         self.weather_service = WeatherService(self.settings_service)
+        # Keeps recently used and habitual locations warm in the shared cache
+        self.prefetcher = Prefetcher(self.weather_service).start()
+
+        # All fetching happens on one worker; results come back on the main thread
+        self._executor = UpdateExecutor(dispatch=_call_on_main)
 
         # Current state
         self._weather: Optional[CompleteWeatherData] = None
+        # (forecast, forecast with air quality) that arrived before that forecast was shown
+        self._late_merge: Optional[tuple] = None
         self._settings = self.settings_service.load()
+        self.alert_service = AlertService(self._settings.alert_rules)
 
         # Build static menu
         self._build_menu()
 
         # Set up update timer
         interval_seconds = self._settings.update_interval_minutes * 60
-        self.timer = rumps.Timer(self._threaded_update, interval_seconds)
-        self.timer.start()
-
-        # Initial update
-        self._threaded_update(None)
+        self.timer = rumps.Timer(self._on_timer, interval_seconds)
+        self._next_update_at = time.time()
+        self.nowcast_timer = rumps.Timer(self._on_nowcast_timer, NOWCAST_INTERVAL_SECONDS)
+        self.nowcast_timer.start()
+
+        delay = self._resume(handoff) if handoff else 0.0
+        if delay > 0:
+            # Keep the previous instance's schedule: the timer fires as soon
+            # as it starts, so start it when the next update is due
+            resume = threading.Timer(delay, _call_on_main, args=(self.timer.start,))
+            resume.daemon = True
+            resume.start()
+        else:
+            self.timer.start()
+            # Initial update
+            self._submit_update()
 
     def _build_menu(self):
         """Build the static menu structure."""
@@ -72,6 +119,20 @@ class WeatherMenuBarApp(rumps.App):
         self.menu.add(self.humidity_item)
         self.wind_item = rumps.MenuItem("")
         self.menu.add(self.wind_item)
+        self.air_quality_item = rumps.MenuItem("")
+        self.menu.add(self.air_quality_item)
+        self._set_hidden(self.air_quality_item, True)
+        self.pollen_item = rumps.MenuItem("")
+        self.menu.add(self.pollen_item)
+        self._set_hidden(self.pollen_item, True)
+        self.nowcast_item = rumps.MenuItem("")
+        self.menu.add(self.nowcast_item)
+        self._set_hidden(self.nowcast_item, True)
+        # Model spread (full mode, when forecast models are configured)
+        self.ensemble_items = [rumps.MenuItem(""), rumps.MenuItem("")]
+        for item in self.ensemble_items:
+            self.menu.add(item)
+            self._set_hidden(item, True)
 
         self.menu.add(rumps.separator)
 
@@ -123,77 +184,274 @@ class WeatherMenuBarApp(rumps.App):
         self.updated_item = rumps.MenuItem("Updated: --")
         self.menu.add(self.updated_item)
 
-    def _threaded_update(self, _):
-        """Trigger weather update in background thread."""
-        thread = threading.Thread(target=self._do_update, daemon=True)
-        thread.start()
-
-    def _do_update(self):
-        """Fetch weather data and update UI."""
-        global _app
+    def _on_timer(self, _):
+        """Periodic update tick."""
+        self._next_update_at = time.time() + self._settings.update_interval_minutes * 60
+        self._submit_update()
+
+    def export_state(self) -> dict:
+        """Caches and schedule for a replacing instance (handoff thread)."""
+        self.weather_service.usage.save(force=True)
+        return {
+            'weather_service': self.weather_service.export_state(),
+            'alerts': self.alert_service.export_state(),
+            'next_update_at': self._next_update_at,
+        }
+
+    def hand_off(self):
+        """Quit after handing the state over (handoff thread)."""
+        self._executor.shutdown()
+        _call_on_main(rumps.quit_application)
+
+    def _resume(self, state: dict) -> float:
+        """
+        Adopt a previous instance's state and render its forecast at once.
+
+        Returns:
+            Seconds until the next update is due, or 0 to update now
+        """
         try:
-            logger.info("Updating weather data")
-            self._weather = self.weather_service.get_weather()
-            self._settings = self.settings_service.load()
-            self._update_display()
-            logger.info("Weather update successful")
-        except WeatherServiceError as e:
-            logger.error(f"Weather update failed: {e}")
-            if _app:
-                _app.title = "⚠️ --°"
-        except Exception as e:
-            logger.exception(f"Unexpected error: {e}")
-            if _app:
-                _app.title = "⚠️ --°"
-
-    def _update_display(self):
-        """Update all display elements."""
-        global _app
-        if not self._weather or not _app:
+            self.weather_service.import_state(state.get('weather_service', {}))
+            self.alert_service.import_state(state.get('alerts', {}))
+            next_update_at = float(state.get('next_update_at', 0))
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.warning("Ignoring handed-over state: %s", e)
+            return 0.0
+        menu = state.get('weather_service', {}).get('menu') or {}
+        weather = self.weather_service.get_cached_data()
+        if weather is None or menu.get('use_fahrenheit') != self._settings.use_fahrenheit:
+            return 0.0
+        self._weather = weather
+        self._update_display(self._compose_display(weather, self._settings))
+        logger.info("Resumed from the previous instance's forecast for %s", weather.location_name)
+        self._next_update_at = next_update_at
+        return max(0.0, next_update_at - time.time())
+
+    def _on_nowcast_timer(self, _):
+        """Refresh the 15-minute strip between full updates (full mode only)."""
+        if not self._settings.is_full_mode or self._weather is None:
+            return
+        self._executor.submit(
+            self._do_nowcast,
+            on_result=self._apply_nowcast,
+            on_error=lambda e: logger.warning("Nowcast update failed: %s", e),
+            supersede=False,
+        )
+
+    def _do_nowcast(self, token: CancelToken) -> Optional[str]:
+        """Fetch the nowcast and compose its strip (worker thread)."""
+        nowcast = self.weather_service.get_nowcast()
+        token.check()
+        return self._compose_nowcast(nowcast, self.settings_service.load())
+
+    def _apply_nowcast(self, title: Optional[str]):
+        """Redraw just the nowcast strip (main thread)."""
+        if title is not None:
+            self.nowcast_item.title = title
+        self._set_hidden(self.nowcast_item, title is None)
+
+    def _submit_update(self, detect_location: bool = False):
+        """
+        Submit an update job, superseding any queued or in-flight one.
+
+        Args:
+            detect_location: Re-detect the location from IP before fetching
+        """
+        self._executor.submit(
+            lambda token: self._do_update(token, detect_location),
+            on_result=self._apply_update,
+            on_error=self._update_failed,
+        )
+
+    def _do_update(self, token: CancelToken, detect_location: bool = False):
+        """Fetch weather data and compose the display (worker thread)."""
+        logger.info("Updating weather data")
+        if detect_location:
+            self.weather_service.auto_detect_location()
+            token.check()
+        weather = self.weather_service.get_weather(on_update=self._details_arrived)
+        settings = self.settings_service.load()
+        token.check()
+        # Alert windows move with the clock, so rules are checked even when
+        # the forecast itself is unchanged; unchanged rows cost nothing
+        alerts = self.alert_service.evaluate(weather.location_name, weather)
+        if weather is self._weather:
+            # Unchanged upstream data: only the fetch time is redrawn
+            UNCHANGED_SKIPS.inc(source="menu")
+            return None, settings, self._format_updated(weather), alerts, token.submitted_at
+        return weather, settings, self._compose_display(weather, settings), alerts, token.submitted_at
+
+    def _apply_update(self, result):
+        """Apply a finished update in one batch (main thread)."""
+        weather, settings, display, alerts, submitted_at = result
+        for alert in alerts:
+            rumps.notification("WeatherBar", alert.location_name, alert.message)
+        if weather is None:
+            self.updated_item.title = display
+            UPDATES.inc(outcome="unchanged")
+            return
+        late, self._late_merge = self._late_merge, None
+        if late is not None and late[0] is weather:
+            weather, display = late[1], self._compose_display(late[1], settings)
+        self._weather = weather
+        self._settings = settings
+        with RENDER_SECONDS.time():
+            self._update_display(display)
+        logger.info("Weather update successful")
+        UPDATES.inc(outcome="success")
+        LAST_SUCCESS.set(time.time())
+        UPDATE_CYCLE_SECONDS.observe(time.perf_counter() - submitted_at)
+
+    def _details_arrived(self, shown: CompleteWeatherData, merged: CompleteWeatherData):
+        """Model spread or air quality finished after its forecast (details thread)."""
+        _call_on_main(lambda: self._apply_details(shown, merged))
+
+    def _apply_details(self, shown: CompleteWeatherData, merged: CompleteWeatherData):
+        """Redraw with late details, unless a newer forecast is showing (main thread)."""
+        if self._weather is not shown:
+            # The forecast it belongs to may not have been applied yet
+            late = self._late_merge
+            if late is not None and late[1] is shown:
+                self._late_merge = (late[0], merged)  # A second detail on top of the first
+            else:
+                self._late_merge = (shown, merged)
             return
+        self._weather = merged
+        self._update_display(self._compose_display(merged, self._settings))
+
+    def _update_failed(self, error: Exception):
+        """Show the error state (main thread)."""
+        if isinstance(error, WeatherServiceError):
+            logger.error("Weather update failed: %s", error)
+            UPDATES.inc(outcome="error")
+        else:
+            logger.error("Unexpected error: %s", error, exc_info=error)
+            UPDATES.inc(outcome="exception")
+        self.title = "⚠️ --°"
 
-        w = self._weather
-        s = self._settings
+    @staticmethod
+    def _compose_display(w: CompleteWeatherData, s: Settings) -> dict:
+        """Build every title string for the menu without touching the UI."""
         use_f = s.use_fahrenheit
 
-        # Update title
         icon = get_icon(w.current.weather_code, w.current.is_day)
         temp = format_temp(w.current.temperature, use_f, include_unit=False)
-        _app.title = f"{icon} {temp}"
-
-        # Update location
-        self.location_item.title = f"📍 {w.location_name}"
-
-        # Update current conditions
         desc = get_description(w.current.weather_code)
         temp_full = format_temp(w.current.temperature, use_f)
-        self.condition_item.title = f"{icon}  {temp_full} - {desc}"
-
         feels = format_temp(w.current.feels_like, use_f)
-        self.feels_item.title = f"  Feels like {feels}"
-
-        self.humidity_item.title = f"  💧 Humidity: {w.current.humidity}%"
-
         wind = format_wind(w.current.wind_speed, w.current.wind_direction, use_f)
-        self.wind_item.title = f"  💨 Wind: {wind}"
 
-        # Update forecast
-        for i, day in enumerate(w.daily[:7]):
-            if i < len(self.forecast_items):
-                day_name = format_day_name(day.date)
-                day_icon = get_icon(day.weather_code)
-                high = format_temp(day.temp_high, use_f, include_unit=False)
-                low = format_temp(day.temp_low, use_f, include_unit=False)
-                self.forecast_items[i].title = f"  {day_name:8} {day_icon}  {high}/{low}"
-
-        # Update time
-        updated = w.fetched_at.strftime("%-I:%M %p")
-        self.updated_item.title = f"Updated: {updated}"
+        forecast = []
+        for day in w.daily[:7]:
+            day_name = format_day_name(day.date)
+            day_icon = get_icon(day.weather_code)
+            high = format_temp(day.temp_high, use_f, include_unit=False)
+            low = format_temp(day.temp_low, use_f, include_unit=False)
+            forecast.append(f"  {day_name:8} {day_icon}  {high}/{low}")
+
+        return {
+            'title': f"{icon} {temp}",
+            'location_item': f"📍 {w.location_name}",
+            'condition_item': f"{icon}  {temp_full} - {desc}",
+            'feels_item': f"  Feels like {feels}",
+            'humidity_item': f"  💧 Humidity: {w.current.humidity}%",
+            'wind_item': f"  💨 Wind: {wind}",
+            'forecast_items': forecast,
+            'nowcast_item': WeatherMenuBarApp._compose_nowcast(w.nowcast, s),
+            'ensemble_items': WeatherMenuBarApp._compose_ensemble(w.ensemble, s),
+            **WeatherMenuBarApp._compose_air_quality(w, s),
+            'updated_item': WeatherMenuBarApp._format_updated(w),
+        }
+
+    @staticmethod
+    def _format_updated(w: CompleteWeatherData) -> str:
+        return f"Updated: {w.fetched_at.strftime('%-I:%M %p')}"
+
+    @staticmethod
+    def _compose_nowcast(nowcast: Optional[NowcastBuffer], s: Settings) -> Optional[str]:
+        """Next-2-hours precipitation strip, or None when it should be hidden."""
+        if nowcast is None or not s.is_full_mode:
+            return None
+        values = nowcast.precipitation_window(nowcast.local_time(), steps=8)
+        if all(v is None for v in values):
+            return None
+        total = sum(v for v in values if v is not None)
+        if total <= 0:
+            return "  ☀️ Next 2h: no rain"
+        unit = "in" if s.use_fahrenheit else "mm"
+        strip = format_precip_strip(values, s.use_fahrenheit)
+        return f"  🌧 Next 2h: {strip}  {total:.2f} {unit}"
+
+    @staticmethod
+    def _compose_air_quality(w: CompleteWeatherData, s: Settings) -> dict:
+        """Air-quality and pollen lines (None hides a line)."""
+        aq = w.air_quality
+        if aq is None or not s.show_air_quality:
+            return {'air_quality_item': None, 'pollen_item': None}
+        parts = []
+        if aq.us_aqi is not None:
+            parts.append(f"AQI {format_aqi(aq.us_aqi)}")
+        if aq.pm2_5 is not None:
+            parts.append(f"PM2.5 {aq.pm2_5:.0f} µg/m³")
+        pollen = None
+        levels = aq.pollen_levels
+        if levels and s.is_full_mode:
+            pollen = "  🌼 Pollen: " + ", ".join(f"{name} {value:.0f}" for name, value in list(levels.items())[:3])
+        return {
+            'air_quality_item': f"  🌫 {' · '.join(parts)}" if parts else None,
+            'pollen_item': pollen,
+        }
+
+    @staticmethod
+    def _compose_ensemble(summary: Optional[EnsembleSummary], s: Settings) -> Optional[list]:
+        """Temperature and precipitation confidence lines, or None when hidden."""
+        if summary is None or not s.is_full_mode:
+            return None
+        band = summary.temperature_band()
+        if band is None:
+            return None
+        low, high, agreement = band
+        noun = "members" if summary.source.startswith("ensemble:") else "models"
+        hours = summary.window_hours
+        temp_line = (f"  🎯 Next {hours}h: {format_temp_band(low, high)} · "
+                     f"{agreement:.0%} of {summary.members} {noun} agree")
+        if summary.window_wet_members == 0:
+            rain_line = f"  ☂️ Next {hours}h: dry in all {summary.members} {noun}"
+        else:
+            unit = "in" if s.use_fahrenheit else "mm"
+            rain_line = (f"  ☂️ Next {hours}h: wet in {summary.window_wet_members}/{summary.members} "
+                         f"{noun} · {summary.window_total_p10:g}–{summary.window_total_p90:g} {unit}")
+        return [temp_line, rain_line]
+
+    @staticmethod
+    def _set_hidden(item: rumps.MenuItem, hidden: bool):
+        """Show or hide a menu item without rebuilding the menu."""
+        item._menuitem.setHidden_(hidden)
+
+    def _update_display(self, display: dict):
+        """Update all display elements from a composed display (main thread)."""
+        self.title = display['title']
+        for name in ('location_item', 'condition_item', 'feels_item',
+                     'humidity_item', 'wind_item', 'updated_item'):
+            getattr(self, name).title = display[name]
+        for item, title in zip(self.forecast_items, display['forecast_items']):
+            item.title = title
+        self._apply_nowcast(display['nowcast_item'])
+        for name in ('air_quality_item', 'pollen_item'):
+            item = getattr(self, name)
+            if display[name] is not None:
+                item.title = display[name]
+            self._set_hidden(item, display[name] is None)
+        lines = display['ensemble_items']
+        for item, title in zip(self.ensemble_items, lines or []):
+            item.title = title
+        for item in self.ensemble_items:
+            self._set_hidden(item, lines is None)
 
     def _refresh(self, _):
         """Manual refresh."""
         self.title = "🔄 ..."
-        self._threaded_update(None)
+        self._submit_update()
 
     def _set_essential(self, _):
         """Set essential display mode."""
@@ -201,6 +459,8 @@ class WeatherMenuBarApp(rumps.App):
         self._settings = self.settings_service.load()
         self.essential_item.state = True
         self.full_item.state = False
+        self._weather = None  # Force recompose
+        self._submit_update()
 
     def _set_full(self, _):
         """Set full display mode."""
@@ -208,6 +468,8 @@ class WeatherMenuBarApp(rumps.App):
         self._settings = self.settings_service.load()
         self.essential_item.state = False
         self.full_item.state = True
+        self._weather = None  # Force recompose
+        self._submit_update()
 
     def _set_fahrenheit(self, _):
         """Set Fahrenheit units."""
@@ -216,7 +478,7 @@ class WeatherMenuBarApp(rumps.App):
         self.fahrenheit_item.state = True
         self.celsius_item.state = False
         self._weather = None  # Force refetch
-        self._threaded_update(None)
+        self._submit_update()
 
     def _set_celsius(self, _):
         """Set Celsius units."""
@@ -225,21 +487,12 @@ class WeatherMenuBarApp(rumps.App):
         self.fahrenheit_item.state = False
         self.celsius_item.state = True
         self._weather = None  # Force refetch
-        self._threaded_update(None)
+        self._submit_update()
 
     def _auto_detect(self, _):
         """Auto-detect location."""
         self.title = "🔍 ..."
-
-        def do_detect():
-            try:
-                self.weather_service.auto_detect_location()
-                self._threaded_update(None)
-            except Exception as e:
-                logger.error(f"Auto-detect failed: {e}")
-
-        thread = threading.Thread(target=do_detect, daemon=True)
-        thread.start()
+        self._submit_update(detect_location=True)
 
     def _set_location(self, _):
         """Set location manually using AppleScript dialog."""
@@ -269,26 +522,26 @@ class WeatherMenuBarApp(rumps.App):
                 return
 
             query = result.stdout.strip()
-            logger.info(f"User entered: {query}")
+            logger.info("User entered: %s", query)
 
         except subprocess.TimeoutExpired:
             logger.error("Dialog timed out")
             return
         except Exception as e:
-            logger.error(f"Dialog error: {e}")
+            logger.error("Dialog error: %s", e)
             return
 
         if not query:
             logger.info("Empty query")
             return
 
-        logger.info(f"Searching for: {query}")
+        logger.info("Searching for: %s", query)
 
         try:
             locations = self.weather_service.search_locations(query)
-            logger.info(f"Found {len(locations)} locations")
+            logger.info("Found %d locations", len(locations))
         except Exception as e:
-            logger.error(f"Search failed: {e}")
+            logger.error("Search failed: %s", e)
             rumps.alert("Error", f"Search failed: {e}")
             return
 
@@ -322,7 +575,7 @@ class WeatherMenuBarApp(rumps.App):
                     return
 
                 chosen = result.stdout.strip()
-                logger.info(f"User selected: {chosen}")
+                logger.info("User selected: %s", chosen)
 
                 # Find the matching location
                 selected = None
@@ -335,16 +588,31 @@ class WeatherMenuBarApp(rumps.App):
                     selected = locations[0]
 
             except Exception as e:
-                logger.error(f"Selection error: {e}")
+                logger.error("Selection error: %s", e)
                 return
 
-        logger.info(f"Setting location to: {selected.display_name}")
+        logger.info("Setting location to: %s", selected.display_name)
         self.weather_service.set_location(selected)
-        self._threaded_update(None)
+        self._submit_update()
         rumps.alert("Location Set", f"Weather location set to:\n{selected.display_name}")
 
 
-def run():
-    """Run the weather app."""
-    app = WeatherMenuBarApp()
-    app.run()
+def run(instance: Optional[InstanceLock] = None, handoff: Optional[dict] = None):
+    """
+    Run the weather app.
+
+    Args:
+        instance: Held single-instance lock; a later instance can then ask
+            this one to hand over its state and quit
+        handoff: State handed over by the instance this one replaces
+    """
+    app = WeatherMenuBarApp(handoff)
+    server = None
+    if instance is not None:
+        server = HandoffServer(instance.socket_path, app.export_state, app.hand_off).start()
+    try:
+        app.run()
+    finally:
+        if server is not None:
+            server.stop()
+        app.prefetcher.stop()
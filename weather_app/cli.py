@@ -0,0 +1,406 @@
+"""Command-line entry points (``python -m weather_app``).
+
+``fetch`` runs headless: it reads locations (``lat,lon[,name]`` or a place
+name per line) from a file or stdin, fetches them in multi-coordinate
+batches on a small thread pool and streams one NDJSON record per location
+to stdout as soon as its batch completes. Only a bounded window of batches
+is read ahead of the output, so memory stays flat however long the input
+is. Progress and throughput go to stderr. With ``--decode-processes`` the
+large JSON responses are decoded on worker processes (see
+``api.decode_pool``), so batches in flight no longer share one core.
+
+``backfill`` loads historical weather for the same kind of location list
+into a local columnar store (see ``services.backfill_service``); rerun it
+with the same arguments to resume an interrupted load.
+
+``terminal`` shows the menu's forecast in a terminal, as a one-line ticker
+or a full-screen panel (see ``ui.terminal``).
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from .api.decode_pool import DecodePool
+from .models.location import Location
+from .models.weather_data import CompleteWeatherData
+from .services.settings_service import SettingsService
+from .services.weather_service import WeatherService, WeatherServiceError
+from .services.export_service import FORMATS, ExportError, ForecastExporter
+from .services.backfill_service import Backfill, BackfillError
+from .utils.logger import get_logger, setup_logging
+from .utils.metrics import start_exporter
+
+logger = get_logger(__name__)
+
+COORDINATES = re.compile(
+    r"^\s*(?P<lat>-?\d+(?:\.\d+)?)\s*[,\s]\s*(?P<lon>-?\d+(?:\.\d+)?)\s*(?:,\s*(?P<name>.*))?$"
+)
+SECTIONS = ("current", "hourly", "daily", "nowcast")
+
+# (NDJSON record, forecast, location); forecast and location are None on failure
+_Result = Tuple[dict, Optional[CompleteWeatherData], Optional[Location]]
+
+
+def parse_location_line(line: str) -> Tuple[Optional[Location], str]:
+    """
+    Parse one input line.
+
+    Returns:
+        (Location, name) for coordinates, or (None, query) for a place name
+    """
+    m = COORDINATES.match(line)
+    if m is None:
+        return None, line.strip()
+    lat, lon = float(m.group("lat")), float(m.group("lon"))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Coordinates out of range: {lat}, {lon}")
+    name = (m.group("name") or "").strip() or f"{lat:.4f}, {lon:.4f}"
+    return Location(name=name, latitude=lat, longitude=lon, country="", timezone="auto"), name
+
+
+def read_lines(stream: IO[str]) -> Iterator[Tuple[int, str]]:
+    """Numbered non-blank, non-comment lines, read lazily."""
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield number, line
+
+
+class _Progress:
+    """Throttled progress line on stderr."""
+
+    def __init__(self, stream: IO[str], interval: float = 1.0, enabled: bool = True):
+        self.stream = stream
+        self.interval = interval
+        self.enabled = enabled
+        self.ok = 0
+        self.failed = 0
+        self._start = time.monotonic()
+        self._last = 0.0
+
+    def add(self, ok: int, failed: int):
+        self.ok += ok
+        self.failed += failed
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._write("\r")
+
+    def finish(self):
+        self._write("\r", end="\n")
+
+    def _write(self, prefix: str, end: str = ""):
+        if not self.enabled:
+            return
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        done = self.ok + self.failed
+        self.stream.write(
+            f"{prefix}{done} locations ({self.ok} ok, {self.failed} failed) "
+            f"in {elapsed:.1f}s, {done / elapsed:.1f}/s{end}"
+        )
+        self.stream.flush()
+
+
+class BatchFetcher:
+    """Resolves and fetches locations in bounded, concurrent batches."""
+
+    GEOCODE_CACHE_SIZE = 4096
+
+    def __init__(self, service: WeatherService, use_fahrenheit: Optional[bool] = None,
+                 batch_size: int = 50, workers: int = 4,
+                 sections: Iterable[str] = SECTIONS):
+        """
+        Initialize the fetcher.
+
+        Args:
+            service: Service used for geocoding, caching and batch fetches
+            use_fahrenheit: Units; defaults to the user's setting
+            batch_size: Locations per upstream request
+            workers: Batches fetched concurrently
+            sections: Forecast sections included in each record
+        """
+        self.service = service
+        self.use_fahrenheit = use_fahrenheit
+        self.batch_size = max(1, min(batch_size, service.weather_client.MAX_BATCH))
+        self.workers = max(1, workers)
+        self.sections = set(sections)
+        self._geocoded: 'OrderedDict[str, Location]' = OrderedDict()
+        self._geocode_lock = threading.Lock()
+
+    def run(self, lines: Iterable[Tuple[int, str]], out: IO[str],
+            progress: Optional[_Progress] = None,
+            exporter: Optional[ForecastExporter] = None) -> Tuple[int, int]:
+        """
+        Fetch every line and write one JSON record per location to ``out``.
+
+        Forecasts are also handed to ``exporter`` (on this thread) if given.
+
+        Returns:
+            (succeeded, failed) counts
+        """
+        ok = failed = 0
+        window = self.workers * 2  # Batches read ahead of the output
+        lines = iter(lines)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch") as executor:
+            pending = set()
+            while True:
+                batch = list(islice(lines, self.batch_size))
+                if batch:
+                    pending.add(executor.submit(self._fetch_batch, batch))
+                if not pending:
+                    break
+                if batch and len(pending) < window:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results = future.result()
+                    for record, weather, location in results:
+                        out.write(json.dumps(record, separators=(",", ":")))
+                        out.write("\n")
+                        if exporter is not None and weather is not None:
+                            exporter.write(weather, location)
+                    out.flush()
+                    batch_failed = sum(1 for r, _, _ in results if "error" in r)
+                    ok += len(results) - batch_failed
+                    failed += batch_failed
+                    if progress is not None:
+                        progress.add(len(results) - batch_failed, batch_failed)
+        return ok, failed
+
+    def _fetch_batch(self, batch: List[Tuple[int, str]]) -> List[_Result]:
+        """Resolve and fetch one batch (worker thread)."""
+        records: List[dict] = []
+        resolved: List[Tuple[dict, Location]] = []
+        for number, line in batch:
+            record = {"line": number, "input": line}
+            records.append(record)
+            try:
+                resolved.append((record, self._resolve(line)))
+            except (LookupError, ValueError) as e:
+                record["error"] = str(e)
+
+        try:
+            # One-off sites stay out of the usage statistics, so the menu's
+            # prefetcher never warms them
+            weathers = self.service.get_weather_batch(
+                [location for _, location in resolved], self.use_fahrenheit
+            )
+        except WeatherServiceError as e:
+            for record, _ in resolved:
+                record["error"] = str(e)
+            return [(record, None, None) for record in records]
+
+        fetched = {}
+        for (record, location), weather in zip(resolved, weathers):
+            data = weather.to_dict()
+            record["location"] = location.to_dict()
+            record["fetched_at"] = data["fetched_at"]
+            for section in SECTIONS:
+                if section in self.sections and section in data:
+                    record[section] = data[section]
+            fetched[id(record)] = (weather, location)
+        return [(record, *fetched.get(id(record), (None, None))) for record in records]
+
+    def _resolve(self, line: str) -> Location:
+        location, query = parse_location_line(line)
+        if location is not None:
+            return location
+
+        key = query.lower()
+        with self._geocode_lock:
+            cached = self._geocoded.get(key)
+            if cached is not None:
+                self._geocoded.move_to_end(key)
+                return cached
+        matches = self.service.search_locations(query)
+        if not matches:
+            raise LookupError(f"No location found for '{query}'")
+        with self._geocode_lock:
+            self._geocoded[key] = matches[0]
+            while len(self._geocoded) > self.GEOCODE_CACHE_SIZE:
+                self._geocoded.popitem(last=False)
+        return matches[0]
+
+
+def _open_input(path: str) -> Optional[IO[str]]:
+    """The input file ("-" for stdin), or None after logging why it cannot be read."""
+    if path == "-":
+        return sys.stdin
+    try:
+        return open(path, "r")
+    except OSError as e:
+        logger.error("Cannot read %s: %s", path, e)
+        return None
+
+
+def _fetch_command(args) -> int:
+    stream = _open_input(args.input)
+    if stream is None:
+        return 2
+    service = WeatherService(SettingsService())
+    use_f = None if args.units is None else args.units == "fahrenheit"
+    fetcher = BatchFetcher(
+        service, use_fahrenheit=use_f, batch_size=args.batch_size,
+        workers=args.workers, sections=args.sections.split(","),
+    )
+    progress = _Progress(sys.stderr, enabled=not args.quiet)
+    exporter = None
+    if args.export:
+        try:
+            exporter = ForecastExporter(args.export, fmt=args.export_format)
+        except ExportError as e:
+            logger.error("%s", e)
+            if stream is not sys.stdin:
+                stream.close()
+            return 2
+    pool = None
+    if args.decode_processes:
+        pool = DecodePool(args.decode_processes if args.decode_processes > 0 else None)
+        service.weather_client.decode_pool = pool
+
+    try:
+        ok, failed = fetcher.run(read_lines(stream), sys.stdout, progress, exporter)
+    except BrokenPipeError:
+        return 1  # Downstream consumer went away
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if exporter is not None:
+            exporter.close()
+        if pool is not None:
+            pool.shutdown()
+    progress.finish()
+    logger.info("Fetch finished: %d ok, %d failed", ok, failed)
+    return 0 if failed == 0 else 2
+
+
+def _backfill_command(args) -> int:
+    from .api.geocoding_client import GeocodingClient, GeocodingError
+
+    stream = _open_input(args.input)
+    if stream is None:
+        return 2
+    geocoder = GeocodingClient()
+    locations = []
+    try:
+        for number, line in read_lines(stream):
+            try:
+                location, query = parse_location_line(line)
+                if location is None:
+                    matches = geocoder.search(query, count=1)
+                    if not matches:
+                        raise LookupError(f"No location found for '{query}'")
+                    location = matches[0]
+            except (LookupError, ValueError, GeocodingError) as e:
+                logger.error("Line %d: %s", number, e)
+                return 2
+            locations.append(location)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    def progress(written: int, failed: int, rows: int):
+        if not args.quiet:
+            sys.stderr.write(f"\r{written} chunks written, {failed} failed, {rows} rows")
+            sys.stderr.flush()
+
+    try:
+        backfill = Backfill(
+            args.out, locations, date.fromisoformat(args.start), date.fromisoformat(args.end),
+            hourly=None if args.hourly is None else [v for v in args.hourly.split(",") if v],
+            daily=None if args.daily is None else [v for v in args.daily.split(",") if v],
+            use_fahrenheit=args.units == "fahrenheit", fmt=args.format,
+            chunk_days=args.chunk_days, locations_per_chunk=args.locations_per_chunk,
+            workers=args.workers, rate=args.rate,
+        )
+        written, failed, rows = backfill.run(progress)
+    except (BackfillError, ExportError, ValueError) as e:
+        logger.error("%s", e)
+        return 2
+    except KeyboardInterrupt:
+        logger.warning("Backfill interrupted; rerun the same command to resume")
+        return 130
+    if not args.quiet:
+        sys.stderr.write("\n")
+    return 0 if failed == 0 else 2
+
+
+def _terminal_command(args) -> int:
+    from .ui.terminal import run
+
+    try:
+        run(layout=args.layout, interval=args.interval)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run a command."""
+    parser = argparse.ArgumentParser(prog="python -m weather_app", description="WeatherBar tools")
+    parser.add_argument("--debug", action="store_true", help="Verbose logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="Fetch weather for many locations as NDJSON")
+    fetch.add_argument("input", nargs="?", default="-",
+                       help="File with one 'lat,lon[,name]' or place name per line (default: stdin)")
+    fetch.add_argument("--units", choices=("fahrenheit", "celsius"), default=None,
+                       help="Temperature units (default: from settings)")
+    fetch.add_argument("--batch-size", type=int, default=50, help="Locations per upstream request")
+    fetch.add_argument("--workers", type=int, default=4, help="Concurrent batch requests")
+    fetch.add_argument("--decode-processes", type=int, default=0, metavar="N",
+                       help="Decode large responses on N worker processes (-1: one per CPU; default: off)")
+    fetch.add_argument("--sections", default=",".join(SECTIONS),
+                       help=f"Comma-separated sections to include ({', '.join(SECTIONS)})")
+    fetch.add_argument("--export", metavar="DIR", default=None,
+                       help="Also write hourly/daily forecasts as columnar files to DIR")
+    fetch.add_argument("--export-format", choices=FORMATS, default=None,
+                       help="Columnar format (default: parquet with pyarrow, else csv)")
+    fetch.add_argument("--quiet", action="store_true", help="No progress on stderr")
+    fetch.set_defaults(handler=_fetch_command)
+
+    backfill = commands.add_parser("backfill", help="Load historical weather into a columnar store")
+    backfill.add_argument("input", nargs="?", default="-",
+                          help="File with one 'lat,lon[,name]' or place name per line (default: stdin)")
+    backfill.add_argument("--start", required=True, help="First day (YYYY-MM-DD)")
+    backfill.add_argument("--end", required=True, help="Last day (YYYY-MM-DD)")
+    backfill.add_argument("--out", metavar="DIR", required=True,
+                          help="Store directory; rerun with the same arguments to resume")
+    backfill.add_argument("--format", choices=FORMATS, default=None,
+                          help="Columnar format (default: parquet with pyarrow, else csv)")
+    backfill.add_argument("--hourly", default=None,
+                          help="Comma-separated hourly variables ('' for none)")
+    backfill.add_argument("--daily", default=None,
+                          help="Comma-separated daily variables ('' for none)")
+    backfill.add_argument("--units", choices=("fahrenheit", "celsius"), default="celsius")
+    backfill.add_argument("--chunk-days", type=int, default=366, help="Days per upstream request")
+    backfill.add_argument("--locations-per-chunk", type=int, default=10,
+                          help="Locations per upstream request")
+    backfill.add_argument("--workers", type=int, default=4, help="Concurrent requests")
+    backfill.add_argument("--rate", type=float, default=2.0,
+                          help="Requests per second across workers (0 for no limit)")
+    backfill.add_argument("--quiet", action="store_true", help="No progress on stderr")
+    backfill.set_defaults(handler=_backfill_command)
+
+    terminal = commands.add_parser("terminal", help="Show the forecast in a terminal (ticker or panel)")
+    terminal.add_argument("--layout", choices=("line", "panel"), default="panel",
+                          help="One-line ticker or full-screen panel (default: panel)")
+    terminal.add_argument("--interval", type=float, default=None,
+                          help="Seconds between refreshes (default: from settings)")
+    # Warnings on stderr would land in the middle of the drawing
+    terminal.set_defaults(handler=_terminal_command, log_console=False)
+
+    args = parser.parse_args(argv)
+    setup_logging(debug=args.debug, console=getattr(args, "log_console", True))
+    start_exporter()
+    return args.handler(args)
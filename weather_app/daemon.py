@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""WeatherBar daemon - headless shared weather cache.
+
+Owns one WeatherService (and so one set of caches and one upstream fetch
+per key) and serves it over a Unix domain socket to any number of local
+clients: the menu bar, scripts, status-line widgets. Messages are
+length-prefixed JSON frames (see ``utils.framing``).
+
+Requests carry an ``op`` and an optional ``id`` that is echoed back:
+
+    {"op": "ping"}
+    {"op": "location"}                        configured/detected location
+    {"op": "search", "query": "Paris"}        geocoding lookup
+    {"op": "weather", "latitude": .., "longitude": .., "name": .., "units": "celsius"}
+    {"op": "subscribe", ...same as weather...} push a frame on every change
+    {"op": "unsubscribe"}
+
+Responses are ``{"id", "ok": true, "result"}`` or ``{"id", "ok": false,
+"error", "code"}``; subscription pushes are ``{"event": "weather", "key",
+"result"}``. Connections beyond ``max_connections`` and upstream work
+beyond ``max_pending`` are shed with a ``busy``/``overloaded`` error
+instead of queueing. Weather requests count against ``max_pending`` only
+when they start a new upstream fetch: cache hits and requests joining a
+fetch already running for the same cell are always answered.
+
+A daemon holds an ``InstanceLock`` next to its socket while serving, so a
+second daemon started on the same path exits instead of taking it over.
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+# Add parent directory to path for imports when running directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_app.models.location import Location
+from weather_app.services.prefetch_service import Prefetcher
+from weather_app.services.settings_service import SettingsService
+from weather_app.services.weather_service import WeatherService, WeatherServiceBusy, WeatherServiceError
+from weather_app.utils.framing import FrameError, recv_frame, send_frame
+from weather_app.utils.instance import InstanceError, InstanceLock
+from weather_app.utils.logger import setup_logging, get_logger
+from weather_app.utils.metrics import counter, gauge, start_exporter
+
+logger = get_logger(__name__)
+
+SOCKET_ENV = "WEATHERBAR_SOCKET"
+DEFAULT_SOCKET = SettingsService.SETTINGS_DIR / "weatherbar.sock"
+
+CONNECTIONS = gauge("weatherbar_daemon_connections", "Open daemon client connections")
+SUBSCRIPTIONS = gauge("weatherbar_daemon_subscriptions", "Active change subscriptions")
+REQUESTS = counter("weatherbar_daemon_requests_total", "Daemon requests by op and outcome", ["op", "outcome"])
+SHED = counter("weatherbar_daemon_shed_total", "Connections or requests refused under load", ["reason"])
+PUSHES = counter("weatherbar_daemon_pushes_total", "Subscription frames pushed to clients")
+
+
+def socket_path() -> Path:
+    """Socket path, overridable through WEATHERBAR_SOCKET."""
+    return Path(os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET)
+
+
+class _Client:
+    """One connected client."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.subscription: Optional[Tuple[tuple, Location, bool]] = None
+        self._send_lock = threading.Lock()
+
+    def send(self, message: dict) -> bool:
+        """Send a frame; False if the client has gone away."""
+        try:
+            with self._send_lock:
+                send_frame(self.sock, message)
+            return True
+        except (OSError, FrameError) as e:
+            logger.debug("Dropping client: %s", e)
+            return False
+
+
+class WeatherDaemon:
+    """Serves a shared WeatherService over a Unix domain socket."""
+
+    SLOTTED_OPS = ("location", "search")  # Hold a slot for the whole request
+
+    def __init__(self, path: Path, weather_service: Optional[WeatherService] = None,
+                 max_connections: int = 64, max_pending: int = 16,
+                 idle_timeout: float = 300.0, refresh_seconds: Optional[float] = None):
+        """
+        Initialize the daemon.
+
+        Args:
+            path: Socket path
+            weather_service: Service to share; a new one by default
+            max_connections: Open connections allowed before new ones are refused
+            max_pending: Upstream fetches (and location or search requests)
+                handled concurrently before new ones are shed
+            idle_timeout: Seconds a non-subscribed client may stay silent
+            refresh_seconds: Subscription refresh period; defaults to the
+                update interval in settings
+        """
+        self.path = Path(path)
+        self.settings_service = SettingsService()
+        self.weather_service = weather_service or WeatherService(self.settings_service)
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.refresh_seconds = refresh_seconds
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._clients: Set[_Client] = set()
+        self._last_pushed: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        # Held while serving, so a second daemon cannot take over a live socket
+        self._instance = InstanceLock(self.path.parent, self.path.name)
+        self._location: Optional[Tuple[float, Location]] = None
+        self._prefetcher = Prefetcher(self.weather_service)
+
+    def start(self) -> 'WeatherDaemon':
+        """
+        Bind the socket and start the accept and refresh threads.
+
+        Raises:
+            InstanceError: If another daemon is serving on the same path
+        """
+        if not self._instance.acquire():
+            pid = self._instance.owner_pid()
+            raise InstanceError(f"Another daemon (pid {pid}) is serving on {self.path}")
+        if self.path.exists():
+            self.path.unlink()  # Stale socket from a previous run
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(str(self.path))
+        os.chmod(self.path, 0o600)
+        self._listener.listen(self.max_connections)
+        threading.Thread(target=self._accept_loop, name="daemon-accept", daemon=True).start()
+        threading.Thread(target=self._refresh_loop, name="daemon-refresh", daemon=True).start()
+        self._prefetcher.start()
+        logger.info("Daemon listening on %s", self.path)
+        return self
+
+    def serve_forever(self):
+        """Start and block until stopped."""
+        self.start()
+        self._stop.wait()
+
+    def stop(self):
+        """Close the listener and every client."""
+        self._stop.set()
+        if not self._instance.held:
+            return  # Never started; the socket may belong to another daemon
+        self._prefetcher.stop()
+        if self._listener is not None:
+            self._listener.close()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.sock.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+        self._instance.release()
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            client = _Client(sock)
+            with self._lock:
+                full = len(self._clients) >= self.max_connections
+                if not full:
+                    self._clients.add(client)
+                    CONNECTIONS.set(len(self._clients))
+            if full:
+                SHED.inc(reason="connections")
+                client.send({"ok": False, "error": "Too many connections", "code": "busy"})
+                sock.close()
+                continue
+            threading.Thread(target=self._serve_client, args=(client,),
+                             name="daemon-client", daemon=True).start()
+
+    def _serve_client(self, client: _Client):
+        try:
+            while not self._stop.is_set():
+                # Subscribers may stay silent for as long as they like
+                client.sock.settimeout(None if client.subscription else self.idle_timeout)
+                request = recv_frame(client.sock)
+                if request is None:
+                    return
+                if not client.send(self._handle(client, request)):
+                    return
+        except socket.timeout:
+            logger.debug("Closing idle client")
+        except (OSError, FrameError) as e:
+            logger.debug("Client error: %s", e)
+        finally:
+            with self._lock:
+                self._clients.discard(client)
+                CONNECTIONS.set(len(self._clients))
+                SUBSCRIPTIONS.set(sum(1 for c in self._clients if c.subscription))
+            client.sock.close()
+
+    def _handle(self, client: _Client, request) -> dict:
+        """Run one request and build its response."""
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Request must be an object", "code": "bad_request"}
+        op = request.get("op")
+        response = {"id": request.get("id")}
+
+        # Weather requests take a slot only for a fetch they start (see _dispatch)
+        slotted = op in self.SLOTTED_OPS
+        if slotted and not self._pending.acquire(blocking=False):
+            return self._shed(response, op)
+        try:
+            result = self._dispatch(client, op, request)
+            REQUESTS.inc(op=str(op), outcome="ok")
+            return dict(response, ok=True, result=result)
+        except (KeyError, TypeError, ValueError) as e:
+            REQUESTS.inc(op=str(op), outcome="bad_request")
+            return dict(response, ok=False, error=f"Bad request: {e}", code="bad_request")
+        except WeatherServiceBusy:
+            return self._shed(response, op)
+        except WeatherServiceError as e:
+            REQUESTS.inc(op=str(op), outcome="upstream")
+            return dict(response, ok=False, error=str(e), code="upstream")
+        finally:
+            if slotted:
+                self._pending.release()
+
+    @staticmethod
+    def _shed(response: dict, op) -> dict:
+        SHED.inc(reason="pending")
+        REQUESTS.inc(op=str(op), outcome="shed")
+        return dict(response, ok=False, error="Daemon overloaded", code="overloaded", retry_after=1)
+
+    def _dispatch(self, client: _Client, op: str, request: dict):
+        if op == "ping":
+            return "pong"
+        if op == "location":
+            return self._current_location().to_dict()
+        if op == "search":
+            return [loc.to_dict() for loc in self.weather_service.search_locations(str(request["query"]))]
+        if op == "weather":
+            location, use_f = self._target(request)
+            return self.weather_service.get_weather_at(location, use_f, source="daemon",
+                                                       fetch_slots=self._pending).to_dict()
+        if op == "subscribe":
+            location, use_f = self._target(request)
+            weather = self.weather_service.get_weather_at(location, use_f, source="daemon",
+                                                          fetch_slots=self._pending)
+            key = (location.latitude, location.longitude, use_f)
+            with self._lock:
+                client.subscription = (key, location, use_f)
+                self._last_pushed.setdefault(key, weather)
+                SUBSCRIPTIONS.set(sum(1 for c in self._clients if c.subscription))
+            return {"key": list(key), "weather": weather.to_dict()}
+        if op == "unsubscribe":
+            with self._lock:
+                client.subscription = None
+                SUBSCRIPTIONS.set(sum(1 for c in self._clients if c.subscription))
+            return None
+        raise ValueError(f"unknown op {op!r}")
+
+    def _target(self, request: dict) -> Tuple[Location, Optional[bool]]:
+        """Location and units named by a weather/subscribe request."""
+        units = request.get("units")
+        use_f = None if units is None else units == "fahrenheit"
+        if "latitude" not in request:
+            return self._current_location(), use_f
+        location = Location(
+            name=request.get("name") or f"{float(request['latitude']):.4f}, {float(request['longitude']):.4f}",
+            latitude=float(request["latitude"]),
+            longitude=float(request["longitude"]),
+            country=request.get("country", ""),
+            timezone=request.get("timezone", "auto"),
+        )
+        return location, use_f
+
+    def _current_location(self) -> Location:
+        """Configured location, re-detected at most once per refresh period."""
+        with self._lock:
+            cached = self._location
+        if cached is not None and time.monotonic() - cached[0] < self._refresh_period():
+            return cached[1]
+        location = self.weather_service.get_location()
+        with self._lock:
+            self._location = (time.monotonic(), location)
+        return location
+
+    def _refresh_period(self) -> float:
+        if self.refresh_seconds is not None:
+            return self.refresh_seconds
+        return max(60.0, self.settings_service.load().update_interval_minutes * 60)
+
+    def _refresh_loop(self):
+        """Refresh subscribed keys and push changes."""
+        while not self._stop.wait(self._refresh_period()):
+            with self._lock:
+                targets = {c.subscription[0]: c.subscription for c in self._clients if c.subscription}
+            for key, (_, location, use_f) in targets.items():
+                try:
+                    weather = self.weather_service.get_weather_at(location, use_f)
+                except WeatherServiceError as e:
+                    logger.warning("Refresh failed for %s: %s", location.display_name, e)
+                    continue
+                with self._lock:
+                    if self._last_pushed.get(key) is weather:
+                        continue  # Unchanged upstream data returns the same object
+                    self._last_pushed[key] = weather
+                self._push(key, weather)
+            with self._lock:
+                self._last_pushed = {k: v for k, v in self._last_pushed.items() if k in targets}
+
+    def _push(self, key: tuple, weather):
+        message = {"event": "weather", "key": list(key), "result": weather.to_dict()}
+        with self._lock:
+            subscribers = [c for c in self._clients if c.subscription and c.subscription[0] == key]
+        for client in subscribers:
+            if client.send(message):
+                PUSHES.inc()
+            else:
+                client.sock.close()
+
+
+def request(op: str, path: Optional[Path] = None, timeout: float = 30.0, **params) -> dict:
+    """
+    Send one request to a running daemon.
+
+    Args:
+        op: Operation name
+        path: Socket path (default: socket_path())
+        timeout: Seconds to wait for the response
+        **params: Request fields
+
+    Returns:
+        The response frame
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path or socket_path()))
+        send_frame(sock, dict(params, op=op))
+        response = recv_frame(sock)
+    if response is None:
+        raise FrameError("Daemon closed the connection")
+    return response
+
+
+def main():
+    """Daemon entry point."""
+    parser = argparse.ArgumentParser(description="Serve WeatherBar data over a Unix socket")
+    parser.add_argument("--socket", type=Path, default=None,
+                        help=f"Socket path (default: ${SOCKET_ENV} or {DEFAULT_SOCKET})")
+    parser.add_argument("--max-connections", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=16,
+                        help="Concurrent requests before new ones are shed")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    setup_logging(debug=args.debug)
+    logger.info("Starting WeatherBar daemon")
+    start_exporter()
+
+    daemon = WeatherDaemon(
+        args.socket or socket_path(),
+        max_connections=args.max_connections,
+        max_pending=args.max_pending,
+    )
+    try:
+        daemon.serve_forever()
+    except InstanceError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        logger.info("Daemon interrupted by user")
+    finally:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,10 @@ import os
 # Add parent directory to path for imports when running directly
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from weather_app.services.settings_service import SettingsService
+from weather_app.utils.instance import InstanceError, InstanceLock, claim_instance
 from weather_app.utils.logger import setup_logging, get_logger
-from weather_app.app import run
+from weather_app.utils.metrics import start_exporter
 
 
 def main():
@@ -22,13 +24,28 @@ def main():
 
     logger.info("Starting WeatherBar application")
 
+    # Replace any running instance, taking over its caches and schedule
+    instance = InstanceLock(SettingsService.SETTINGS_DIR, "menubar")
     try:
-        run()
+        handoff = claim_instance(instance)
+    except InstanceError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    if handoff is not None:
+        logger.info("Took over from the previous instance")
+
+    # Export metrics if WEATHERBAR_METRICS_FILE or WEATHERBAR_METRICS_PORT is set
+    start_exporter()
+
+    try:
+        # Imported after logging is up so import failures are logged
+        from weather_app.app import run
+        run(instance, handoff)
     except KeyboardInterrupt:
         logger.info("Application interrupted by user")
         sys.exit(0)
     except Exception as e:
-        logger.exception(f"Fatal error: {e}")
+        logger.exception("Fatal error: %s", e)
         sys.exit(1)
 
 
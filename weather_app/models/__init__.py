@@ -1,5 +1,10 @@
 from .location import Location
 from .settings import Settings
+from .nowcast import NowcastBuffer
+from .alert import Alert, AlertRule, AlertRuleError
+from .usage import LocationUsage
+from .ensemble import EnsembleSummary
+from .air_quality import AirQuality
 from .weather_data import CurrentWeather, HourlyForecast, DailyForecast, CompleteWeatherData
 
 __all__ = [
@@ -8,5 +13,12 @@ __all__ = [
     'CurrentWeather',
     'HourlyForecast',
     'DailyForecast',
-    'CompleteWeatherData'
+    'CompleteWeatherData',
+    'NowcastBuffer',
+    'Alert',
+    'AlertRule',
+    'AlertRuleError',
+    'LocationUsage',
+    'EnsembleSummary',
+    'AirQuality'
 ]
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import Dict, Optional
+
+
+@dataclass
+class AirQuality:
+    """Current air quality and pollen."""
+    us_aqi: Optional[float]
+    european_aqi: Optional[float]
+    pm2_5: Optional[float]  # µg/m³
+    pm10: Optional[float]  # µg/m³
+    pollen: Dict[str, Optional[float]]  # grains/m³ by plant; None outside the pollen model's area
+    timestamp: datetime
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def from_api_response(cls, current_data: dict) -> 'AirQuality':
+        """Create from the ``current`` block of an Open-Meteo air-quality response."""
+        return cls(
+            us_aqi=current_data.get('us_aqi'),
+            european_aqi=current_data.get('european_aqi'),
+            pm2_5=current_data.get('pm2_5'),
+            pm10=current_data.get('pm10'),
+            pollen={
+                name[:-len('_pollen')]: value
+                for name, value in current_data.items() if name.endswith('_pollen')
+            },
+            timestamp=datetime.fromisoformat(current_data.get('time', datetime.now().isoformat()))
+        )
+
+    @property
+    def pollen_levels(self) -> Dict[str, float]:
+        """Pollen counts that are reported and above zero, highest first."""
+        levels = {name: value for name, value in self.pollen.items() if value}
+        return dict(sorted(levels.items(), key=lambda item: -item[1]))
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        data['fetched_at'] = self.fetched_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AirQuality':
+        """Create AirQuality from dictionary."""
+        return cls(**dict(
+            data,
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            fetched_at=datetime.fromisoformat(data['fetched_at']),
+        ))
@@ -0,0 +1,146 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+# Friendly column names -> (series, Open-Meteo column)
+COLUMN_ALIASES = {
+    "temp": ("hourly", "temperature_2m"),
+    "temperature": ("hourly", "temperature_2m"),
+    "precip probability": ("hourly", "precipitation_probability"),
+    "precipitation probability": ("hourly", "precipitation_probability"),
+    "precip": ("hourly", "precipitation_probability"),
+    "rain chance": ("hourly", "precipitation_probability"),
+    "chance of rain": ("hourly", "precipitation_probability"),
+    "weather code": ("hourly", "weather_code"),
+    "high": ("daily", "temperature_2m_max"),
+    "max temp": ("daily", "temperature_2m_max"),
+    "low": ("daily", "temperature_2m_min"),
+    "min temp": ("daily", "temperature_2m_min"),
+    "uv": ("daily", "uv_index_max"),
+    "uv index": ("daily", "uv_index_max"),
+    "daily precip probability": ("daily", "precipitation_probability_max"),
+}
+
+HOURLY_COLUMNS = ("temperature_2m", "weather_code", "precipitation_probability")
+DAILY_COLUMNS = (
+    "temperature_2m_max", "temperature_2m_min", "weather_code",
+    "precipitation_probability_max", "uv_index_max",
+)
+
+_OPERATORS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+}
+
+_NUMBER = r"(?P<value>-?\d+(?:\.\d+)?)\s*(?:%|°\s*[fc]?|deg(?:rees)?)?"
+_WINDOW = r"(?:within|in|next)\s+(?:the\s+next\s+)?(?P<n>\d+(?:\.\d+)?)\s*(?P<unit>h|hrs?|hours?|d|days?)"
+
+_THRESHOLD_RULE = re.compile(
+    rf"^(?P<column>[a-z_0-9 ]+?)\s*(?P<op>>=|<=|==|>|<|=)\s*{_NUMBER}\s+{_WINDOW}$"
+)
+_CHANGE_RULE = re.compile(
+    rf"^(?P<column>[a-z_0-9 ]+?)\s+(?P<direction>drops|falls|decreases|rises|climbs|increases)"
+    rf"\s+(?:by\s+)?{_NUMBER}\s+{_WINDOW}$"
+)
+
+
+def _resolve_column(name: str):
+    """Map a rule's column name to its (series, Open-Meteo column)."""
+    alias = " ".join(name.replace("_", " ").split())
+    if alias in COLUMN_ALIASES:
+        return COLUMN_ALIASES[alias]
+    raw = alias.replace(" ", "_")
+    if raw in HOURLY_COLUMNS:
+        return "hourly", raw
+    if raw in DAILY_COLUMNS:
+        return "daily", raw
+    raise AlertRuleError(f"Unknown column '{name}'")
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """A user-defined alert compiled from text such as "precip probability > 60% within 3h"."""
+    text: str
+    series: str  # "hourly" or "daily"
+    column: str  # Open-Meteo column name
+    kind: str  # "threshold" or "change"
+    op: str  # Comparison operator, or "drops"/"rises" for change rules
+    value: float
+    window_hours: float
+
+    @classmethod
+    def parse(cls, text: str) -> 'AlertRule':
+        """
+        Compile a rule from its text form.
+
+        Raises:
+            AlertRuleError: If the text is not a supported rule
+        """
+        normalized = " ".join(text.lower().split())
+        m = _THRESHOLD_RULE.match(normalized)
+        kind = "threshold"
+        if m is None:
+            m = _CHANGE_RULE.match(normalized)
+            kind = "change"
+        if m is None:
+            raise AlertRuleError(f"Unrecognised alert rule: '{text}'")
+
+        series, column = _resolve_column(m.group("column").strip())
+        n = float(m.group("n"))
+        window_hours = n * 24 if m.group("unit").startswith("d") else n
+
+        if kind == "threshold":
+            op = m.group("op")
+        else:
+            op = "drops" if m.group("direction") in ("drops", "falls", "decreases") else "rises"
+
+        return cls(
+            text=text.strip(), series=series, column=column, kind=kind,
+            op=op, value=float(m.group("value")), window_hours=window_hours,
+        )
+
+    @property
+    def rule_id(self) -> str:
+        """Stable identifier used for deduplication."""
+        return f"{self.series}:{self.column}:{self.kind}:{self.op}:{self.value:g}:{self.window_hours:g}"
+
+    def predicate(self) -> Callable[..., bool]:
+        """
+        Compiled test for this rule.
+
+        Threshold rules take one value; change rules take (start, end) values.
+        """
+        if self.kind == "threshold":
+            compare = _OPERATORS[self.op]
+            limit = self.value
+            return lambda v: v is not None and compare(v, limit)
+        if self.op == "drops":
+            delta = -abs(self.value)
+            return lambda a, b: a is not None and b is not None and b - a <= delta
+        delta = abs(self.value)
+        return lambda a, b: a is not None and b is not None and b - a >= delta
+
+
+@dataclass
+class Alert:
+    """A rule match that should be shown to the user once."""
+    rule: AlertRule
+    location_name: str
+    event_time: datetime
+    value: Optional[float] = None
+
+    @property
+    def message(self) -> str:
+        when = self.event_time.strftime("%a %-I %p") if self.rule.series == "hourly" \
+            else self.event_time.strftime("%a")
+        return f"{self.rule.text} (from {when})"
+
+
+class AlertRuleError(Exception):
+    """Exception raised when an alert rule cannot be parsed."""
+    pass
@@ -0,0 +1,65 @@
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class EnsembleSummary:
+    """Spread of a multi-model or ensemble forecast over the next hours."""
+    source: str  # Models requested, e.g. "gfs_seamless,icon_seamless" or "ensemble:icon_seamless"
+    members: int
+    time: List[datetime]
+    temperature_p10: List[Optional[float]]
+    temperature_p50: List[Optional[float]]
+    temperature_p90: List[Optional[float]]
+    temperature_spread: List[Optional[float]]  # Standard deviation across members
+    temperature_agreement: List[Optional[float]]  # Share of members near the median
+    precipitation_p10: List[Optional[float]]
+    precipitation_p90: List[Optional[float]]
+    precipitation_probability: List[Optional[int]]  # % of members with measurable precipitation
+    precipitation_agreement: List[Optional[float]]  # Share of members on the majority side
+    window_hours: int = 6
+    window_wet_members: int = 0  # Members with measurable precipitation in the window
+    window_total_p10: Optional[float] = None  # Precipitation totals over the window
+    window_total_p90: Optional[float] = None
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+    def temperature_band(self, hours: Optional[int] = None) -> Optional[Tuple[float, float, float]]:
+        """
+        Temperature range and mean agreement over the next hours.
+
+        Returns:
+            (lowest p10, highest p90, mean agreement), or None without data
+        """
+        hours = hours or self.window_hours
+        lows = [v for v in self.temperature_p10[:hours] if v is not None]
+        highs = [v for v in self.temperature_p90[:hours] if v is not None]
+        agreement = [v for v in self.temperature_agreement[:hours] if v is not None]
+        if not lows or not highs:
+            return None
+        return min(lows), max(highs), sum(agreement) / len(agreement) if agreement else 0.0
+
+    def band_at(self, when: datetime) -> Optional[Tuple[float, float]]:
+        """Temperature p10 and p90 for the step starting at ``when``, if covered."""
+        try:
+            i = self.time.index(when)
+        except ValueError:
+            return None
+        low, high = self.temperature_p10[i], self.temperature_p90[i]
+        return None if low is None or high is None else (low, high)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = asdict(self)
+        data['time'] = [t.isoformat() for t in self.time]
+        data['fetched_at'] = self.fetched_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EnsembleSummary':
+        """Create EnsembleSummary from dictionary."""
+        return cls(**dict(
+            data,
+            time=[datetime.fromisoformat(t) for t in data['time']],
+            fetched_at=datetime.fromisoformat(data['fetched_at']),
+        ))
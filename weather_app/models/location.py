@@ -21,8 +21,10 @@ class Location:
             return f"{self.name}, {self.admin1}"
         elif self.admin1:
             return f"{self.name}, {self.admin1}, {self.country}"
-        else:
+        elif self.country:
             return f"{self.name}, {self.country}"
+        else:
+            return self.name
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
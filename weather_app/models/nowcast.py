@@ -0,0 +1,110 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+
+STEP = timedelta(minutes=15)
+_EPOCH = datetime(2000, 1, 1)
+
+
+def _slot_number(t: datetime) -> int:
+    """Index of the 15-minute step containing ``t``."""
+    return (t - _EPOCH) // STEP
+
+
+class NowcastBuffer:
+    """
+    Fixed-size ring of 15-minute precipitation and temperature slots.
+
+    Each refresh is merged in place: a step always lands in the same cell
+    (its step number modulo the capacity), so newer values overwrite older
+    ones and steps that fall out of the window are reused without any
+    allocation.
+
+    Steps are keyed on the location's wall-clock time, as the API returns
+    them; ``local_time`` converts this machine's clock to that time.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self.utc_offset_seconds: Optional[int] = None  # Location's offset, from the last response
+        self._steps: List[Optional[int]] = [None] * capacity
+        self._precipitation = [0.0] * capacity
+        self._temperature = [0.0] * capacity
+        self._lock = threading.Lock()
+
+    def merge(self, times: Sequence[str], precipitation: Sequence[Optional[float]],
+              temperature: Sequence[Optional[float]],
+              utc_offset_seconds: Optional[int] = None) -> int:
+        """
+        Merge a ``minutely_15`` response section into the buffer.
+
+        Args:
+            times: ISO timestamps (location-local)
+            precipitation: Precipitation per step
+            temperature: Temperature per step
+            utc_offset_seconds: The response's ``utc_offset_seconds``, if known
+
+        Returns:
+            Number of steps written
+        """
+        written = 0
+        with self._lock:
+            if utc_offset_seconds is not None:
+                self.utc_offset_seconds = int(utc_offset_seconds)
+            for i, time_str in enumerate(times):
+                step = _slot_number(datetime.fromisoformat(time_str))
+                cell = step % self.capacity
+                held = self._steps[cell]
+                if held is not None and held > step:
+                    continue  # Cell already holds a later step
+                self._steps[cell] = step
+                p = precipitation[i] if i < len(precipitation) else None
+                t = temperature[i] if i < len(temperature) else None
+                self._precipitation[cell] = p if p is not None else 0.0
+                self._temperature[cell] = t if t is not None else 0.0
+                written += 1
+        return written
+
+    def local_time(self, at: Optional[datetime] = None) -> datetime:
+        """
+        A time on this machine's clock as the location's naive wall-clock time.
+
+        Args:
+            at: Naive local time of this machine (default: now)
+
+        Returns:
+            The same instant in the location's time, or ``at`` unchanged if
+            no response has given the offset yet
+        """
+        if self.utc_offset_seconds is None:
+            return at or datetime.now()
+        instant = at.astimezone(timezone.utc) if at is not None else datetime.now(timezone.utc)
+        return (instant + timedelta(seconds=self.utc_offset_seconds)).replace(tzinfo=None)
+
+    def window(self, start: datetime, steps: int = 8) -> List[Tuple[datetime, Optional[float], Optional[float]]]:
+        """
+        Steps from the one containing ``start`` onwards.
+
+        Args:
+            start: Location-local time (see ``local_time``)
+            steps: Number of 15-minute steps
+
+        Returns:
+            (time, precipitation, temperature) per step; values are None for
+            steps the buffer does not hold
+        """
+        first = _slot_number(start)
+        rows = []
+        with self._lock:
+            for step in range(first, first + min(steps, self.capacity)):
+                cell = step % self.capacity
+                when = _EPOCH + step * STEP
+                if self._steps[cell] == step:
+                    rows.append((when, self._precipitation[cell], self._temperature[cell]))
+                else:
+                    rows.append((when, None, None))
+        return rows
+
+    def precipitation_window(self, start: datetime, steps: int = 8) -> List[Optional[float]]:
+        """Precipitation for the steps from ``start`` (None where unknown)."""
+        return [p for _, p, _ in self.window(start, steps)]
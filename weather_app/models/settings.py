@@ -1,5 +1,5 @@
 from dataclasses import dataclass, asdict, field
-from typing import Optional
+from typing import List, Optional
 from .location import Location
 
 
@@ -11,6 +11,12 @@ class Settings:
     update_interval_minutes: int = 15
     location_mode: str = "auto"  # "auto" or "manual"
     location: Optional[Location] = None
+    alert_rules: List[str] = field(default_factory=list)  # e.g. "precip probability > 60% within 3h"
+    cache_grid_degrees: float = 0.05  # Cache cell size; 0 keys on exact coordinates
+    cache_geohash_precision: int = 0  # > 0 keys on geohash prefixes of this length instead
+    forecast_models: List[str] = field(default_factory=list)  # e.g. ["gfs_seamless", "icon_seamless"]
+    use_ensemble_api: bool = False  # Treat forecast_models as ensemble models (all members)
+    show_air_quality: bool = True  # Fetch AQI, particulates and pollen alongside the forecast
     version: int = 1
 
     def to_dict(self) -> dict:
@@ -21,7 +27,13 @@ class Settings:
             'temperature_unit': self.temperature_unit,
             'update_interval_minutes': self.update_interval_minutes,
             'location_mode': self.location_mode,
-            'location': self.location.to_dict() if self.location else None
+            'location': self.location.to_dict() if self.location else None,
+            'alert_rules': list(self.alert_rules),
+            'cache_grid_degrees': self.cache_grid_degrees,
+            'cache_geohash_precision': self.cache_geohash_precision,
+            'forecast_models': list(self.forecast_models),
+            'use_ensemble_api': self.use_ensemble_api,
+            'show_air_quality': self.show_air_quality
         }
         return data
 
@@ -37,7 +49,13 @@ class Settings:
             temperature_unit=data.get('temperature_unit', 'fahrenheit'),
             update_interval_minutes=data.get('update_interval_minutes', 15),
             location_mode=data.get('location_mode', 'auto'),
-            location=location
+            location=location,
+            alert_rules=list(data.get('alert_rules', [])),
+            cache_grid_degrees=data.get('cache_grid_degrees', 0.05),
+            cache_geohash_precision=data.get('cache_geohash_precision', 0),
+            forecast_models=list(data.get('forecast_models', [])),
+            use_ensemble_api=data.get('use_ensemble_api', False),
+            show_air_quality=data.get('show_air_quality', True)
         )
 
     @classmethod
@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .location import Location
+
+
+@dataclass
+class LocationUsage:
+    """How often, and at what times of day, a location is requested."""
+    RECENT = 6  # Request times kept for predicting the next request
+
+    location: Location
+    use_fahrenheit: bool = True
+    score: float = 0.0  # Request count with exponential decay
+    last_used: float = 0.0  # Unix time
+    hours: List[float] = field(default_factory=lambda: [0.0] * 24)  # Decayed count per local hour
+    sources: Dict[str, int] = field(default_factory=dict)  # e.g. {"manual": 3, "daemon": 10}
+    recent: List[float] = field(default_factory=list)  # Unix times of the last RECENT requests
+    scheduled: bool = False  # The menu is showing this location and refreshes it on its own timer
+
+    @property
+    def key(self) -> str:
+        """Identity used to merge requests for the same place."""
+        return f"{self.location.latitude:.3f},{self.location.longitude:.3f},{int(self.use_fahrenheit)}"
+
+    def record(self, when: float, source: str, half_life_seconds: float, scheduled: bool = False):
+        """Count one request at Unix time ``when``."""
+        decay = 0.5 ** (max(0.0, when - self.last_used) / half_life_seconds) if self.last_used else 1.0
+        self.score = self.score * decay + 1.0
+        self.hours = [h * decay for h in self.hours]
+        self.hours[datetime.fromtimestamp(when).hour] += 1.0
+        self.last_used = when
+        self.sources[source] = self.sources.get(source, 0) + 1
+        self.recent = (self.recent + [when])[-self.RECENT:]
+        self.scheduled = scheduled
+
+    def next_request(self) -> Optional[float]:
+        """
+        Predicted Unix time of the next request: the last one plus the
+        median gap between recent requests, or None with fewer than two gaps.
+        """
+        if len(self.recent) < 3:
+            return None
+        gaps = sorted(b - a for a, b in zip(self.recent, self.recent[1:]))
+        return self.last_used + gaps[len(gaps) // 2]
+
+    def usual_at(self, when: float, min_share: float = 0.15) -> bool:
+        """True if a meaningful share of past requests fell in the hour of ``when``."""
+        total = sum(self.hours)
+        if total < 2:
+            return False
+        return self.hours[datetime.fromtimestamp(when).hour] / total >= min_share
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'location': self.location.to_dict(),
+            'use_fahrenheit': self.use_fahrenheit,
+            'score': self.score,
+            'last_used': self.last_used,
+            'hours': list(self.hours),
+            'sources': dict(self.sources),
+            'recent': list(self.recent),
+            'scheduled': self.scheduled,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LocationUsage':
+        """Create LocationUsage from dictionary."""
+        hours: Optional[List[float]] = data.get('hours')
+        return cls(
+            location=Location.from_dict(data.get('location', {})),
+            use_fahrenheit=data.get('use_fahrenheit', True),
+            score=data.get('score', 0.0),
+            last_used=data.get('last_used', 0.0),
+            hours=list(hours) if hours and len(hours) == 24 else [0.0] * 24,
+            sources=dict(data.get('sources', {})),
+            recent=list(data.get('recent', [])),
+            scheduled=data.get('scheduled', False),
+        )
@@ -1,6 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
+
+from .air_quality import AirQuality
+from .ensemble import EnsembleSummary
+from .nowcast import NowcastBuffer
 
 
 @dataclass
@@ -35,6 +39,17 @@ class CurrentWeather:
             timestamp=datetime.fromisoformat(current_data.get('time', datetime.now().isoformat()))
         )
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CurrentWeather':
+        """Create CurrentWeather from dictionary."""
+        return cls(**dict(data, timestamp=datetime.fromisoformat(data['timestamp'])))
+
 
 @dataclass
 class HourlyForecast:
@@ -54,6 +69,17 @@ class HourlyForecast:
             precipitation_probability=int(precip) if precip is not None else 0
         )
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = asdict(self)
+        data['time'] = self.time.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'HourlyForecast':
+        """Create HourlyForecast from dictionary."""
+        return cls(**dict(data, time=datetime.fromisoformat(data['time'])))
+
 
 @dataclass
 class DailyForecast:
@@ -83,6 +109,21 @@ class DailyForecast:
             sunset=datetime.fromisoformat(sunset_str)
         )
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = asdict(self)
+        for name in ('date', 'sunrise', 'sunset'):
+            data[name] = getattr(self, name).isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DailyForecast':
+        """Create DailyForecast from dictionary."""
+        data = dict(data)
+        for name in ('date', 'sunrise', 'sunset'):
+            data[name] = datetime.fromisoformat(data[name])
+        return cls(**data)
+
 
 @dataclass
 class CompleteWeatherData:
@@ -92,11 +133,57 @@ class CompleteWeatherData:
     daily: List[DailyForecast]
     location_name: str
     fetched_at: datetime = None
+    nowcast: Optional[NowcastBuffer] = None  # Next steps at 15-minute resolution
+    columns: Optional[Dict[str, Dict[str, Sequence]]] = None  # Response arrays by section, as received
+    ensemble: Optional[EnsembleSummary] = None  # Spread across models, when requested
+    air_quality: Optional[AirQuality] = None  # Merged in when its own request completes
 
     def __post_init__(self):
         if self.fetched_at is None:
             self.fetched_at = datetime.now()
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = {
+            'location_name': self.location_name,
+            'fetched_at': self.fetched_at.isoformat(),
+            'current': self.current.to_dict(),
+            'hourly': [h.to_dict() for h in self.hourly],
+            'daily': [d.to_dict() for d in self.daily],
+        }
+        if self.nowcast is not None:
+            data['nowcast'] = [
+                {'time': t.isoformat(), 'precipitation': p, 'temperature': temp}
+                for t, p, temp in self.nowcast.window(self.nowcast.local_time(self.fetched_at))
+            ]
+            if self.nowcast.utc_offset_seconds is not None:
+                data['utc_offset_seconds'] = self.nowcast.utc_offset_seconds
+        if self.ensemble is not None:
+            data['ensemble'] = self.ensemble.to_dict()
+        if self.air_quality is not None:
+            data['air_quality'] = self.air_quality.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CompleteWeatherData':
+        """Create CompleteWeatherData from the output of to_dict."""
+        nowcast = None
+        steps = [s for s in data.get('nowcast') or [] if s.get('precipitation') is not None]
+        if steps:
+            nowcast = NowcastBuffer()
+            nowcast.merge([s['time'] for s in steps], [s['precipitation'] for s in steps],
+                          [s.get('temperature') for s in steps], data.get('utc_offset_seconds'))
+        return cls(
+            current=CurrentWeather.from_dict(data['current']),
+            hourly=[HourlyForecast.from_dict(h) for h in data.get('hourly', [])],
+            daily=[DailyForecast.from_dict(d) for d in data.get('daily', [])],
+            location_name=data.get('location_name', ''),
+            fetched_at=datetime.fromisoformat(data['fetched_at']) if data.get('fetched_at') else None,
+            nowcast=nowcast,
+            ensemble=EnsembleSummary.from_dict(data['ensemble']) if data.get('ensemble') else None,
+            air_quality=AirQuality.from_dict(data['air_quality']) if data.get('air_quality') else None
+        )
+
     @property
     def today(self) -> Optional[DailyForecast]:
         """Get today's forecast."""
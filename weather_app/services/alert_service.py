@@ -0,0 +1,281 @@
+"""Incremental evaluation of user-defined weather alert rules.
+
+Rules are compiled once into predicates over the hourly and daily forecast
+columns. For every location the service keeps the last values it saw per
+column and, per rule, a sorted index of the times where the rule matches.
+A new forecast only re-checks the rows whose values changed (plus, for
+"drops/rises" rules, the start times whose window covers a changed row), so
+an update that moves one hour's numbers costs a handful of comparisons no
+matter how many rules or locations are configured. Window queries such as
+"first match in the next 3 hours" are a bisect into the index.
+"""
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..models.alert import Alert, AlertRule, AlertRuleError
+from ..models.weather_data import CompleteWeatherData
+from ..utils.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+ROWS_RECHECKED = counter(
+    "weatherbar_alert_rows_rechecked_total",
+    "Forecast rows re-evaluated against alert rules after a change",
+    ["series"],
+)
+ALERTS_FIRED = counter("weatherbar_alerts_fired_total", "Alert notifications raised")
+
+# Open-Meteo column -> model attribute
+HOURLY_FIELDS = {
+    'temperature_2m': 'temperature',
+    'weather_code': 'weather_code',
+    'precipitation_probability': 'precipitation_probability',
+}
+DAILY_FIELDS = {
+    'temperature_2m_max': 'temp_high',
+    'temperature_2m_min': 'temp_low',
+    'weather_code': 'weather_code',
+    'precipitation_probability_max': 'precipitation_probability',
+    'uv_index_max': 'uv_index_max',
+}
+
+# Always indexed so next_rain() is a lookup, never a scan
+RAIN_INDEX = AlertRule.parse("precip probability >= 50 within 24h")
+
+_MISSING = object()
+_HISTORY = timedelta(days=2)
+
+
+class _LocationState:
+    """What the service last saw for one location."""
+
+    def __init__(self):
+        self.columns: Dict[Tuple[str, str], Dict[datetime, float]] = {}
+        self.hits: Dict[str, List[datetime]] = {}
+        self.active: Dict[str, datetime] = {}
+        self.fired: Dict[Tuple[str, datetime], datetime] = {}
+
+
+class AlertService:
+    """Evaluates alert rules against each new forecast and reports new matches once."""
+
+    def __init__(self, rules: Iterable[str] = ()):
+        self._rules: List[AlertRule] = []
+        self._predicates: Dict[str, object] = {}
+        self._states: Dict[str, _LocationState] = {}
+        self._lock = threading.Lock()
+        self.set_rules(rules)
+
+    @property
+    def rules(self) -> List[AlertRule]:
+        """Compiled user rules."""
+        return list(self._rules)
+
+    def set_rules(self, texts: Iterable[str]) -> List[str]:
+        """
+        Replace the rule set.
+
+        Invalid rules are logged and skipped. Locations are re-checked in
+        full for any rule that was not in the previous set.
+
+        Args:
+            texts: Rule texts, e.g. "temp drops 15 within 6h"
+
+        Returns:
+            Error messages for rules that could not be parsed
+        """
+        rules, errors = [], []
+        for text in texts:
+            try:
+                rules.append(AlertRule.parse(text))
+            except AlertRuleError as e:
+                logger.warning("Ignoring alert rule: %s", e)
+                errors.append(str(e))
+
+        with self._lock:
+            known = set(self._predicates)
+            self._rules = rules
+            self._predicates = {r.rule_id: r.predicate() for r in rules + [RAIN_INDEX]}
+            added = {(r.series, r.column) for r in rules if r.rule_id not in known}
+            for state in self._states.values():
+                for key in added:
+                    # Forget the snapshot so every row counts as changed next time
+                    state.columns.pop(key, None)
+                for rule_id in list(state.hits):
+                    if rule_id not in self._predicates:
+                        del state.hits[rule_id]
+                        state.active.pop(rule_id, None)
+        return errors
+
+    def evaluate(self, location_key: str, weather: CompleteWeatherData,
+                 now: Optional[datetime] = None) -> List[Alert]:
+        """
+        Fold a new forecast into the index and return alerts that just started.
+
+        Args:
+            location_key: Identifies the location (its display name)
+            weather: Latest forecast for the location
+            now: Current time (defaults to datetime.now())
+
+        Returns:
+            Alerts not previously reported for this location
+        """
+        now = now or datetime.now()
+        with self._lock:
+            state = self._states.setdefault(location_key, _LocationState())
+            self._update_series(state, "hourly", weather.hourly, 'time', HOURLY_FIELDS)
+            self._update_series(state, "daily", weather.daily, 'date', DAILY_FIELDS)
+            return self._collect(state, weather.location_name, now)
+
+    def next_match(self, rule: AlertRule, location_key: str,
+                   after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        First indexed time at or after ``after`` where a rule matches.
+
+        Only rules in the service (and RAIN_INDEX) are indexed.
+        """
+        after = after or datetime.now().replace(minute=0, second=0, microsecond=0)
+        with self._lock:
+            state = self._states.get(location_key)
+            if state is None:
+                return None
+            hits = state.hits.get(rule.rule_id, [])
+            i = bisect_left(hits, after)
+            return hits[i] if i < len(hits) else None
+
+    def next_rain(self, location_key: str, after: Optional[datetime] = None) -> Optional[datetime]:
+        """Next hour with a precipitation probability of at least 50%."""
+        return self.next_match(RAIN_INDEX, location_key, after)
+
+    def export_state(self) -> dict:
+        """Which alerts are active or already reported, per location (JSON-safe)."""
+        with self._lock:
+            return {
+                key: {
+                    'active': {rule_id: t.isoformat() for rule_id, t in state.active.items()},
+                    'fired': [[rule_id, event.isoformat(), fired_at.isoformat()]
+                              for (rule_id, event), fired_at in state.fired.items()],
+                }
+                for key, state in self._states.items()
+            }
+
+    def import_state(self, data: dict):
+        """
+        Restore what export_state saved, so alerts reported by a previous
+        process are not reported again. The indexes are rebuilt from the
+        next forecast.
+        """
+        with self._lock:
+            for key, saved in data.items():
+                state = self._states.setdefault(key, _LocationState())
+                try:
+                    for rule_id, t in saved.get('active', {}).items():
+                        state.active[rule_id] = datetime.fromisoformat(t)
+                    for rule_id, event, fired_at in saved.get('fired', []):
+                        state.fired[(rule_id, datetime.fromisoformat(event))] = datetime.fromisoformat(fired_at)
+                except (AttributeError, TypeError, ValueError) as e:
+                    logger.warning("Ignoring saved alert state for %s: %s", key, e)
+
+    def _rules_by_column(self, series: str) -> Dict[str, List[AlertRule]]:
+        grouped: Dict[str, List[AlertRule]] = {}
+        for rule in self._rules + [RAIN_INDEX]:
+            if rule.series == series:
+                grouped.setdefault(rule.column, []).append(rule)
+        return grouped
+
+    def _update_series(self, state: _LocationState, series: str, rows: list,
+                       time_attr: str, fields: Dict[str, str]):
+        """Diff one series against the snapshot and re-check the changed rows."""
+        by_column = self._rules_by_column(series)
+        if not by_column:
+            return
+        times = sorted(getattr(row, time_attr) for row in rows)
+        for column, rules in by_column.items():
+            attr = fields[column]
+            new = {getattr(row, time_attr): getattr(row, attr) for row in rows}
+            old = state.columns.get((series, column), {})
+            dirty = [t for t, v in new.items() if old.get(t, _MISSING) != v]
+            dirty.extend(t for t in old if t not in new)
+            state.columns[(series, column)] = new
+            if not dirty:
+                continue
+            ROWS_RECHECKED.inc(len(dirty), series=series)
+            for rule in rules:
+                hits = state.hits.setdefault(rule.rule_id, [])
+                if rule.kind == "threshold":
+                    self._recheck_threshold(rule, hits, new, dirty)
+                else:
+                    self._recheck_change(rule, hits, new, times, dirty)
+
+    def _recheck_threshold(self, rule: AlertRule, hits: List[datetime],
+                           values: Dict[datetime, float], dirty: List[datetime]):
+        predicate = self._predicates[rule.rule_id]
+        for t in dirty:
+            _set_member(hits, t, t in values and predicate(values[t]))
+
+    def _recheck_change(self, rule: AlertRule, hits: List[datetime],
+                        values: Dict[datetime, float], times: List[datetime],
+                        dirty: List[datetime]):
+        # A change rule is indexed by the start of the window in which the
+        # value moves far enough; a changed row can only affect windows
+        # starting up to window_hours before it.
+        predicate = self._predicates[rule.rule_id]
+        window = timedelta(hours=rule.window_hours)
+        starts = set()
+        for t in dirty:
+            if t not in values:
+                _set_member(hits, t, False)
+            starts.update(times[bisect_left(times, t - window):bisect_right(times, t)])
+        for start in starts:
+            first = values[start]
+            ends = times[bisect_right(times, start):bisect_right(times, start + window)]
+            _set_member(hits, start, any(predicate(first, values[end]) for end in ends))
+
+    def _collect(self, state: _LocationState, location_name: str, now: datetime) -> List[Alert]:
+        """Window queries over the index, reporting each match episode once."""
+        alerts = []
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        for rule in self._rules:
+            rule_id = rule.rule_id
+            hits = state.hits.get(rule_id, [])
+            start = hour if rule.series == "hourly" else hour.replace(hour=0)
+            i = bisect_left(hits, start)
+            event = hits[i] if i < len(hits) and hits[i] <= now + timedelta(hours=rule.window_hours) else None
+
+            if event is None:
+                state.active.pop(rule_id, None)
+                continue
+            if rule_id in state.active:
+                continue  # Still the same episode
+            state.active[rule_id] = event
+            if (rule_id, event) in state.fired:
+                continue
+            state.fired[(rule_id, event)] = now
+            value = state.columns.get((rule.series, rule.column), {}).get(event)
+            alerts.append(Alert(rule=rule, location_name=location_name, event_time=event, value=value))
+            ALERTS_FIRED.inc()
+
+        self._prune(state, now)
+        return alerts
+
+    @staticmethod
+    def _prune(state: _LocationState, now: datetime):
+        cutoff = now - _HISTORY
+        for hits in state.hits.values():
+            del hits[:bisect_left(hits, cutoff)]
+        for key in [k for k, fired_at in state.fired.items() if fired_at < cutoff]:
+            del state.fired[key]
+
+
+def _set_member(hits: List[datetime], t: datetime, present: bool):
+    """Insert or remove ``t`` in a sorted list."""
+    i = bisect_left(hits, t)
+    found = i < len(hits) and hits[i] == t
+    if present and not found:
+        insort(hits, t)
+    elif not present and found:
+        del hits[i]
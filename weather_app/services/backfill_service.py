@@ -0,0 +1,304 @@
+"""Chunked, resumable download of historical weather into a columnar store.
+
+A backfill splits its date range into windows of ``chunk_days`` and its
+locations into groups of ``locations_per_chunk``; each (window, group) pair
+is one archive request. Chunks are planned lazily and in a fixed order, and
+run on a bounded thread pool behind a shared rate limiter, with only a
+small window of them in flight, so memory stays flat however many years
+and sites are requested.
+
+Every chunk is written by its worker to its own files,
+``<series>/<chunk id>.<format>``, under a ``.part`` name that is renamed
+once complete. Finished chunks are appended to ``backfill.log``, so an
+interrupted run picks up where it stopped. The chunk plan, file names and
+contents depend only on the parameters, which are pinned in
+``backfill.json``, so reruns reproduce the same store. Values are stored
+as float32 whichever wire format fetched them (see ``export_service``).
+The store reads back as one table per series, e.g. with
+``pyarrow.dataset.dataset(directory / "hourly")``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from ..api.archive_client import ArchiveAPIError, OpenMeteoArchiveClient
+from ..models.location import Location
+from ..utils.metrics import counter
+from ..utils.ratelimit import RateLimiter
+from .export_service import ExportError, ForecastExporter, column_kind
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNKS = counter(
+    "weatherbar_backfill_chunks_total",
+    "Backfill chunks by outcome (written, skipped, retried, failed)",
+    ["outcome"],
+)
+
+# on_progress(chunks done, chunks failed, rows written)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+@dataclass(frozen=True)
+class BackfillChunk:
+    """One archive request: a group of locations over a date window."""
+    locations: Tuple[Location, ...]
+    start: date
+    end: date
+
+    @property
+    def chunk_id(self) -> str:
+        """Stable name derived from the window and the coordinates."""
+        coords = [(round(loc.latitude, 4), round(loc.longitude, 4)) for loc in self.locations]
+        key = hashlib.blake2b(repr(coords).encode(), digest_size=6).hexdigest()
+        return f"{self.start:%Y%m%d}-{self.end:%Y%m%d}-{key}"
+
+
+def plan_chunks(locations: Sequence[Location], start: date, end: date,
+                chunk_days: int, locations_per_chunk: int) -> Iterator[BackfillChunk]:
+    """
+    Chunks covering every location over ``start``..``end`` (inclusive),
+    window by window, in a fixed order.
+    """
+    window_start = start
+    while window_start <= end:
+        window_end = min(end, window_start + timedelta(days=chunk_days - 1))
+        for i in range(0, len(locations), locations_per_chunk):
+            yield BackfillChunk(tuple(locations[i:i + locations_per_chunk]), window_start, window_end)
+        window_start = window_end + timedelta(days=1)
+
+
+class Backfill:
+    """Loads historical weather for many locations into a directory."""
+
+    MANIFEST = "backfill.json"
+    LOG = "backfill.log"
+
+    def __init__(self, directory: Union[str, Path], locations: Sequence[Location],
+                 start: date, end: date,
+                 hourly: Optional[Sequence[str]] = None,
+                 daily: Optional[Sequence[str]] = None,
+                 use_fahrenheit: bool = False,
+                 fmt: Optional[str] = None,
+                 chunk_days: int = 366,
+                 locations_per_chunk: int = 10,
+                 workers: int = 4,
+                 rate: float = 2.0,
+                 max_retries: int = 5,
+                 client: Optional[OpenMeteoArchiveClient] = None):
+        """
+        Initialize the backfill.
+
+        Args:
+            directory: Store directory (created if missing)
+            locations: Locations to load, named as they should appear in
+                the ``location`` column
+            start: First day, inclusive
+            end: Last day, inclusive
+            hourly: Hourly variables (default: the client's HOURLY_PARAMS)
+            daily: Daily variables (default: the client's DAILY_PARAMS)
+            use_fahrenheit: If True, store Fahrenheit, mph and inches
+            fmt: "parquet", "arrow" or "csv" (see ForecastExporter)
+            chunk_days: Days per request
+            locations_per_chunk: Locations per request
+            workers: Requests in flight at once
+            rate: Requests started per second across all workers
+            max_retries: Attempts per chunk after rate limiting or a
+                transient failure
+
+        Raises:
+            ExportError: If the format is unavailable
+            BackfillError: If the parameters are invalid or the directory
+                holds a backfill with different parameters
+        """
+        if end < start:
+            raise BackfillError(f"End date {end} is before start date {start}")
+        if not locations:
+            raise BackfillError("No locations to backfill")
+        self.client = client or OpenMeteoArchiveClient()
+        self.directory = Path(directory)
+        self.locations = list(locations)
+        self.start = start
+        self.end = end
+        self.hourly = list(self.client.HOURLY_PARAMS if hourly is None else hourly)
+        self.daily = list(self.client.DAILY_PARAMS if daily is None else daily)
+        self.use_fahrenheit = use_fahrenheit
+        self.chunk_days = max(1, chunk_days)
+        self.locations_per_chunk = max(1, min(locations_per_chunk, self.client.MAX_LOCATIONS))
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(rate, burst=self.workers)
+        self.schema = {
+            "hourly": [("time", "time", None)] + [(n, column_kind(n), None) for n in self.hourly],
+            "daily": [("time", "date", None)] + [(n, column_kind(n), None) for n in self.daily],
+        }
+        # Validates the format up front rather than in the first worker
+        self.format = ForecastExporter(self.directory, fmt).format
+        self._stopping = threading.Event()
+
+    def _parameters(self) -> dict:
+        """Everything the store's contents depend on."""
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "hourly": self.hourly,
+            "daily": self.daily,
+            "units": "fahrenheit" if self.use_fahrenheit else "celsius",
+            "format": self.format,
+            "chunk_days": self.chunk_days,
+            "locations_per_chunk": self.locations_per_chunk,
+            "locations": [[loc.name, loc.latitude, loc.longitude] for loc in self.locations],
+            "float_type": "float32",
+        }
+
+    def _open_store(self) -> Set[str]:
+        """Pin the parameters and return the ids of chunks already written."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self.directory / self.MANIFEST
+        parameters = self._parameters()
+        if manifest.exists():
+            saved = json.loads(manifest.read_text())
+            if "float_type" not in saved:
+                raise BackfillError(f"{self.directory} was written with float64 columns by an "
+                                    "earlier version; start the backfill in a new directory")
+            if saved != parameters:
+                raise BackfillError(f"{self.directory} holds a backfill with different parameters")
+        else:
+            tmp = manifest.with_suffix(".tmp")
+            tmp.write_text(json.dumps(parameters, indent=2))
+            tmp.replace(manifest)
+
+        done = set()
+        log = self.directory / self.LOG
+        if log.exists():
+            with open(log) as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line)["chunk"])
+                    except (ValueError, KeyError):
+                        continue  # Torn last line of an interrupted run
+        return done
+
+    def run(self, on_progress: Optional[ProgressCallback] = None) -> Tuple[int, int, int]:
+        """
+        Download every chunk not yet in the store.
+
+        Failed chunks are logged and left out of ``backfill.log``, so the
+        next run retries them.
+
+        Returns:
+            (chunks written, chunks failed, rows written)
+        """
+        done = self._open_store()
+        todo = (c for c in plan_chunks(self.locations, self.start, self.end,
+                                       self.chunk_days, self.locations_per_chunk)
+                if c.chunk_id not in done)
+        if done:
+            logger.info("Resuming backfill in %s: %d chunks already written", self.directory, len(done))
+            BACKFILL_CHUNKS.inc(len(done), outcome="skipped")
+
+        written = failed = rows = 0
+        window = self.workers * 2  # Chunks in flight; bounds memory
+        self._stopping.clear()
+        with open(self.directory / self.LOG, "a") as log, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as executor:
+            pending = set()
+            try:
+                while True:
+                    if not self._stopping.is_set():
+                        for chunk in islice(todo, window - len(pending)):
+                            pending.add(executor.submit(self._run_chunk, chunk))
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        try:
+                            chunk, chunk_rows = future.result()
+                        except BackfillError as e:
+                            logger.error("%s", e)
+                            failed += 1
+                            BACKFILL_CHUNKS.inc(outcome="failed")
+                            continue
+                        log.write(json.dumps({"chunk": chunk.chunk_id, "rows": chunk_rows}) + "\n")
+                        log.flush()
+                        os.fsync(log.fileno())
+                        written += 1
+                        rows += chunk_rows
+                        BACKFILL_CHUNKS.inc(outcome="written")
+                    if on_progress is not None:
+                        on_progress(written, failed, rows)
+            except BaseException:
+                # Interrupted: let running chunks finish, start no more
+                self._stopping.set()
+                for future in pending:
+                    future.cancel()
+                raise
+        logger.info("Backfill finished: %d chunks written, %d failed, %d rows", written, failed, rows)
+        return written, failed, rows
+
+    def stop(self):
+        """Start no further chunks; ``run`` returns once running ones finish."""
+        self._stopping.set()
+
+    def _run_chunk(self, chunk: BackfillChunk) -> Tuple[BackfillChunk, int]:
+        """Fetch and write one chunk (worker thread)."""
+        coords = [(loc.latitude, loc.longitude) for loc in chunk.locations]
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                results = self.client.get_history(coords, chunk.start, chunk.end,
+                                                  self.hourly, self.daily, self.use_fahrenheit)
+                break
+            except ArchiveAPIError as e:
+                if e.retry_after is None or attempt == self.max_retries or self._stopping.is_set():
+                    raise BackfillError(f"Chunk {chunk.chunk_id} failed: {e}") from e
+                BACKFILL_CHUNKS.inc(outcome="retried")
+                # Exponential backoff with jitter, or longer if the server says so
+                delay = max(e.retry_after, min(60.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+                if e.rate_limited:
+                    self.limiter.pause(delay)  # Back off as a whole, Retry-After or not
+                logger.warning("Chunk %s: %s; retrying in %.1fs", chunk.chunk_id, e, delay)
+                time.sleep(delay)
+        return chunk, self._write_chunk(chunk, results)
+
+    def _write_chunk(self, chunk: BackfillChunk, results: List[dict]) -> int:
+        """Write a chunk's files under .part names, then move them into place."""
+        exporter = ForecastExporter(
+            self.directory, self.format, schema=self.schema,
+            series=[s for s in ("hourly", "daily") if getattr(self, s)],
+            filename=f"{{series}}/{chunk.chunk_id}.{{format}}.part",
+        )
+        rows = 0
+        try:
+            for location, data in zip(chunk.locations, results):
+                for series in exporter.series:
+                    columns = data.get(series) or {}
+                    times = columns.get("time")
+                    if times is None:
+                        continue
+                    # Archive rows have no fetch time, so reruns write identical files
+                    rows += exporter.write_columns(series, len(times), columns, location.name,
+                                                   location.latitude, location.longitude)
+        except (ExportError, OSError, ValueError, TypeError) as e:
+            raise BackfillError(f"Chunk {chunk.chunk_id} could not be written: {e}") from e
+        finally:
+            exporter.close()
+        for path in exporter.paths:
+            path.replace(path.with_suffix(""))
+        return rows
+
+
+class BackfillError(Exception):
+    """Exception raised when a backfill cannot run or a chunk fails."""
+    pass
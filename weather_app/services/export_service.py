@@ -0,0 +1,338 @@
+"""Columnar export of hourly and daily forecasts.
+
+Each forecast written becomes one record batch per series (hourly, daily)
+with a fixed schema, so files from many fetches concatenate cleanly. With
+pyarrow installed the batches go to Arrow IPC files (streamed as they
+arrive) or Parquet (buffered up to ``row_group_rows`` and flushed as one
+row group); without it they are appended to CSV. Nothing beyond the current
+row group is held in memory.
+
+Forecasts carry their response arrays in ``CompleteWeatherData.columns``;
+those are used directly instead of walking the row models. Float columns
+are stored as float32, the precision Open-Meteo works in, so the float32
+arrays of a FlatBuffers or pooled decode are wrapped without copying and
+JSON and FlatBuffers responses write the same values. Daily times are
+written as dates in CSV, as the API writes them. Other column sets (e.g.
+archive variables) can be written with ``write_columns`` given a matching
+``schema``.
+"""
+
+import csv
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..models.location import Location
+from ..models.weather_data import CompleteWeatherData
+from ..utils.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+EXPORT_ROWS = counter(
+    "weatherbar_export_rows_total",
+    "Forecast rows written by series and format",
+    ["series", "format"],
+)
+
+FORMATS = ("arrow", "parquet", "csv")
+
+# (column, kind, model attribute) per series; kinds: float, int, time and
+# date (a time at midnight, written as a day)
+SERIES = {
+    "hourly": [
+        ("time", "time", "time"),
+        ("temperature_2m", "float", "temperature"),
+        ("weather_code", "int", "weather_code"),
+        ("precipitation_probability", "int", "precipitation_probability"),
+    ],
+    "daily": [
+        ("time", "date", "date"),
+        ("weather_code", "int", "weather_code"),
+        ("temperature_2m_max", "float", "temp_high"),
+        ("temperature_2m_min", "float", "temp_low"),
+        ("sunrise", "time", "sunrise"),
+        ("sunset", "time", "sunset"),
+        ("precipitation_probability_max", "int", "precipitation_probability"),
+        ("uv_index_max", "float", "uv_index_max"),
+    ],
+}
+
+# Columns prepended to every batch
+KEY_COLUMNS = ["location", "latitude", "longitude", "fetched_at"]
+
+
+def _load_pyarrow():
+    """pyarrow with its IPC and Parquet modules, or None if not installed."""
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def column_kind(name: str) -> str:
+    """Column kind of an API variable: time, int or float."""
+    if name in ("time", "sunrise", "sunset"):
+        return "time"
+    if name.startswith(("weather_code", "precipitation_probability", "relative_humidity", "is_day")):
+        return "int"
+    return "float"
+
+
+def series_columns(weather: CompleteWeatherData, series: str,
+                   spec: Optional[List[Tuple[str, str, Optional[str]]]] = None) -> Tuple[int, Dict[str, Sequence]]:
+    """
+    Column arrays for one series of a forecast.
+
+    Uses the response arrays when the forecast has them, otherwise builds
+    lists from the row models.
+
+    Returns:
+        (row count, {column: values})
+    """
+    spec = spec or SERIES[series]
+    raw = (weather.columns or {}).get(series)
+    if raw and raw.get("time") is not None:
+        return len(raw["time"]), {name: raw.get(name) for name, _, _ in spec}
+    rows = weather.hourly if series == "hourly" else weather.daily
+    return len(rows), {name: [getattr(row, attr) for row in rows] for name, _, attr in spec}
+
+
+class _ArrowSink:
+    """Arrow IPC or Parquet file fed with record batches."""
+
+    def __init__(self, pa, path: Path, fmt: str, spec: list, row_group_rows: int):
+        self.pa = pa
+        self.fmt = fmt
+        self.row_group_rows = row_group_rows
+        self.schema = pa.schema(
+            [("location", pa.string()), ("latitude", pa.float64()),
+             ("longitude", pa.float64()), ("fetched_at", pa.timestamp("s"))]
+            + [(name, self._type(kind)) for name, kind, _ in spec]
+        )
+        self._buffered: List = []
+        self._buffered_rows = 0
+        if fmt == "arrow":
+            self._writer = pa.ipc.new_file(str(path), self.schema)
+        else:
+            self._writer = pa.parquet.ParquetWriter(str(path), self.schema)
+
+    def _type(self, kind: str):
+        pa = self.pa
+        return {"float": pa.float32(), "int": pa.int64(), "time": pa.timestamp("s"), "date": pa.timestamp("s")}[kind]
+
+    def _array(self, values, arrow_type, length: int):
+        pa = self.pa
+        if values is None:
+            return pa.nulls(length, arrow_type)
+        if not isinstance(values, pa.Array):
+            if arrow_type == pa.timestamp("s") and len(values) and isinstance(values[0], str):
+                # ISO strings from the API: "2024-01-01" or "2024-01-01T13:00"
+                fmt = "%Y-%m-%d" if len(values[0]) == 10 else "%Y-%m-%dT%H:%M"
+                return pa.compute.strptime(pa.array(values, pa.string()), format=fmt, unit="s")
+            # NumPy buffers of the column's dtype are wrapped, not copied
+            values = pa.array(values)
+        return values if values.type == arrow_type else values.cast(arrow_type, safe=False)
+
+    def write(self, length: int, columns: Dict[str, Sequence], location: str,
+              latitude: Optional[float], longitude: Optional[float], fetched_at: Optional[datetime]):
+        pa = self.pa
+        fetched_at = fetched_at.replace(microsecond=0) if fetched_at is not None else None
+        arrays = [
+            pa.repeat(pa.scalar(location, pa.string()), length),
+            pa.repeat(pa.scalar(latitude, pa.float64()), length),
+            pa.repeat(pa.scalar(longitude, pa.float64()), length),
+            pa.repeat(pa.scalar(fetched_at, pa.timestamp("s")), length),
+        ]
+        for field in list(self.schema)[len(KEY_COLUMNS):]:
+            arrays.append(self._array(columns.get(field.name), field.type, length))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+        if self.fmt == "arrow":
+            self._writer.write_batch(batch)
+            return
+        self._buffered.append(batch)
+        self._buffered_rows += length
+        if self._buffered_rows >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        if self._buffered:
+            table = self.pa.Table.from_batches(self._buffered, schema=self.schema)
+            self._writer.write_table(table, row_group_size=self.row_group_rows)
+            self._buffered, self._buffered_rows = [], 0
+
+    def close(self):
+        if self.fmt == "parquet":
+            self._flush()
+        self._writer.close()
+
+
+def _csv_value(value, kind: str):
+    """One CSV field: NumPy scalars unwrapped, then formatted by column kind."""
+    dtype = getattr(value, "dtype", None)
+    if dtype is not None and dtype.kind == "f" and dtype.itemsize == 4:
+        value = float(str(value))  # Shortest float32 text, as in the JSON response
+    elif hasattr(value, "item"):
+        value = value.item()  # NumPy scalar from a decoded response
+    if value is None or value != value:  # NaN stands for JSON null
+        return None
+    if isinstance(value, datetime):
+        if kind == "date":
+            return value.date().isoformat()
+        return value.isoformat(timespec="minutes")  # As the API writes times
+    if kind == "int" and isinstance(value, float):
+        return int(round(value))  # Integer variables travel as float32
+    return value
+
+
+class _CsvSink:
+    """CSV file appended row by row."""
+
+    def __init__(self, path: Path, spec: list):
+        self.names = [name for name, _, _ in spec]
+        self.kinds = [kind for _, kind, _ in spec]
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(KEY_COLUMNS + self.names)
+
+    def write(self, length: int, columns: Dict[str, Sequence], location: str,
+              latitude: Optional[float], longitude: Optional[float], fetched_at: Optional[datetime]):
+        fetched = fetched_at.replace(microsecond=0).isoformat() if fetched_at is not None else None
+        key = [location, latitude, longitude, fetched]
+        series = [(columns.get(name), kind) for name, kind in zip(self.names, self.kinds)]
+        for i in range(length):
+            row = list(key)
+            for values, kind in series:
+                value = values[i] if values is not None and i < len(values) else None
+                row.append(_csv_value(value, kind))
+            self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class ForecastExporter:
+    """Streams forecasts into one columnar file per series."""
+
+    def __init__(self, directory: Union[str, Path], fmt: Optional[str] = None,
+                 series: Iterable[str] = ("hourly", "daily"), row_group_rows: int = 65536,
+                 schema: Optional[Dict[str, List[Tuple[str, str, Optional[str]]]]] = None,
+                 filename: str = "{series}.{format}"):
+        """
+        Initialize the exporter.
+
+        Args:
+            directory: Output directory
+            fmt: "arrow", "parquet" or "csv"; defaults to parquet when
+                pyarrow is installed and csv otherwise
+            series: Series to export
+            row_group_rows: Parquet rows buffered per row group
+            schema: (column, kind, model attribute) per series; defaults
+                to SERIES
+            filename: File path per series relative to ``directory``, with
+                ``{series}`` and ``{format}`` placeholders
+
+        Raises:
+            ExportError: If the format is unknown or needs pyarrow
+        """
+        self._pa = _load_pyarrow()
+        fmt = fmt or ("parquet" if self._pa is not None else "csv")
+        if fmt not in FORMATS:
+            raise ExportError(f"Unknown export format '{fmt}'")
+        if fmt != "csv" and self._pa is None:
+            raise ExportError(f"The {fmt} format requires pyarrow")
+        self.format = fmt
+        self.directory = Path(directory)
+        self.schema = schema or SERIES
+        self.series = [s for s in series if s in self.schema]
+        self.row_group_rows = row_group_rows
+        self.filename = filename
+        self._sinks: Dict[str, Union[_ArrowSink, _CsvSink]] = {}
+        self.paths: List[Path] = []  # Files opened so far
+
+    def _path(self, series: str) -> Path:
+        return self.directory / self.filename.format(series=series, format=self.format)
+
+    def _sink(self, series: str):
+        sink = self._sinks.get(series)
+        if sink is None:
+            path = self._path(series)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if self.format == "csv":
+                sink = _CsvSink(path, self.schema[series])
+            else:
+                sink = _ArrowSink(self._pa, path, self.format, self.schema[series], self.row_group_rows)
+            self._sinks[series] = sink
+            self.paths.append(path)
+            logger.info("Exporting %s forecasts to %s", series, path)
+        return sink
+
+    def write(self, weather: CompleteWeatherData, location: Optional[Location] = None) -> int:
+        """
+        Append one forecast as a record batch per series.
+
+        Args:
+            weather: Forecast to write
+            location: Coordinates to record alongside the location name
+
+        Returns:
+            Rows written across all series
+        """
+        written = 0
+        for series in self.series:
+            length, columns = series_columns(weather, series, self.schema[series])
+            written += self.write_columns(
+                series, length, columns, weather.location_name,
+                location.latitude if location else None,
+                location.longitude if location else None,
+                weather.fetched_at,
+            )
+        return written
+
+    def write_columns(self, series: str, length: int, columns: Dict[str, Sequence],
+                      location_name: str, latitude: Optional[float] = None,
+                      longitude: Optional[float] = None,
+                      fetched_at: Optional[datetime] = None) -> int:
+        """
+        Append one record batch of raw column arrays to a series.
+
+        Columns missing from ``columns`` are written as nulls.
+
+        Returns:
+            Rows written
+        """
+        if not length or series not in self.series:
+            return 0
+        self._sink(series).write(length, columns, location_name, latitude, longitude, fetched_at)
+        EXPORT_ROWS.inc(length, series=series, format=self.format)
+        return length
+
+    def write_all(self, forecasts: Iterable[Union[CompleteWeatherData, Tuple[CompleteWeatherData, Location]]]) -> int:
+        """Write forecasts (or (forecast, location) pairs) as they are produced."""
+        written = 0
+        for item in forecasts:
+            weather, location = item if isinstance(item, tuple) else (item, None)
+            written += self.write(weather, location)
+        return written
+
+    def close(self):
+        """Flush and close every file."""
+        for sink in self._sinks.values():
+            sink.close()
+        self._sinks.clear()
+
+    def __enter__(self) -> 'ForecastExporter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExportError(Exception):
+    """Exception raised when forecasts cannot be exported."""
+    pass
@@ -0,0 +1,236 @@
+"""Usage tracking and predictive prefetch.
+
+``UsageTracker`` remembers which locations are requested, by whom (menu,
+manual choice, daemon clients) and at what hours, with counts
+that decay over a week so stale habits fade. ``Prefetcher`` runs in the
+background and refreshes the shared weather cache for the locations most
+likely to be asked for next: entries that will have expired when the next
+request is due (predicted from the gaps between recent requests), and
+locations whose usual time of day is coming up. Each prefetch must be
+followed by a request before the location is prefetched again, and the
+location the menu is showing is left to the menu's own timer, so
+prefetching moves upstream requests earlier instead of adding to them.
+It works in small batches and backs off whenever a foreground fetch is
+running, so it never competes with the menu or a client for the network.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ..models.location import Location
+from ..models.usage import LocationUsage
+from ..utils.metrics import counter
+
+if TYPE_CHECKING:
+    from .weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+PREFETCHES = counter(
+    "weatherbar_prefetches_total",
+    "Locations refreshed ahead of use, by reason (expiring, usual_time)",
+    ["reason"],
+)
+PREFETCH_SKIPS = counter(
+    "weatherbar_prefetch_skips_total",
+    "Prefetch cycles skipped because foreground fetches were running",
+)
+
+
+class UsageTracker:
+    """Decaying per-location request statistics, persisted to disk."""
+
+    HALF_LIFE_SECONDS = 7 * 24 * 3600
+    MAX_TRACKED = 64
+    SAVE_INTERVAL_SECONDS = 60
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            path: JSON file to load from and save to; None keeps it in memory
+        """
+        self.path = path
+        self._usage: Dict[str, LocationUsage] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._load()
+
+    def record(self, location: Location, use_fahrenheit: bool, source: str,
+               when: Optional[float] = None, scheduled: bool = False):
+        """
+        Count a request for a location.
+
+        Args:
+            location: Requested location
+            use_fahrenheit: Units of the request
+            source: Who asked (e.g. "daemon" or the location mode)
+            when: Unix time of the request (default: now)
+            scheduled: The menu is showing this location and refreshes it
+                on its own timer, so it is not prefetched until the menu
+                moves on to another location
+        """
+        when = when or time.time()
+        usage = LocationUsage(location=location, use_fahrenheit=use_fahrenheit)
+        with self._lock:
+            usage = self._usage.setdefault(usage.key, usage)
+            usage.location = location  # Keep the latest name for the place
+            usage.record(when, source, self.HALF_LIFE_SECONDS, scheduled)
+            if scheduled:
+                # The menu shows one location; the one it left is prefetched again
+                for other in self._usage.values():
+                    if other is not usage:
+                        other.scheduled = False
+            if len(self._usage) > self.MAX_TRACKED:
+                weakest = min(self._usage.values(), key=lambda u: self._decayed(u, when))
+                del self._usage[weakest.key]
+            self._dirty = True
+
+    def _decayed(self, usage: LocationUsage, now: float) -> float:
+        return usage.score * 0.5 ** (max(0.0, now - usage.last_used) / self.HALF_LIFE_SECONDS)
+
+    def top(self, limit: int, now: Optional[float] = None) -> List[LocationUsage]:
+        """Most-used locations, strongest first."""
+        now = now or time.time()
+        with self._lock:
+            ranked = sorted(self._usage.values(), key=lambda u: self._decayed(u, now), reverse=True)
+        return ranked[:limit]
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                for item in json.load(f):
+                    usage = LocationUsage.from_dict(item)
+                    self._usage[usage.key] = usage
+        except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.warning("Failed to load usage history, starting fresh: %s", e)
+
+    def save(self, force: bool = False):
+        """Write the statistics if they changed (at most once a minute unless forced)."""
+        if self.path is None:
+            return
+        now = time.time()
+        with self._lock:
+            if not self._dirty or (not force and now - self._saved_at < self.SAVE_INTERVAL_SECONDS):
+                return
+            data = [u.to_dict() for u in self._usage.values()]
+            self._dirty = False
+            self._saved_at = now
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.error("Failed to save usage history: %s", e)
+
+
+class Prefetcher:
+    """Background thread that warms the weather cache ahead of use."""
+
+    def __init__(self, service: 'WeatherService', interval_seconds: float = 60.0,
+                 max_per_cycle: int = 8):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            service: Service whose shared cache is warmed
+            interval_seconds: Seconds between prefetch cycles
+            max_per_cycle: Most locations refreshed per cycle
+        """
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.max_per_cycle = max_per_cycle
+        self._prefetched: Dict[str, float] = {}  # Usage key -> Unix time of its last prefetch
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'Prefetcher':
+        """Start the background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and persist usage statistics."""
+        self._stop.set()
+        self.service.usage.save(force=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Prefetch cycle failed: %s", e)
+            self.service.usage.save()
+
+    def candidates(self, now: Optional[float] = None) -> Dict[str, List[LocationUsage]]:
+        """
+        Locations to refresh this cycle, by reason.
+
+        A cached entry is refreshed if the location's next request is
+        predicted before the next cycle but after the entry expires, so
+        that request would otherwise miss. A stale or missing entry is
+        refreshed if the location is usually requested around this time.
+        Locations prefetched and not requested since, and those whose
+        requester refreshes on its own schedule, are skipped.
+        """
+        now = now or time.time()
+        ttl = self.service.CACHE_DURATION_MINUTES * 60
+        lead = self.interval_seconds + 30
+        chosen: Dict[str, List[LocationUsage]] = {"expiring": [], "usual_time": []}
+        for usage in self.service.usage.top(self.max_per_cycle * 2, now):
+            if usage.scheduled or self._prefetched.get(usage.key, 0.0) > usage.last_used:
+                continue
+            age = self.service.cache_age(usage.location, usage.use_fahrenheit)
+            expires_at = now if age is None else now - age + ttl
+            if expires_at > now + lead:
+                continue  # Still fresh at the next cycle
+            due = usage.next_request()
+            if due is not None and expires_at <= due <= now + lead:
+                chosen["expiring"].append(usage)
+            elif usage.usual_at(now + lead):
+                chosen["usual_time"].append(usage)
+        return chosen
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """
+        Run one prefetch cycle.
+
+        Returns:
+            Number of locations refreshed
+        """
+        if self.service.fetches_in_flight():
+            PREFETCH_SKIPS.inc()
+            return 0
+
+        now = now or time.time()
+        refreshed = 0
+        for reason, usages in self.candidates(now).items():
+            for use_fahrenheit in (True, False):
+                group = [u for u in usages if u.use_fahrenheit == use_fahrenheit]
+                group = group[:self.max_per_cycle - refreshed]
+                if not group or self._stop.is_set():
+                    continue
+                self.service.get_weather_batch(
+                    [u.location for u in group], use_fahrenheit,
+                    force_refresh=True, source=None,
+                )
+                for usage in group:
+                    self._prefetched[usage.key] = now
+                PREFETCHES.inc(len(group), reason=reason)
+                refreshed += len(group)
+                logger.debug("Prefetched %d locations (%s)", len(group), reason)
+        # A day on, an unused prefetch may be tried again (e.g. at the usual time)
+        self._prefetched = {k: t for k, t in self._prefetched.items() if now - t < 24 * 3600}
+        return refreshed
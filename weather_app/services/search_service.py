@@ -0,0 +1,252 @@
+"""Incremental location search.
+
+``LocationSearch`` takes partial queries one keystroke at a time. Each
+query is answered straight away from local data: earlier results cached by
+query (a cached shorter prefix is filtered down to the new text) and the
+locations in the usage history. The network lookup starts only once typing
+pauses for ``debounce_seconds``. A newer query cancels the lookup for an
+older one: its connection is dropped as soon as a response arrives, and it
+waits only briefly for one (see ``GeocodingClient.LOOKUP_READ_TIMEOUT``), so
+superseded lookups do not pile up on a slow network. Results reach
+the caller progressively: local results first, then the merged network
+results, each ranked so the best match comes first.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from ..models.location import Location
+from ..utils.metrics import counter, histogram
+
+if TYPE_CHECKING:
+    from .weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+SEARCHES = counter(
+    "weatherbar_search_queries_total",
+    "Incremental search queries by how they were answered (cache, network, superseded, cancelled, failed)",
+    ["outcome"],
+)
+SEARCH_LATENCY = histogram(
+    "weatherbar_search_latency_seconds",
+    "Time from a keystroke to its results, by stage (local, network)",
+    ["stage"],
+)
+
+# on_results(query, ranked locations, final)
+ResultsCallback = Callable[[str, List[Location], bool], None]
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cased query with runs of whitespace collapsed."""
+    return " ".join(query.lower().split())
+
+
+def rank_locations(query: str, locations: List[Location],
+                   preferred: Optional[List[Location]] = None,
+                   strict: bool = True) -> List[Location]:
+    """
+    Order locations by how well they match a query.
+
+    Name prefix matches beat word prefix matches, which beat substring
+    matches; locations from ``preferred`` (most used first) win ties, and
+    the remaining ties keep their input order, which for the geocoding API
+    is by population. Duplicates of the same place are dropped.
+
+    Args:
+        query: Normalized query
+        locations: Candidates
+        preferred: Locations to favour, best first
+        strict: Drop locations that do not contain the query at all; off
+            for geocoding results, which also match spelling variants
+    """
+    preferred_rank = {_place_key(loc): i for i, loc in enumerate(preferred or [])}
+    ranked, seen = [], set()
+    for order, location in enumerate(locations):
+        key = _place_key(location)
+        if key in seen:
+            continue
+        seen.add(key)
+        name = location.name.lower()
+        full = location.display_name.lower()
+        if name.startswith(query):
+            match = 0
+        elif any(word.startswith(query) for word in full.replace(",", " ").split()):
+            match = 1
+        elif query in full:
+            match = 2
+        elif strict:
+            continue
+        else:
+            match = 3
+        ranked.append((match, preferred_rank.get(key, len(preferred_rank)), order, location))
+    ranked.sort(key=lambda item: item[:3])
+    return [location for *_, location in ranked]
+
+
+def _place_key(location: Location) -> Tuple[str, float, float]:
+    return (location.name.lower(), round(location.latitude, 2), round(location.longitude, 2))
+
+
+class SearchCache:
+    """LRU of geocoding results by normalized query."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, Tuple[float, List[Location]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str) -> Optional[List[Location]]:
+        """Results for exactly this query, if cached and fresh."""
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(query)
+            return entry[1]
+
+    def put(self, query: str, locations: List[Location]):
+        with self._lock:
+            self._entries[query] = (time.monotonic(), list(locations))
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def prefix_results(self, query: str) -> List[Location]:
+        """Results cached for the longest shorter prefix of a query."""
+        for end in range(len(query) - 1, 0, -1):
+            cached = self.get(query[:end])
+            if cached:
+                return cached
+        return []
+
+
+class LocationSearch:
+    """One search-as-you-type session (e.g. one open search field)."""
+
+    def __init__(self, service: 'WeatherService', on_results: ResultsCallback,
+                 debounce_seconds: float = 0.15, min_chars: int = 2, count: int = 10):
+        """
+        Initialize the session.
+
+        Args:
+            service: Service providing the geocoding client, cache and usage
+            on_results: Called (from a worker thread) with each result set;
+                ``final`` is True for the last set for that query
+            debounce_seconds: Typing pause before the network is queried
+            min_chars: Shorter queries are answered locally only
+            count: Results requested from the geocoding API
+        """
+        self.service = service
+        self.on_results = on_results
+        self.debounce_seconds = debounce_seconds
+        self.min_chars = min_chars
+        self.count = count
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._timer: Optional[threading.Timer] = None
+        self._cancel: Optional[threading.Event] = None
+        self._closed = False
+
+    def update(self, query: str):
+        """Handle the current text of the search field."""
+        typed_at = time.perf_counter()
+        normalized = normalize_query(query)
+        with self._lock:
+            if self._closed:
+                return
+            self._generation += 1
+            generation = self._generation
+            self._abort_pending()
+
+        cached = self.service.search_cache.get(normalized) if normalized else None
+        if cached is not None:
+            SEARCHES.inc(outcome="cache")
+            self._emit(generation, query,
+                       rank_locations(normalized, cached, self._preferred(), strict=False), True)
+            SEARCH_LATENCY.observe(time.perf_counter() - typed_at, stage="local")
+            return
+
+        local = self._local_results(normalized)
+        final = len(normalized) < self.min_chars
+        self._emit(generation, query, local, final)
+        SEARCH_LATENCY.observe(time.perf_counter() - typed_at, stage="local")
+        if final:
+            return
+
+        # The lookup runs on the timer's own thread, so a slow request for a
+        # superseded query never holds up the next one
+        cancel = threading.Event()
+        timer = threading.Timer(self.debounce_seconds, self._lookup,
+                                args=(generation, query, normalized, local, cancel, typed_at))
+        timer.name = "search"
+        timer.daemon = True
+        with self._lock:
+            if generation != self._generation or self._closed:
+                return
+            self._timer, self._cancel = timer, cancel
+        timer.start()
+
+    def close(self):
+        """Cancel any pending lookup and stop the session."""
+        with self._lock:
+            self._closed = True
+            self._abort_pending()
+
+    def _abort_pending(self):
+        """Stop the debounce timer and the running lookup (lock held)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+
+    def _preferred(self) -> List[Location]:
+        return [usage.location for usage in self.service.usage.top(32)]
+
+    def _local_results(self, normalized: str) -> List[Location]:
+        if not normalized:
+            return []
+        preferred = self._preferred()
+        candidates = preferred + self.service.search_cache.prefix_results(normalized)
+        return rank_locations(normalized, candidates, preferred)[:self.count]
+
+    def _lookup(self, generation: int, query: str, normalized: str,
+                local: List[Location], cancel: threading.Event, typed_at: float):
+        from ..api.geocoding_client import GeocodingError, SearchCancelled
+
+        if generation != self._generation:
+            SEARCHES.inc(outcome="superseded")
+            return
+        try:
+            found = self.service.geocoding_client.search(normalized, count=self.count, cancel=cancel)
+        except SearchCancelled:
+            SEARCHES.inc(outcome="cancelled")
+            return
+        except GeocodingError as e:
+            logger.warning("Search for '%s' failed: %s", query, e)
+            SEARCHES.inc(outcome="failed")
+            self._emit(generation, query, local, True)
+            return
+
+        self.service.search_cache.put(normalized, found)
+        SEARCHES.inc(outcome="network")
+        merged = rank_locations(normalized, found + local, self._preferred(), strict=False)[:self.count]
+        if self._emit(generation, query, merged, True):
+            SEARCH_LATENCY.observe(time.perf_counter() - typed_at, stage="network")
+
+    def _emit(self, generation: int, query: str, locations: List[Location], final: bool) -> bool:
+        """Deliver results unless a newer query has been typed since."""
+        if generation != self._generation:
+            return False
+        try:
+            self.on_results(query, locations, final)
+        except Exception as e:
+            logger.error("Search results callback failed: %s", e)
+        return True
@@ -24,7 +24,7 @@ class SettingsService:
         try:
             self.SETTINGS_DIR.mkdir(parents=True, exist_ok=True)
         except OSError as e:
-            logger.error(f"Failed to create settings directory: {e}")
+            logger.error("Failed to create settings directory: %s", e)
 
     def load(self) -> Settings:
         """
@@ -48,12 +48,12 @@ class SettingsService:
                 return self._settings
 
         except (json.JSONDecodeError, KeyError, TypeError) as e:
-            logger.warning(f"Failed to parse settings file, using defaults: {e}")
+            logger.warning("Failed to parse settings file, using defaults: %s", e)
             self._settings = Settings.default()
             return self._settings
 
         except OSError as e:
-            logger.error(f"Failed to read settings file: {e}")
+            logger.error("Failed to read settings file: %s", e)
             self._settings = Settings.default()
             return self._settings
 
@@ -76,7 +76,7 @@ class SettingsService:
             return True
 
         except OSError as e:
-            logger.error(f"Failed to save settings: {e}")
+            logger.error("Failed to save settings: %s", e)
             return False
 
     def update(self, **kwargs) -> Settings:
@@ -95,7 +95,7 @@ class SettingsService:
             if hasattr(settings, key):
                 setattr(settings, key, value)
             else:
-                logger.warning(f"Unknown setting: {key}")
+                logger.warning("Unknown setting: %s", key)
 
         self.save(settings)
         return settings
@@ -0,0 +1,204 @@
+"""Single-worker executor for weather updates.
+
+Every update request (timer tick, manual refresh, unit change, location
+change) goes through one worker thread with a bounded queue. Submitting a new
+job cancels every queued and in-flight job, so a hung network call can delay
+at most one update and never piles up threads. Results are handed to a
+``dispatch`` callable that runs them on the UI thread.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Tuple
+
+from ..utils.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+JOBS = counter(
+    "weatherbar_update_jobs_total",
+    "Update jobs by outcome (completed, failed, superseded, dropped)",
+    ["outcome"],
+)
+QUEUE_DEPTH = gauge("weatherbar_update_queue_depth", "Update jobs waiting to run")
+
+
+class UpdateCancelled(Exception):
+    """Raised inside a job when a newer job has superseded it."""
+    pass
+
+
+class CancelToken:
+    """Cooperative cancellation flag passed to each job."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.submitted_at = time.perf_counter()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def check(self):
+        """Raise UpdateCancelled if this job has been superseded."""
+        if self._event.is_set():
+            raise UpdateCancelled()
+
+
+Job = Tuple[CancelToken, Callable[[CancelToken], Any],
+            Optional[Callable[[Any], None]], Optional[Callable[[Exception], None]]]
+
+
+class UpdateExecutor:
+    """Runs update jobs one at a time; newer jobs supersede older ones."""
+
+    def __init__(self, dispatch: Callable[[Callable[[], None]], None],
+                 max_pending: int = 2, name: str = "weather-update"):
+        """
+        Initialize the executor (the worker starts on first submit).
+
+        Args:
+            dispatch: Schedules a zero-argument callable on the UI thread
+            max_pending: Maximum number of queued jobs; the oldest is dropped
+            name: Worker thread name
+        """
+        self._dispatch = dispatch
+        self._pending: Deque[Job] = deque()
+        self._max_pending = max(1, max_pending)
+        self._current: Optional[CancelToken] = None
+        self._cond = threading.Condition()
+        self._name = name
+        self._thread: Optional[threading.Thread] = None
+        self._shutdown = False
+        self._busy = False  # A job is running or its result is being dispatched
+
+    def submit(self, job: Callable[[CancelToken], Any],
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               supersede: bool = True) -> CancelToken:
+        """
+        Queue a job.
+
+        Args:
+            job: Runs on the worker thread; receives a CancelToken it should
+                ``check()`` between slow steps
+            on_result: Called on the UI thread with the job's return value
+            on_error: Called on the UI thread with the exception if the job fails
+            supersede: Cancel all queued and in-flight jobs first
+
+        Returns:
+            CancelToken for the submitted job
+        """
+        token = CancelToken()
+        with self._cond:
+            if self._shutdown:
+                token.cancel()
+                return token
+            if supersede:
+                if self._current is not None:
+                    self._current.cancel()
+                for old, *_ in self._pending:
+                    old.cancel()
+                    JOBS.inc(outcome="superseded")
+                self._pending.clear()
+            while len(self._pending) >= self._max_pending:
+                dropped = self._pending.popleft()
+                dropped[0].cancel()
+                JOBS.inc(outcome="dropped")
+            self._pending.append((token, job, on_result, on_error))
+            QUEUE_DEPTH.set(len(self._pending))
+            self._ensure_worker()
+            self._cond.notify_all()
+        return token
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._shutdown:
+                    self._cond.wait()
+                if self._shutdown:
+                    return
+                token, job, on_result, on_error = self._pending.popleft()
+                QUEUE_DEPTH.set(len(self._pending))
+                self._current = token
+                self._busy = True
+
+            try:
+                self._execute(token, job, on_result, on_error)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _execute(self, token: CancelToken, job: Callable[[CancelToken], Any],
+                 on_result: Optional[Callable[[Any], None]],
+                 on_error: Optional[Callable[[Exception], None]]):
+        try:
+            if token.cancelled:
+                return
+            result = job(token)
+            token.check()
+        except UpdateCancelled:
+            JOBS.inc(outcome="superseded")
+            logger.debug("Update superseded")
+            return
+        except Exception as e:
+            if token.cancelled:
+                JOBS.inc(outcome="superseded")
+                return
+            JOBS.inc(outcome="failed")
+            if on_error is not None:
+                self._dispatch(lambda token=token, callback=on_error, e=e: self._deliver(token, callback, e))
+            else:
+                logger.exception("Update job failed: %s", e)
+            return
+        finally:
+            with self._cond:
+                if self._current is token:
+                    self._current = None
+
+        JOBS.inc(outcome="completed")
+        if on_result is not None:
+            # Bound now: the worker may start the next job before the UI thread runs this
+            self._dispatch(lambda token=token, callback=on_result, result=result:
+                           self._deliver(token, callback, result))
+
+    @staticmethod
+    def _deliver(token: CancelToken, callback: Callable[[Any], None], value: Any):
+        # A job superseded after finishing must not overwrite newer results
+        if not token.cancelled:
+            callback(value)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no job is queued or running and the last result has been
+        handed to ``dispatch``.
+
+        Returns:
+            True if idle, False if the timeout expired first
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def shutdown(self, wait: bool = False):
+        """Cancel everything and stop the worker."""
+        with self._cond:
+            self._shutdown = True
+            if self._current is not None:
+                self._current.cancel()
+            for token, *_ in self._pending:
+                token.cancel()
+            self._pending.clear()
+            self._cond.notify_all()
+        if wait and self._thread is not None:
+            self._thread.join()
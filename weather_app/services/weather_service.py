@@ -1,40 +1,153 @@
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import Optional, List
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Optional, List, Tuple
 
-from ..api.weather_client import OpenMeteoClient, WeatherAPIError
-from ..api.geocoding_client import GeocodingClient, GeocodingError
-from ..api.geolocation_client import GeolocationClient, GeolocationError
+from ..models.air_quality import AirQuality
+from ..models.ensemble import EnsembleSummary
+from ..models.nowcast import NowcastBuffer
 from ..models.weather_data import CompleteWeatherData
 from ..models.location import Location
 from ..models.settings import Settings
+from ..utils.geo import CellGrid, SpatialIndex
+from ..utils.metrics import counter
+from ..utils.singleflight import SingleFlight
+from .prefetch_service import UsageTracker
+from .search_service import LocationSearch, ResultsCallback, SearchCache, normalize_query
 from .settings_service import SettingsService
 
+if TYPE_CHECKING:
+    from ..api.weather_client import OpenMeteoClient
+    from ..api.geocoding_client import GeocodingClient
+    from ..api.geolocation_client import GeolocationClient
+    from ..api.air_quality_client import AirQualityClient
+
 logger = logging.getLogger(__name__)
 
+CACHE_REQUESTS = counter(
+    "weatherbar_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, stale)",
+    ["cache", "result"],
+)
+
+
+class _Snapshot:
+    """A cached forecast for one grid cell and unit system."""
+    __slots__ = ("stored_at", "weather", "views")
+
+    MAX_VIEWS = 8
+
+    def __init__(self, weather: CompleteWeatherData, stored_at: Optional[datetime] = None):
+        self.stored_at = stored_at or datetime.now()
+        self.weather = weather
+        self.views = {}  # location name -> copy of weather carrying that name
+
+    def named(self, name: str) -> CompleteWeatherData:
+        """The forecast labelled for a location sharing this cell."""
+        if not name or name == self.weather.location_name:
+            return self.weather
+        view = self.views.get(name)
+        if view is None:
+            # Kept so repeated lookups return the same object
+            view = replace(self.weather, location_name=name)
+            if len(self.views) < self.MAX_VIEWS:
+                self.views[name] = view
+        return view
+
 
 class WeatherService:
     """Orchestrates weather data fetching with caching."""
 
     CACHE_DURATION_MINUTES = 5  # Cache weather data for 5 minutes
+    SNAPSHOT_CACHE_SIZE = 256  # Grid cells kept in the shared cache
+    ENSEMBLE_CACHE_MINUTES = 30  # Model runs change a few times a day
+    ENSEMBLE_CACHE_SIZE = 32
+    AIR_QUALITY_CACHE_MINUTES = 30  # Air-quality models are hourly
+    AIR_QUALITY_CACHE_SIZE = 64
 
     def __init__(self, settings_service: SettingsService):
         self.settings_service = settings_service
-        self.weather_client = OpenMeteoClient()
-        self.geocoding_client = GeocodingClient()
-        self.geolocation_client = GeolocationClient()
+        # API clients (and the HTTP stack behind them) are imported and
+        # created on first use so they stay off the startup path
+        self._weather_client: Optional['OpenMeteoClient'] = None
+        self._geocoding_client: Optional['GeocodingClient'] = None
+        self._geolocation_client: Optional['GeolocationClient'] = None
+        self._air_quality_client: Optional['AirQualityClient'] = None
         self._cache: Optional[CompleteWeatherData] = None
         self._cache_timestamp: Optional[datetime] = None
         self._cache_location: Optional[Location] = None
-
-    def get_weather(self, force_refresh: bool = False) -> CompleteWeatherData:
+        self._cache_use_fahrenheit: Optional[bool] = None
+        # Cache shared by every caller, keyed by (grid cell, units) so nearby
+        # locations share entries and upstream fetches
+        self._snapshots: 'OrderedDict[tuple, _Snapshot]' = OrderedDict()
+        self._snapshots_lock = threading.Lock()
+        self._flights = SingleFlight("weather")
+        self._index: Optional[SpatialIndex] = None
+        self._index_spec: Optional[Tuple[float, int]] = None
+        self._ensembles: 'OrderedDict[tuple, EnsembleSummary]' = OrderedDict()
+        self._air_quality: 'OrderedDict[tuple, AirQuality]' = OrderedDict()
+        # Per detail field: (forecast, value, forecast carrying the value) of the last merge
+        self._detail_views: Dict[str, Tuple[CompleteWeatherData, object, CompleteWeatherData]] = {}
+        # Model spread and air quality are fetched here while the caller fetches the forecast
+        self._details_pool: Optional[ThreadPoolExecutor] = None
+        # Which locations are requested and when, for the prefetcher
+        self.usage = UsageTracker(settings_service.SETTINGS_DIR / "usage.json")
+        self.search_cache = SearchCache()
+
+    @property
+    def weather_client(self) -> 'OpenMeteoClient':
+        """Forecast client, created on first use."""
+        if self._weather_client is None:
+            from ..api.weather_client import OpenMeteoClient
+            self._weather_client = OpenMeteoClient()
+        return self._weather_client
+
+    @property
+    def geocoding_client(self) -> 'GeocodingClient':
+        """Geocoding client, created on first use."""
+        if self._geocoding_client is None:
+            from ..api.geocoding_client import GeocodingClient
+            self._geocoding_client = GeocodingClient()
+        return self._geocoding_client
+
+    @property
+    def geolocation_client(self) -> 'GeolocationClient':
+        """IP geolocation client, created on first use."""
+        if self._geolocation_client is None:
+            from ..api.geolocation_client import GeolocationClient
+            self._geolocation_client = GeolocationClient()
+        return self._geolocation_client
+
+    @property
+    def air_quality_client(self) -> 'AirQualityClient':
+        """Air-quality client, created on first use."""
+        if self._air_quality_client is None:
+            from ..api.air_quality_client import AirQualityClient
+            self._air_quality_client = AirQualityClient()
+        return self._air_quality_client
+
+    def get_weather(self, force_refresh: bool = False,
+                    on_update: Optional[Callable[[CompleteWeatherData, CompleteWeatherData], None]] = None
+                    ) -> CompleteWeatherData:
         """
         Get weather data for current location.
 
         Uses cached data if available and fresh, otherwise fetches new data.
+        The model spread and air quality are requested at the same time as
+        the forecast and merged in if they are ready when the forecast is;
+        otherwise the forecast is returned without waiting (carrying their
+        last values, if any), and each merged result goes to ``on_update``
+        when it arrives.
 
         Args:
             force_refresh: If True, bypass cache and fetch fresh data
+            on_update: Called from a worker thread as on_update(previous,
+                merged) when a detail arrives after this call returned;
+                ``previous`` is what this call returned or the last merge
 
         Returns:
             CompleteWeatherData with current weather and forecasts
@@ -42,40 +155,518 @@ class WeatherService:
         Raises:
             WeatherServiceError: If weather data cannot be fetched
         """
+        from ..api.weather_client import WeatherAPIError
+
         settings = self.settings_service.load()
         location = self._get_location(settings)
+        use_fahrenheit = settings.use_fahrenheit
+        self.usage.record(location, use_fahrenheit, source=settings.location_mode, scheduled=True)
+        details = {
+            'ensemble': self._start_ensemble(location, settings),
+            'air_quality': self._start_air_quality(location, settings),
+        }
 
         # Check cache validity
-        if not force_refresh and self._is_cache_valid(location):
+        if not force_refresh and self._is_cache_valid(location, use_fahrenheit):
             logger.debug("Using cached weather data")
+            CACHE_REQUESTS.inc(cache="weather", result="hit")
+            self._cache = self._with_details(self._cache, details, on_update)
             return self._cache
 
-        try:
-            logger.info(f"Fetching weather for {location.display_name}")
-            weather = self.weather_client.get_complete_weather(
-                latitude=location.latitude,
-                longitude=location.longitude,
-                use_fahrenheit=settings.use_fahrenheit,
-                location_name=location.display_name
-            )
-
-            # Update cache
-            self._cache = weather
-            self._cache_timestamp = datetime.now()
-            self._cache_location = location
+        key = self._snapshot_key(location, use_fahrenheit)
+        if not force_refresh:
+            shared = self._cached_snapshot(key, location.display_name,
+                                           max_age=timedelta(minutes=self.CACHE_DURATION_MINUTES))
+            if shared is not None:
+                logger.debug("Using shared cache entry for %s", location.display_name)
+                CACHE_REQUESTS.inc(cache="weather", result="shared")
+                shared = self._with_details(shared, details, on_update)
+                self._set_menu_cache(shared, location, use_fahrenheit)
+                return shared
+        CACHE_REQUESTS.inc(cache="weather", result="miss")
 
+        try:
+            logger.info("Fetching weather for %s", location.display_name)
+            weather = self._flights.do(
+                key, lambda: self._fetch_snapshot(key, location, use_fahrenheit)
+            ).named(location.display_name)
+            weather = self._with_details(weather, details, on_update)
+            self._set_menu_cache(weather, location, use_fahrenheit)
             return weather
 
         except WeatherAPIError as e:
-            logger.error(f"Failed to fetch weather: {e}")
+            logger.error("Failed to fetch weather: %s", e)
             # Return cached data if available
             if self._cache is not None:
                 logger.warning("Returning stale cached data due to API error")
+                CACHE_REQUESTS.inc(cache="weather", result="stale")
                 return self._cache
             raise WeatherServiceError(f"Failed to fetch weather: {e}") from e
 
+    def get_ensemble(self, location: Location, settings: Settings) -> Optional[EnsembleSummary]:
+        """
+        Model spread for a location per ``settings.forecast_models``.
+
+        Cached per grid cell for ENSEMBLE_CACHE_MINUTES. Failures are logged
+        and answered with the last summary (or None): the spread is extra
+        detail and never fails an update.
+        """
+        from ..api.weather_client import WeatherAPIError
+
+        if not settings.forecast_models:
+            return None
+        use_fahrenheit = settings.use_fahrenheit
+        key = self._ensemble_key(location, settings)
+        with self._snapshots_lock:
+            cached = self._ensembles.get(key)
+        if cached is not None and datetime.now() - cached.fetched_at < timedelta(minutes=self.ENSEMBLE_CACHE_MINUTES):
+            CACHE_REQUESTS.inc(cache="ensemble", result="hit")
+            return cached
+        CACHE_REQUESTS.inc(cache="ensemble", result="miss")
+
+        try:
+            summary = self._flights.do(("ensemble",) + key, lambda: self.weather_client.get_ensemble(
+                location.latitude, location.longitude, settings.forecast_models,
+                use_fahrenheit=use_fahrenheit, ensemble=settings.use_ensemble_api
+            ))
+        except WeatherAPIError as e:
+            logger.warning("Model spread unavailable: %s", e)
+            if cached is not None:
+                CACHE_REQUESTS.inc(cache="ensemble", result="stale")
+            return cached
+        if summary is not None:
+            with self._snapshots_lock:
+                self._ensembles[key] = summary
+                self._ensembles.move_to_end(key)
+                while len(self._ensembles) > self.ENSEMBLE_CACHE_SIZE:
+                    self._ensembles.popitem(last=False)
+        return summary
+
+    def _ensemble_key(self, location: Location, settings: Settings) -> tuple:
+        return (self._snapshot_key(location, settings.use_fahrenheit),
+                tuple(settings.forecast_models), settings.use_ensemble_api)
+
+    def _start_ensemble(self, location: Location,
+                        settings: Settings) -> Optional[Tuple[Future, Optional[EnsembleSummary]]]:
+        """
+        Start fetching the model spread for a location unless a fresh copy is cached.
+
+        Returns:
+            (future of the EnsembleSummary or None, last cached summary), or
+            None outside full mode or when no models are configured
+        """
+        if not settings.forecast_models or not settings.is_full_mode:
+            return None
+        key = self._ensemble_key(location, settings)
+        with self._snapshots_lock:
+            cached = self._ensembles.get(key)
+        if cached is not None and datetime.now() - cached.fetched_at < timedelta(minutes=self.ENSEMBLE_CACHE_MINUTES):
+            CACHE_REQUESTS.inc(cache="ensemble", result="hit")
+            future = Future()
+            future.set_result(cached)
+            return future, cached
+        return self._get_details_pool().submit(self.get_ensemble, location, settings), cached
+
+    def _start_air_quality(self, location: Location,
+                           settings: Settings) -> Optional[Tuple[Future, Optional[AirQuality]]]:
+        """
+        Start fetching air quality for a location unless a fresh copy is cached.
+
+        Returns:
+            (future of the AirQuality or None, last cached AirQuality), or
+            None when air quality is turned off
+        """
+        if not settings.show_air_quality:
+            return None
+        cell = self._snapshot_key(location, settings.use_fahrenheit)[0]
+        with self._snapshots_lock:
+            cached = self._air_quality.get(cell)
+        if cached is not None and datetime.now() - cached.fetched_at < timedelta(minutes=self.AIR_QUALITY_CACHE_MINUTES):
+            CACHE_REQUESTS.inc(cache="air_quality", result="hit")
+            future = Future()
+            future.set_result(cached)
+            return future, cached
+        CACHE_REQUESTS.inc(cache="air_quality", result="miss")
+        return self._get_details_pool().submit(self._fetch_air_quality, cell, location, cached), cached
+
+    def _get_details_pool(self) -> ThreadPoolExecutor:
+        with self._snapshots_lock:
+            if self._details_pool is None:
+                self._details_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-details")
+            return self._details_pool
+
+    def _fetch_air_quality(self, cell: tuple, location: Location,
+                           stale: Optional[AirQuality]) -> Optional[AirQuality]:
+        """Fetch and cache air quality (pool thread); falls back to the stale copy."""
+        from ..api.air_quality_client import AirQualityError
+
+        try:
+            air_quality = self._flights.do(("air_quality", cell), lambda: self.air_quality_client.get_air_quality(
+                location.latitude, location.longitude
+            ))
+        except AirQualityError as e:
+            logger.warning("Air quality unavailable: %s", e)
+            if stale is not None:
+                CACHE_REQUESTS.inc(cache="air_quality", result="stale")
+            return stale
+        with self._snapshots_lock:
+            self._air_quality[cell] = air_quality
+            self._air_quality.move_to_end(cell)
+            while len(self._air_quality) > self.AIR_QUALITY_CACHE_SIZE:
+                self._air_quality.popitem(last=False)
+        return air_quality
+
+    def _with_details(self, weather: CompleteWeatherData,
+                      pending: Dict[str, Optional[Tuple[Future, object]]],
+                      on_update: Optional[Callable[[CompleteWeatherData, CompleteWeatherData], None]]
+                      ) -> CompleteWeatherData:
+        """
+        The forecast with its details merged in, never waiting for them.
+
+        Args:
+            weather: The forecast
+            pending: (future, last cached value) per CompleteWeatherData
+                field, or None for details that are turned off
+            on_update: Receives each detail that arrives after this returns
+
+        Details still being fetched are merged as their last cached value
+        for now; each fresh one is merged into the latest result of this
+        call when it arrives.
+        """
+        latest = weather
+        waiting = []
+        for name, entry in pending.items():
+            if entry is None:
+                continue
+            future, previous = entry
+            if future.done() and future.exception() is None:
+                latest = self._merge_detail(latest, name, future.result())
+                continue
+            latest = self._merge_detail(latest, name, previous)
+            if not future.done():
+                waiting.append((name, future))
+        if not waiting:
+            return latest
+
+        shown = [latest]  # What the caller holds now, updated as details arrive
+        lock = threading.Lock()
+
+        def arrived(name: str, done: Future):
+            if done.exception() is not None:
+                logger.error("Fetching %s failed: %s", name.replace('_', ' '), done.exception())
+                return
+            with lock:
+                current = shown[0]
+                merged = self._merge_detail(current, name, done.result())
+                if merged is current:
+                    return
+                shown[0] = merged
+                if self._cache is current:
+                    self._cache = merged
+                if on_update is not None:
+                    on_update(current, merged)
+
+        for name, future in waiting:
+            future.add_done_callback(partial(arrived, name))
+        return latest
+
+    def _merge_detail(self, weather: CompleteWeatherData, name: str, value) -> CompleteWeatherData:
+        """The forecast carrying ``value`` as its ``name`` field (same object when unchanged)."""
+        if value is None or getattr(weather, name) is value:
+            return weather
+        view = self._detail_views.get(name)
+        if view is not None and view[0] is weather and view[1] is value:
+            return view[2]  # Same objects as last time, so unchanged data stays unchanged
+        merged = replace(weather, **{name: value})
+        self._detail_views[name] = (weather, value, merged)
+        return merged
+
+    def _set_menu_cache(self, weather: CompleteWeatherData, location: Location, use_fahrenheit: bool):
+        self._cache = weather
+        self._cache_timestamp = datetime.now()
+        self._cache_location = location
+        self._cache_use_fahrenheit = use_fahrenheit
+
+    def get_weather_at(self, location: Location, use_fahrenheit: Optional[bool] = None,
+                       force_refresh: bool = False, source: Optional[str] = None,
+                       fetch_slots: Optional[threading.Semaphore] = None) -> CompleteWeatherData:
+        """
+        Get weather for any location, independent of the configured one.
+
+        Results are cached per grid cell and units for CACHE_DURATION_MINUTES
+        (see _snapshot_key), and concurrent requests for the same cell share
+        a single upstream fetch.
+
+        Args:
+            location: Location to fetch
+            use_fahrenheit: Units; defaults to the user's setting
+            force_refresh: If True, bypass the cache
+            source: Who asked (e.g. "daemon"), recorded for prefetching;
+                None leaves the request out of the usage statistics
+            fetch_slots: Bounds the upstream fetches callers may start: a
+                request that starts one takes a slot without waiting. Cache
+                hits and requests joining a running fetch take none.
+
+        Returns:
+            CompleteWeatherData for the location
+
+        Raises:
+            WeatherServiceBusy: If a fetch is needed and no slot is free
+            WeatherServiceError: If the data cannot be fetched and nothing is cached
+        """
+        from ..api.weather_client import WeatherAPIError
+
+        if use_fahrenheit is None:
+            use_fahrenheit = self.settings_service.load().use_fahrenheit
+        if source is not None:
+            self.usage.record(location, use_fahrenheit, source)
+        key = self._snapshot_key(location, use_fahrenheit)
+        name = location.display_name
+
+        if not force_refresh:
+            cached = self._cached_snapshot(key, name, max_age=timedelta(minutes=self.CACHE_DURATION_MINUTES))
+            if cached is not None:
+                CACHE_REQUESTS.inc(cache="snapshot", result="hit")
+                return cached
+        CACHE_REQUESTS.inc(cache="snapshot", result="miss")
+
+        fetch = partial(self._fetch_snapshot, key, location, use_fahrenheit)
+        if fetch_slots is not None:
+            fetch = partial(self._fetch_in_slot, fetch_slots, fetch)
+        try:
+            return self._flights.do(key, fetch).named(name)
+        except WeatherAPIError as e:
+            stale = self._cached_snapshot(key, name)
+            if stale is not None:
+                logger.warning("Returning stale snapshot for %s: %s", name, e)
+                CACHE_REQUESTS.inc(cache="snapshot", result="stale")
+                return stale
+            raise WeatherServiceError(f"Failed to fetch weather: {e}") from e
+
+    @staticmethod
+    def _fetch_in_slot(slots: threading.Semaphore, fetch: Callable[[], _Snapshot]) -> _Snapshot:
+        if not slots.acquire(blocking=False):
+            raise WeatherServiceBusy("Too many upstream fetches in progress")
+        try:
+            return fetch()
+        finally:
+            slots.release()
+
+    def get_weather_batch(self, locations: List[Location], use_fahrenheit: Optional[bool] = None,
+                          force_refresh: bool = False,
+                          source: Optional[str] = None) -> List[CompleteWeatherData]:
+        """
+        Get weather for many locations, batching the upstream requests.
+
+        Locations whose grid cell is cached are served from the shared
+        cache; the remaining cells are fetched once each with
+        multi-coordinate requests, however many locations fall in them.
+
+        Args:
+            locations: Locations to fetch
+            use_fahrenheit: Units; defaults to the user's setting
+            force_refresh: If True, refetch every cell regardless of the cache
+            source: Who asked, recorded for prefetching (see get_weather_at)
+
+        Returns:
+            CompleteWeatherData per location, in input order
+
+        Raises:
+            WeatherServiceError: If a batch request fails
+        """
+        from ..api.weather_client import WeatherAPIError
+
+        if use_fahrenheit is None:
+            use_fahrenheit = self.settings_service.load().use_fahrenheit
+        max_age = timedelta(minutes=self.CACHE_DURATION_MINUTES)
+
+        results: List[Optional[CompleteWeatherData]] = []
+        missing: 'OrderedDict[tuple, List[Tuple[int, Location]]]' = OrderedDict()
+        for i, location in enumerate(locations):
+            if source is not None:
+                self.usage.record(location, use_fahrenheit, source)
+            key = self._snapshot_key(location, use_fahrenheit)
+            cached = None
+            if not force_refresh:
+                cached = self._cached_snapshot(key, location.display_name, max_age=max_age)
+            CACHE_REQUESTS.inc(cache="snapshot", result="hit" if cached is not None else "miss")
+            results.append(cached)
+            if cached is None:
+                missing.setdefault(key, []).append((i, location))
+
+        cells = list(missing.items())
+        batch_size = self.weather_client.MAX_BATCH
+        for start in range(0, len(cells), batch_size):
+            chunk = cells[start:start + batch_size]
+            try:
+                fetched = self.weather_client.get_complete_weather_batch(
+                    [(group[0][1].latitude, group[0][1].longitude, group[0][1].display_name)
+                     for _, group in chunk],
+                    use_fahrenheit=use_fahrenheit
+                )
+            except WeatherAPIError as e:
+                raise WeatherServiceError(f"Failed to fetch weather batch: {e}") from e
+            for (key, group), weather in zip(chunk, fetched):
+                snapshot = self._store_snapshot(key, group[0][1], weather)
+                for i, location in group:
+                    results[i] = snapshot.named(location.display_name)
+        return results
+
+    def _spatial_index(self) -> SpatialIndex:
+        """Index of cached cells, rebuilt (and the cache dropped) when the grid setting changes."""
+        settings = self.settings_service.load()
+        spec = (settings.cache_grid_degrees, settings.cache_geohash_precision)
+        with self._snapshots_lock:
+            if self._index is None or spec != self._index_spec:
+                self._index = SpatialIndex(CellGrid(*spec))
+                self._index_spec = spec
+                self._snapshots.clear()
+            return self._index
+
+    def _snapshot_key(self, location: Location, use_fahrenheit: bool) -> tuple:
+        """
+        Cache key for a location: the cell of the nearest cached point within
+        half a cell, or the location's own grid cell. Cells are anchored in
+        the index only once a snapshot is stored for them.
+        """
+        index = self._spatial_index()
+        cell = index.nearest(location.latitude, location.longitude)
+        if cell is None:
+            cell = index.grid.cell(location.latitude, location.longitude)
+        return (cell, use_fahrenheit)
+
+    def _fetch_snapshot(self, key: tuple, location: Location, use_fahrenheit: bool) -> _Snapshot:
+        weather = self.weather_client.get_complete_weather(
+            latitude=location.latitude,
+            longitude=location.longitude,
+            use_fahrenheit=use_fahrenheit,
+            location_name=location.display_name
+        )
+        return self._store_snapshot(key, location, weather)
+
+    def _store_snapshot(self, key: tuple, location: Location, weather: CompleteWeatherData,
+                        stored_at: Optional[datetime] = None) -> _Snapshot:
+        index = self._spatial_index()
+        snapshot = _Snapshot(weather, stored_at)
+        cell = key[0]
+        with self._snapshots_lock:
+            if cell not in index:
+                # Nearby requests from now on share this entry (and its point)
+                index.add(cell, location.latitude, location.longitude)
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.SNAPSHOT_CACHE_SIZE:
+                (cell, _), _ = self._snapshots.popitem(last=False)
+                if not any(k[0] == cell for k in self._snapshots):
+                    index.remove(cell)
+        return snapshot
+
+    def _cached_snapshot(self, key: tuple, name: str = "",
+                         max_age: Optional[timedelta] = None) -> Optional[CompleteWeatherData]:
+        """Cached forecast for a key, if present and (when max_age is given) fresh."""
+        with self._snapshots_lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                return None
+            if max_age is not None and datetime.now() - snapshot.stored_at >= max_age:
+                return None
+            self._snapshots.move_to_end(key)
+            return snapshot.named(name)
+
+    def cache_age(self, location: Location, use_fahrenheit: bool) -> Optional[float]:
+        """Seconds since the shared cache entry covering a location was stored, or None."""
+        index = self._spatial_index()
+        cell = index.nearest(location.latitude, location.longitude)
+        if cell is None:
+            return None
+        with self._snapshots_lock:
+            snapshot = self._snapshots.get((cell, use_fahrenheit))
+            if snapshot is None:
+                return None
+            return (datetime.now() - snapshot.stored_at).total_seconds()
+
+    def fetches_in_flight(self) -> int:
+        """Number of upstream forecast fetches currently running."""
+        return self._flights.in_flight()
+
+    def export_state(self) -> dict:
+        """
+        Fresh cache entries in a JSON-safe form, for handing over to a new process.
+
+        Only entries younger than CACHE_DURATION_MINUTES are included; older
+        ones would be refetched anyway.
+        """
+        max_age = timedelta(minutes=self.CACHE_DURATION_MINUTES)
+        now = datetime.now()
+        index = self._spatial_index()
+        with self._snapshots_lock:
+            entries = [(key, s) for key, s in self._snapshots.items() if now - s.stored_at < max_age]
+        snapshots = []
+        for (cell, use_fahrenheit), snapshot in entries:
+            point = index.point(cell)
+            if point is None:
+                continue
+            snapshots.append({
+                'latitude': point[0],
+                'longitude': point[1],
+                'use_fahrenheit': use_fahrenheit,
+                'stored_at': snapshot.stored_at.isoformat(),
+                'weather': snapshot.weather.to_dict(),
+            })
+
+        menu = None
+        if self._cache is not None and self._cache_location is not None and self._cache_timestamp is not None:
+            menu = {
+                'location': self._cache_location.to_dict(),
+                'use_fahrenheit': self._cache_use_fahrenheit,
+                'stored_at': self._cache_timestamp.isoformat(),
+                'weather': self._cache.to_dict(),
+            }
+        return {'snapshots': snapshots, 'menu': menu}
+
+    def import_state(self, state: dict) -> int:
+        """
+        Adopt cache entries exported by another process.
+
+        Entries keep their original age, so they expire when they would
+        have in the process that fetched them.
+
+        Returns:
+            Number of entries imported
+        """
+        imported = 0
+        for entry in state.get('snapshots', []):
+            try:
+                location = Location(name="", latitude=entry['latitude'], longitude=entry['longitude'],
+                                    country="", timezone="auto")
+                weather = CompleteWeatherData.from_dict(entry['weather'])
+                key = self._snapshot_key(location, entry['use_fahrenheit'])
+                self._store_snapshot(key, location, weather, datetime.fromisoformat(entry['stored_at']))
+                imported += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Skipping handed-over cache entry: %s", e)
+
+        menu = state.get('menu')
+        if menu:
+            try:
+                self._cache = CompleteWeatherData.from_dict(menu['weather'])
+                self._cache_location = Location.from_dict(menu['location'])
+                self._cache_use_fahrenheit = menu['use_fahrenheit']
+                self._cache_timestamp = datetime.fromisoformat(menu['stored_at'])
+                imported += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Skipping handed-over menu forecast: %s", e)
+        logger.info("Imported %d cached forecasts from the previous instance", imported)
+        return imported
+
+    def get_location(self) -> Location:
+        """The location the menu bar shows, detecting it from IP in auto mode."""
+        return self._get_location(self.settings_service.load())
+
     def _get_location(self, settings: Settings) -> Location:
         """Get current location based on settings."""
+        from ..api.geolocation_client import GeolocationError
+
         if settings.location_mode == "manual" and settings.location:
             return settings.location
 
@@ -87,7 +678,7 @@ class WeatherService:
                 self.settings_service.update(location=location)
                 return location
             except GeolocationError as e:
-                logger.warning(f"Auto-detect failed: {e}")
+                logger.warning("Auto-detect failed: %s", e)
 
         # Fallback to saved location or default
         if settings.location:
@@ -95,17 +686,21 @@ class WeatherService:
 
         return Location.default()
 
-    def _is_cache_valid(self, location: Location) -> bool:
-        """Check if cached data is still valid."""
+    def _is_cache_valid(self, location: Location, use_fahrenheit: bool) -> bool:
+        """Check if the menu's cached data is still valid."""
         if self._cache is None or self._cache_timestamp is None:
             return False
 
-        # Check if cache is for same location
-        if self._cache_location is None:
+        # Check if cache is for same location (by name, so the title stays
+        # right) and units; nearby locations are served by the shared cache
+        if self._cache_location is None or self._cache_use_fahrenheit != use_fahrenheit:
             return False
 
-        if (self._cache_location.latitude != location.latitude or
-            self._cache_location.longitude != location.longitude):
+        if self._cache_location.display_name != location.display_name:
+            return False
+        index = self._spatial_index()
+        if (index.grid.cell(self._cache_location.latitude, self._cache_location.longitude) !=
+                index.grid.cell(location.latitude, location.longitude)):
             return False
 
         # Check if cache is fresh
@@ -122,11 +717,40 @@ class WeatherService:
         Returns:
             List of matching Location objects
         """
+        from ..api.geocoding_client import GeocodingError
+
+        normalized = normalize_query(query)
+        cached = self.search_cache.get(normalized)
+        if cached is not None:
+            CACHE_REQUESTS.inc(cache="search", result="hit")
+            return list(cached)
+        CACHE_REQUESTS.inc(cache="search", result="miss")
         try:
-            return self.geocoding_client.search(query)
+            locations = self.geocoding_client.search(query)
         except GeocodingError as e:
-            logger.error(f"Location search failed: {e}")
+            logger.error("Location search failed: %s", e)
             return []
+        self.search_cache.put(normalized, locations)
+        return locations
+
+    def search_as_you_type(self, on_results: ResultsCallback,
+                           debounce_seconds: float = 0.15) -> LocationSearch:
+        """
+        Start an incremental search session.
+
+        Feed it the search text after every keystroke with
+        ``LocationSearch.update``; ``on_results(query, locations, final)`` is
+        called with local matches at once and with the network results once
+        typing pauses. Superseded lookups are cancelled.
+
+        Args:
+            on_results: Receives each result set (on a worker thread)
+            debounce_seconds: Typing pause before the network is queried
+
+        Returns:
+            The session; close it when the search field goes away
+        """
+        return LocationSearch(self, on_results, debounce_seconds=debounce_seconds)
 
     def set_location(self, location: Location) -> None:
         """
@@ -139,7 +763,9 @@ class WeatherService:
             location=location,
             location_mode="manual"
         )
-        # Invalidate cache since location changed
+        self.usage.record(location, self.settings_service.load().use_fahrenheit, source="manual")
+        # Invalidate the menu's cache since location changed; the next
+        # get_weather is served from the shared cache if it was prefetched
         self._cache = None
         self._cache_timestamp = None
 
@@ -153,6 +779,8 @@ class WeatherService:
         Raises:
             WeatherServiceError: If detection fails
         """
+        from ..api.geolocation_client import GeolocationError
+
         try:
             location = self.geolocation_client.detect_location()
             self.settings_service.update(
@@ -166,6 +794,35 @@ class WeatherService:
         except GeolocationError as e:
             raise WeatherServiceError(f"Failed to detect location: {e}") from e
 
+    def get_nowcast(self) -> Optional[NowcastBuffer]:
+        """
+        Refresh the 15-minute nowcast for the location of the cached forecast.
+
+        Cheap enough to run more often than the full forecast; the new steps
+        are merged into the cached forecast's buffer in place.
+
+        Returns:
+            The merged NowcastBuffer, or None if nothing has been fetched yet
+
+        Raises:
+            WeatherServiceError: If the nowcast cannot be fetched
+        """
+        from ..api.weather_client import WeatherAPIError
+
+        location, cache = self._cache_location, self._cache
+        if location is None or cache is None:
+            return None
+        settings = self.settings_service.load()
+        try:
+            return self.weather_client.get_nowcast(
+                latitude=location.latitude,
+                longitude=location.longitude,
+                use_fahrenheit=settings.use_fahrenheit,
+                location_name=cache.location_name
+            )
+        except WeatherAPIError as e:
+            raise WeatherServiceError(f"Failed to fetch nowcast: {e}") from e
+
     def get_cached_data(self) -> Optional[CompleteWeatherData]:
         """Get cached weather data without fetching."""
         return self._cache
@@ -174,3 +831,8 @@ class WeatherService:
 class WeatherServiceError(Exception):
     """Exception raised when weather service operations fail."""
     pass
+
+
+class WeatherServiceBusy(WeatherServiceError):
+    """Exception raised when a fetch is refused because every fetch slot is taken."""
+    pass
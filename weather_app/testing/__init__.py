@@ -0,0 +1,5 @@
+"""Tooling for exercising WeatherBar without the real upstream services."""
+
+from .fixture_server import FaultConfig, FixtureServer
+
+__all__ = ['FaultConfig', 'FixtureServer']
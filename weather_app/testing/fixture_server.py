@@ -0,0 +1,613 @@
+"""Local stand-in for the Open-Meteo and IP geolocation endpoints.
+
+Serves deterministic forecast, archive, air-quality, geocoding and IP
+geolocation responses for any coordinate, with configurable latency, errors,
+hangs and rate limiting, so the clients in ``weather_app.api`` can be
+soak-tested and benchmarked offline. Forecasts requested with
+``format=flatbuffers`` are encoded as FlatBuffers when the ``flatbuffers``
+package is installed, and as JSON otherwise.
+
+Run it with::
+
+    python -m weather_app.testing.fixture_server --port 8765 --latency lognormal:80:0.6
+
+and point the app at it with ``WEATHERBAR_API_BASE=http://127.0.0.1:8765``.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+FORECAST_PATH = "/v1/forecast"
+ARCHIVE_PATH = "/v1/archive"
+ENSEMBLE_PATH = "/v1/ensemble"
+AIR_QUALITY_PATH = "/v1/air-quality"
+ENSEMBLE_MEMBERS = {"icon_seamless": 40, "gfs_seamless": 31, "ecmwf_ifs025": 51}  # Control included
+GEOCODING_PATH = "/v1/search"
+GEOLOCATION_PATH = "/json/"  # ip-api.com
+IPWHOIS_PATH = "/"
+FREEIPAPI_PATH = "/api/json"
+
+# Small gazetteer so geocoding searches return realistic names first
+KNOWN_PLACES = [
+    ("San Diego", 32.7157, -117.1611, "United States", "US", "CA", "America/Los_Angeles"),
+    ("San Francisco", 37.7749, -122.4194, "United States", "US", "CA", "America/Los_Angeles"),
+    ("San Antonio", 29.4241, -98.4936, "United States", "US", "TX", "America/Chicago"),
+    ("Seattle", 47.6062, -122.3321, "United States", "US", "WA", "America/Los_Angeles"),
+    ("New York", 40.7128, -74.0060, "United States", "US", "NY", "America/New_York"),
+    ("London", 51.5072, -0.1276, "United Kingdom", "GB", "England", "Europe/London"),
+    ("Paris", 48.8566, 2.3522, "France", "FR", "Ile-de-France", "Europe/Paris"),
+    ("Berlin", 52.5200, 13.4050, "Germany", "DE", "Berlin", "Europe/Berlin"),
+    ("Tokyo", 35.6762, 139.6503, "Japan", "JP", "Tokyo", "Asia/Tokyo"),
+    ("Sydney", -33.8688, 151.2093, "Australia", "AU", "New South Wales", "Australia/Sydney"),
+]
+
+
+@dataclass
+class FaultConfig:
+    """Latency and failure injection settings for the fixture server."""
+    latency_distribution: str = "constant"  # "constant", "uniform", "lognormal" or "pareto"
+    latency_ms: float = 0.0  # Mean (constant/uniform), median (lognormal) or scale (pareto)
+    latency_spread: float = 0.0  # Half-width in ms (uniform), sigma (lognormal) or alpha (pareto)
+    error_rate: float = 0.0  # Fraction of requests answered with a 5xx
+    timeout_rate: float = 0.0  # Fraction of requests that hang and are then dropped
+    hang_seconds: float = 30.0  # How long a "timed out" request hangs
+    rate_limit_per_second: float = 0.0  # Token bucket refill rate; 0 disables limiting
+    rate_limit_burst: int = 10
+    seed: Optional[int] = None  # Seed for the fault RNG (data is always deterministic)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one response delay in seconds."""
+        base = self.latency_ms
+        if base <= 0:
+            return 0.0
+        dist = self.latency_distribution
+        if dist == "uniform":
+            delay = rng.uniform(base - self.latency_spread, base + self.latency_spread)
+        elif dist == "lognormal":
+            delay = base * math.exp(rng.gauss(0.0, self.latency_spread or 0.5))
+        elif dist == "pareto":
+            delay = base * rng.paretovariate(self.latency_spread or 2.0)
+        else:
+            delay = base
+        return max(delay, 0.0) / 1000.0
+
+    @classmethod
+    def parse_latency(cls, spec: str) -> Tuple[str, float, float]:
+        """
+        Parse a latency spec such as ``"lognormal:80:0.6"`` or ``"50"``.
+
+        Returns:
+            Tuple of (distribution, latency_ms, spread)
+        """
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return "constant", float(parts[0]), 0.0
+        spread = float(parts[2]) if len(parts) > 2 else 0.0
+        return parts[0], float(parts[1]), spread
+
+
+class _TokenBucket:
+    """Thread-safe token bucket used to emulate upstream rate limits."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> Optional[float]:
+        """Take a token; returns None on success or seconds until one is free."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate
+
+
+# ---------------------------------------------------------------------------
+# Deterministic data generation
+# ---------------------------------------------------------------------------
+
+def _coord_rng(*key) -> random.Random:
+    """Random generator seeded by a stable hash of the given key."""
+    digest = hashlib.sha256(repr(key).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _variable_value(name: str, when: datetime, lat: float, lon: float,
+                    use_fahrenheit: bool, wind_mph: bool) -> float:
+    """Deterministic value of an API variable at a point in time."""
+    rng = _coord_rng(round(lat, 2), round(lon, 2), name, when.isoformat())
+    hour = when.hour + when.minute / 60.0
+    diurnal = math.sin((hour - 9) / 24.0 * 2 * math.pi)
+    seasonal = math.cos((when.timetuple().tm_yday - 200) / 365.0 * 2 * math.pi)
+    base_c = 25 - abs(lat) * 0.4 + 8 * seasonal * (1 if lat >= 0 else -1)
+
+    if name.startswith(("temperature", "apparent_temperature")):
+        value = base_c + 5 * diurnal + rng.uniform(-1.5, 1.5)
+        if name.endswith("_max"):
+            value = base_c + 6 + rng.uniform(-1, 1)
+        elif name.endswith("_min"):
+            value = base_c - 5 + rng.uniform(-1, 1)
+        if name.startswith("apparent"):
+            value -= 1.5
+        return round(value * 9 / 5 + 32 if use_fahrenheit else value, 1)
+    if name.startswith("relative_humidity"):
+        return float(int(60 - 20 * diurnal + rng.uniform(-8, 8)))
+    if name.startswith("weather_code"):
+        return float(rng.choice([0, 0, 1, 2, 3, 3, 45, 51, 61, 63, 80, 95]))
+    if name.startswith("precipitation_probability"):
+        return float(max(0, min(100, int(rng.gauss(20, 25)))))
+    if name.startswith(("precipitation", "rain", "showers")):
+        return round(max(0.0, rng.gauss(0.0, 0.6)), 1)
+    if name.startswith("wind_speed"):
+        value = abs(rng.gauss(12, 6))
+        return round(value / 1.609 if wind_mph else value, 1)
+    if name.startswith("wind_direction"):
+        return float(rng.randint(0, 359))
+    if name.startswith("pressure"):
+        return round(1013 + rng.gauss(0, 6), 1)
+    if name.startswith("visibility"):
+        return float(rng.choice([24140, 16000, 10000, 5000]))
+    if name.startswith("uv_index"):
+        return round(max(0.0, 8 * diurnal + rng.uniform(0, 2)), 2)
+    if name == "is_day":
+        return 1.0 if 6 <= when.hour < 19 else 0.0
+    return round(rng.uniform(0, 100), 2)
+
+
+def _section_times(section: str, start: datetime, params: Dict[str, str]) -> List[datetime]:
+    """Time axis for a response section."""
+    days = int(params.get("forecast_days", 7))
+    if "start_date" in params:
+        # Archive request: a fixed range of whole days
+        start = datetime.fromisoformat(params["start_date"])
+        days = (datetime.fromisoformat(params["end_date"]) - start).days + 1
+        if days < 1:
+            raise ValueError("end_date is before start_date")
+    if section == "daily":
+        day0 = start.replace(hour=0, minute=0)
+        return [day0 + timedelta(days=i) for i in range(days)]
+    if section == "minutely_15":
+        steps = int(params.get("forecast_minutely_15", days * 96))
+        return [start + timedelta(minutes=15 * i) for i in range(steps)]
+    hours = int(params.get("forecast_hours", days * 24))
+    day0 = start.replace(hour=0, minute=0)
+    return [day0 + timedelta(hours=i) for i in range(hours)]
+
+
+def _daily_sun_time(name: str, day: datetime) -> str:
+    if name == "sunrise":
+        return day.replace(hour=6, minute=12).strftime("%Y-%m-%dT%H:%M")
+    return day.replace(hour=19, minute=48).strftime("%Y-%m-%dT%H:%M")
+
+
+def _member_series(name: str, params: Dict[str, str], ensemble: bool) -> List[str]:
+    """Response keys for a variable under ``models``: one per model or ensemble member."""
+    models = [m for m in params.get("models", "").split(",") if m]
+    if not ensemble:
+        return [f"{name}_{m}" for m in models] if len(models) > 1 else [name]
+    keys = []
+    for model in models or ["icon_seamless"]:
+        suffix = f"_{model}" if len(models) > 1 else ""
+        for member in range(ENSEMBLE_MEMBERS.get(model, 21)):
+            keys.append(f"{name}_member{member:02d}{suffix}" if member else f"{name}{suffix}")
+    return keys
+
+
+def generate_forecast(latitude: float, longitude: float, params: Dict[str, str],
+                      now: Optional[datetime] = None, ensemble: bool = False) -> dict:
+    """
+    Build an Open-Meteo style forecast response for one coordinate.
+
+    Any variable requested in ``current``, ``minutely_15``, ``hourly`` or
+    ``daily`` is served. Values depend only on the coordinate, variable and
+    timestamp, so repeated requests within the same period are identical.
+    Hourly variables are served per model (or per ensemble member when
+    ``ensemble`` is set) if ``models`` is given.
+    """
+    now = now or datetime.now()
+    use_f = params.get("temperature_unit") == "fahrenheit"
+    wind_mph = params.get("wind_speed_unit") == "mph"
+    start = now.replace(minute=(now.minute // 15) * 15, second=0, microsecond=0)
+    # Times are this machine's wall clock; say so, as the API does for "timezone=auto"
+    zone = start.astimezone()
+
+    data = {
+        "latitude": round(latitude, 4),
+        "longitude": round(longitude, 4),
+        "generationtime_ms": 0.05,
+        "utc_offset_seconds": int(zone.utcoffset().total_seconds()),
+        "timezone": zone.tzname(),
+        "timezone_abbreviation": zone.tzname(),
+        "elevation": float(_coord_rng(round(latitude, 2), round(longitude, 2)).randint(0, 800)),
+    }
+
+    current_vars = [v for v in params.get("current", "").split(",") if v]
+    if current_vars:
+        current = {"time": start.strftime("%Y-%m-%dT%H:%M"), "interval": 900}
+        for name in current_vars:
+            current[name] = _variable_value(name, start, latitude, longitude, use_f, wind_mph)
+        data["current"] = current
+
+    for section in ("minutely_15", "hourly", "daily"):
+        names = [v for v in params.get(section, "").split(",") if v]
+        if not names:
+            continue
+        times = _section_times(section, start, params)
+        fmt = "%Y-%m-%d" if section == "daily" else "%Y-%m-%dT%H:%M"
+        block = {"time": [t.strftime(fmt) for t in times]}
+        for name in names:
+            if section == "daily" and name in ("sunrise", "sunset"):
+                block[name] = [_daily_sun_time(name, t) for t in times]
+                continue
+            keys = _member_series(name, params, ensemble) if section == "hourly" else [name]
+            for key in keys:
+                block[key] = [
+                    _variable_value(key, t, latitude, longitude, use_f, wind_mph)
+                    for t in times
+                ]
+        data[section] = block
+
+    return data
+
+
+_EPOCH = datetime(1970, 1, 1)
+# Fields per table in the Open-Meteo schema (WeatherApiResponse, VariablesWithTime, VariableWithValues)
+_RESPONSE_FIELDS, _SECTION_FIELDS, _VARIABLE_FIELDS = 15, 4, 13
+_SECTION_SLOTS = {"current": 9, "daily": 10, "hourly": 11, "minutely_15": 12}
+_SECTION_INTERVALS = {"current": 900, "daily": 86400, "hourly": 3600, "minutely_15": 900}
+
+
+def _unix(iso: str) -> int:
+    return int((datetime.fromisoformat(iso) - _EPOCH).total_seconds())
+
+
+def encode_flatbuffers(bodies: List[dict], params: Dict[str, str]) -> Optional[bytes]:
+    """
+    Encode forecasts as size-prefixed Open-Meteo FlatBuffers messages.
+
+    Variables are written in request order, like the real API. Returns None
+    if the ``flatbuffers`` package is not installed.
+    """
+    try:
+        import flatbuffers
+    except ImportError:
+        return None
+
+    out = bytearray()
+    for body in bodies:
+        b = flatbuffers.Builder(4096)
+        utc_offset = body["utc_offset_seconds"]  # Times on the wire are Unix seconds, not wall clock
+        sections = {}
+        for section, slot in _SECTION_SLOTS.items():
+            block = body.get(section)
+            names = [v for v in params.get(section, "").split(",") if v]
+            if not block or not names:
+                continue
+            variables = []
+            for name in names:
+                values = block[name]
+                vector = None
+                if section != "current":
+                    int64 = name in ("sunrise", "sunset")
+                    b.StartVector(8 if int64 else 4, len(values), 8 if int64 else 4)
+                    for value in reversed(values):
+                        if int64:
+                            b.PrependInt64(_unix(value) - utc_offset)
+                        else:
+                            b.PrependFloat32(float("nan") if value is None else value)
+                    vector = b.EndVector()
+                b.StartObject(_VARIABLE_FIELDS)
+                if section == "current":
+                    b.PrependFloat32Slot(2, values, 0.0)
+                else:
+                    b.PrependUOffsetTRelativeSlot(4 if name in ("sunrise", "sunset") else 3, vector, 0)
+                variables.append(b.EndObject())
+            b.StartVector(4, len(variables), 4)
+            for variable in reversed(variables):
+                b.PrependUOffsetTRelative(variable)
+            vector = b.EndVector()
+            interval = _SECTION_INTERVALS[section]
+            if section == "current":
+                start = _unix(block["time"]) - utc_offset
+            else:
+                start = _unix(block["time"][0]) - utc_offset if block["time"] else 0
+            length = 1 if section == "current" else len(block["time"])
+            b.StartObject(_SECTION_FIELDS)
+            b.PrependInt64Slot(0, start, 0)
+            b.PrependInt64Slot(1, start + length * interval, 0)
+            b.PrependInt32Slot(2, interval, 0)
+            b.PrependUOffsetTRelativeSlot(3, vector, 0)
+            sections[slot] = b.EndObject()
+
+        b.StartObject(_RESPONSE_FIELDS)
+        b.PrependFloat32Slot(0, body["latitude"], 0.0)
+        b.PrependFloat32Slot(1, body["longitude"], 0.0)
+        b.PrependFloat32Slot(2, body["elevation"], 0.0)
+        b.PrependFloat32Slot(3, body["generationtime_ms"], 0.0)
+        b.PrependInt32Slot(6, body["utc_offset_seconds"], 0)
+        for slot, offset in sections.items():
+            b.PrependUOffsetTRelativeSlot(slot, offset, 0)
+        b.FinishSizePrefixed(b.EndObject())
+        out += b.Output()
+    return bytes(out)
+
+
+def generate_geocoding(name: str, count: int) -> dict:
+    """Build a geocoding response; unknown names get a synthetic match."""
+    query = name.strip().lower()
+    results = []
+    for idx, (place, lat, lon, country, code, admin1, tz) in enumerate(KNOWN_PLACES):
+        if place.lower().startswith(query):
+            results.append({
+                "id": idx + 1, "name": place, "latitude": lat, "longitude": lon,
+                "country": country, "country_code": code, "admin1": admin1, "timezone": tz,
+            })
+    if not results and query:
+        rng = _coord_rng("geocode", query)
+        results.append({
+            "id": rng.randint(1000, 10**7), "name": name.strip().title(),
+            "latitude": round(rng.uniform(-60, 70), 4),
+            "longitude": round(rng.uniform(-180, 180), 4),
+            "country": "Fixtureland", "country_code": "FX", "admin1": "Testshire",
+            "timezone": "UTC",
+        })
+    return {"results": results[:count], "generationtime_ms": 0.1} if results else {"generationtime_ms": 0.1}
+
+
+def generate_geolocation() -> dict:
+    """Build an ip-api.com style response."""
+    return {
+        "status": "success", "country": "United States", "countryCode": "US",
+        "region": "CA", "regionName": "California", "city": "San Diego",
+        "lat": 32.7157, "lon": -117.1611, "timezone": "America/Los_Angeles",
+        "query": "127.0.0.1",
+    }
+
+
+def generate_ipwhois() -> dict:
+    """Build an ipwho.is style response for the same place."""
+    return {
+        "ip": "127.0.0.1", "success": True, "type": "IPv4", "country": "United States",
+        "country_code": "US", "region": "California", "region_code": "CA", "city": "San Diego",
+        "latitude": 32.7157, "longitude": -117.1611,
+        "timezone": {"id": "America/Los_Angeles", "abbr": "PDT", "utc": "-07:00"},
+    }
+
+
+def generate_freeipapi() -> dict:
+    """Build a freeipapi.com style response for the same place."""
+    return {
+        "ipVersion": 4, "ipAddress": "127.0.0.1", "latitude": 32.7157, "longitude": -117.1611,
+        "countryName": "United States of America", "countryCode": "US",
+        "timeZones": ["America/Los_Angeles"], "cityName": "San Diego", "regionName": "California",
+    }
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Routes requests to the data generators after applying faults."""
+
+    server_version = "WeatherBarFixture/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - " + format, self.address_string(), *args)
+
+    def do_GET(self):
+        fixture: FixtureServer = self.server.fixture
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        fixture._count("requests")
+
+        retry_after = fixture._bucket.take() if fixture._bucket else None
+        if retry_after is not None:
+            fixture._count("rate_limited")
+            self._send_json(429, {"error": True, "reason": "Too many requests"},
+                            {"Retry-After": str(max(1, math.ceil(retry_after)))})
+            return
+
+        faults = fixture.faults
+        with fixture._rng_lock:
+            roll = fixture._rng.random()
+            delay = faults.sample_latency(fixture._rng)
+
+        if roll < faults.timeout_rate:
+            fixture._count("timeouts")
+            time.sleep(faults.hang_seconds)
+            self.close_connection = True
+            return
+
+        if delay:
+            time.sleep(delay)
+
+        if roll < faults.timeout_rate + faults.error_rate:
+            fixture._count("errors")
+            self._send_json(503, {"error": True, "reason": "Injected failure"})
+            return
+
+        try:
+            if parts.path in (FORECAST_PATH, ARCHIVE_PATH, ENSEMBLE_PATH, AIR_QUALITY_PATH):
+                body = self._forecast(params, ensemble=parts.path == ENSEMBLE_PATH)
+            elif parts.path == GEOCODING_PATH:
+                body = generate_geocoding(params.get("name", ""), int(params.get("count", 10)))
+            elif parts.path.rstrip("/") == GEOLOCATION_PATH.rstrip("/"):
+                body = generate_geolocation()
+            elif parts.path == IPWHOIS_PATH:
+                body = generate_ipwhois()
+            elif parts.path == FREEIPAPI_PATH:
+                body = generate_freeipapi()
+            else:
+                self._send_json(404, {"error": True, "reason": f"Unknown path {parts.path}"})
+                return
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": True, "reason": str(e)})
+            return
+
+        fixture._count("ok")
+        if isinstance(body, bytes):
+            self._send_bytes(200, body, "application/octet-stream")
+        else:
+            self._send_json(200, body)
+
+    def _forecast(self, params: Dict[str, str], ensemble: bool = False):
+        lats = [float(v) for v in params["latitude"].split(",")]
+        lons = [float(v) for v in params["longitude"].split(",")]
+        if len(lats) != len(lons):
+            raise ValueError("latitude and longitude must have the same length")
+        bodies = [generate_forecast(lat, lon, params, ensemble=ensemble) for lat, lon in zip(lats, lons)]
+        if params.get("format") == "flatbuffers":
+            encoded = encode_flatbuffers(bodies, params)
+            if encoded is not None:
+                return encoded
+        return bodies[0] if len(bodies) == 1 else bodies
+
+    def _send_json(self, status: int, body, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        self._send_bytes(status, payload, "application/json", headers)
+
+    def _send_bytes(self, status: int, payload: bytes, content_type: str,
+                    headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FixtureServer:
+    """Threaded local HTTP server imitating the upstream weather APIs."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 faults: Optional[FaultConfig] = None):
+        """
+        Initialize the server (not started yet).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+            faults: Latency and failure injection settings
+        """
+        self.faults = faults or FaultConfig()
+        self._rng = random.Random(self.faults.seed)
+        self._rng_lock = threading.Lock()
+        self._bucket = (
+            _TokenBucket(self.faults.rate_limit_per_second, self.faults.rate_limit_burst)
+            if self.faults.rate_limit_per_second > 0 else None
+        )
+        self._stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fixture = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Value to use for WEATHERBAR_API_BASE."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of request counters."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def start(self) -> 'FixtureServer':
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fixture-server", daemon=True
+        )
+        self._thread.start()
+        logger.info("Fixture server listening on %s", self.base_url)
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def serve_forever(self):
+        """Serve requests on the calling thread."""
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Local Open-Meteo/ip-api stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="0",
+                        help="MS, or DIST:MS[:SPREAD] with DIST in constant/uniform/lognormal/pareto")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Requests per second before answering 429 (0 disables)")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    distribution, latency_ms, spread = FaultConfig.parse_latency(args.latency)
+    faults = FaultConfig(
+        latency_distribution=distribution,
+        latency_ms=latency_ms,
+        latency_spread=spread,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        rate_limit_per_second=args.rate_limit,
+        rate_limit_burst=args.burst,
+        seed=args.seed,
+    )
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = FixtureServer(args.host, args.port, faults)
+    print(f"export WEATHERBAR_API_BASE={server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,609 @@
+"""Soak test for the menu-bar app: months of ticks in minutes.
+
+The menu-bar process runs for weeks, so slow leaks matter more than speed.
+This harness runs the real ``WeatherMenuBarApp`` and ``WeatherService``
+against an in-process ``FixtureServer``, with a stand-in for ``rumps`` (and
+``PyObjCTools.AppHelper``) whose timers run on a virtual clock. Each timer
+firing jumps the clock straight to its due time, so a 15-minute update
+interval costs only the time of the update itself. Along the way the user is
+simulated too: display mode and unit changes, manual refreshes, location
+changes and menus rebuilt with ``MenuBuilder``.
+
+Once per simulated day the harness records RSS, memory traced by
+``tracemalloc``, thread count, open file descriptors and the size of the
+log directory. After a warm-up, a least-squares trend is fitted to each
+series; the run fails if any of them would grow by more than its budget
+over the measured span, or if rotation lets the logs outgrow their cap::
+
+    python -m weather_app.testing.soak --days 60
+
+The fixture server generating forecasts is the bottleneck. The menu
+refreshes its location on its own timer, so prefetch cycles add timer
+ticks but no upstream requests; ``--no-prefetch`` leaves the ticks out.
+"""
+
+import argparse
+import gc
+import heapq
+import itertools
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+
+from .fixture_server import FixtureServer
+
+logger = logging.getLogger(__name__)
+
+MIB = 1024 * 1024
+PACKAGE = __package__.split(".")[0]
+
+# Growth allowed over the measured span, per metric
+DEFAULT_BUDGETS = {
+    "rss_bytes": 8 * MIB,
+    "traced_bytes": 1 * MIB,
+    "threads": 1,
+    "fds": 2,
+}
+
+# Small log files so rotation is reached within a short soak
+LOG_MAX_BYTES = 64 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_CAP_BYTES = (LOG_BACKUP_COUNT + 1) * LOG_MAX_BYTES + 4096  # Plus one record of slack
+
+SCENARIO_LOCATIONS = [
+    ("San Diego", 32.7157, -117.1611, "United States", "America/Los_Angeles", "US", "California"),
+    ("Oslo", 59.9139, 10.7522, "Norway", "Europe/Oslo", "NO", None),
+    ("Tokyo", 35.6762, 139.6503, "Japan", "Asia/Tokyo", "JP", None),
+    ("Sydney", -33.8688, 151.2093, "Australia", "Australia/Sydney", "AU", "New South Wales"),
+]
+
+
+class VirtualClock:
+    """Wall-clock time that only moves when ``advance_to`` is called.
+
+    ``patch`` swaps the ``time`` module and the ``datetime`` class imported
+    by the package's modules for stand-ins reading this clock. Only
+    ``time.time`` and ``datetime.now``/``today``/``utcnow`` are virtual;
+    monotonic and performance counters, ``sleep`` and everything else keep
+    running on real time, so timeouts and latency metrics stay meaningful.
+    """
+
+    def __init__(self, start: float):
+        self._now = start
+        self._lock = threading.Lock()
+        self._patched: Dict[str, Dict[str, object]] = {}
+        self.time_module = self._time_module()
+        self.datetime_class = self._datetime_class()
+
+    def time(self) -> float:
+        """Current virtual Unix time."""
+        with self._lock:
+            return self._now
+
+    def advance_to(self, when: float):
+        """Move the clock forward (never back)."""
+        with self._lock:
+            self._now = max(self._now, when)
+
+    def _time_module(self):
+        clock = self
+
+        class _VirtualTime(types.ModuleType):
+            def __getattr__(self, name):
+                return getattr(time, name)
+
+            @staticmethod
+            def time() -> float:
+                return clock.time()
+
+        return _VirtualTime("time")
+
+    def _datetime_class(self):
+        clock = self
+
+        class _AnyDatetime(type):
+            # Real datetimes (e.g. from numpy or json) still pass isinstance checks
+            def __instancecheck__(cls, obj):
+                return isinstance(obj, datetime)
+
+        class _VirtualDatetime(datetime, metaclass=_AnyDatetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls.fromtimestamp(clock.time(), tz)
+
+            @classmethod
+            def today(cls):
+                return cls.now()
+
+            @classmethod
+            def utcnow(cls):
+                return cls.now(timezone.utc).replace(tzinfo=None)
+
+        return _VirtualDatetime
+
+    def patch(self, prefix: str = PACKAGE, exclude: tuple = (__name__,)):
+        """Point every loaded module under ``prefix`` at the virtual clock.
+
+        Idempotent and cheap, so it can be repeated to catch modules that
+        are imported lazily.
+        """
+        for name, module in list(sys.modules.items()):
+            if module is None or name in exclude or name in self._patched:
+                continue
+            if name != prefix and not name.startswith(prefix + "."):
+                continue
+            saved = {}
+            if getattr(module, "time", None) is time:
+                saved["time"] = time
+                module.time = self.time_module
+            if getattr(module, "datetime", None) is datetime:
+                saved["datetime"] = datetime
+                module.datetime = self.datetime_class
+            self._patched[name] = saved
+
+    def restore(self):
+        """Undo ``patch``."""
+        for name, saved in self._patched.items():
+            module = sys.modules.get(name)
+            if module is not None:
+                for attr, value in saved.items():
+                    setattr(module, attr, value)
+        self._patched.clear()
+
+
+class TimerScheduler:
+    """Due times of the stand-in rumps timers, on the virtual clock."""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._generation: Dict[int, int] = {}
+
+    def schedule(self, timer, when: float):
+        generation = self._generation.get(id(timer), 0) + 1
+        self._generation[id(timer)] = generation
+        heapq.heappush(self._heap, (when, next(self._seq), generation, timer))
+
+    def cancel(self, timer):
+        self._generation[id(timer)] = self._generation.get(id(timer), 0) + 1
+
+    def pop_due(self):
+        """Advance the clock to the next timer and return it (None if none are running)."""
+        while self._heap:
+            when, _, generation, timer = heapq.heappop(self._heap)
+            if self._generation.get(id(timer)) != generation:
+                continue  # Stopped or restarted since
+            self.clock.advance_to(when)
+            self.schedule(timer, when + timer.interval)
+            return timer
+        return None
+
+
+def install_stubs(scheduler: TimerScheduler, main_queue: Deque[Callable[[], None]]) -> Dict[str, int]:
+    """
+    Install stand-ins for ``rumps`` and ``PyObjCTools.AppHelper``.
+
+    Menus are plain Python objects, timers go to ``scheduler`` and
+    ``AppHelper.callAfter`` appends to ``main_queue``, which the harness
+    drains as the main thread.
+
+    Returns:
+        Counters of notifications and alerts shown
+
+    Raises:
+        SoakError: If the app was already imported with the real modules
+    """
+    if "weather_app.app" in sys.modules:
+        raise SoakError("weather_app.app is already imported; run the soak in a fresh interpreter")
+    shown = {"notifications": 0, "alerts": 0}
+
+    class _NSMenuItem:
+        def __init__(self):
+            self.hidden = False
+
+        def setHidden_(self, hidden):
+            self.hidden = bool(hidden)
+
+    class MenuItem:
+        def __init__(self, title, callback=None, key=None, icon=None, dimensions=None, template=None):
+            self.title = str(title)
+            self.callback = callback
+            self.state = False
+            self.items: list = []
+            self._menuitem = _NSMenuItem()
+
+        def add(self, item):
+            self.items.append(item)
+
+        def set_callback(self, callback, key=None):
+            self.callback = callback
+
+    class App:
+        def __init__(self, name, title=None, icon=None, template=None, menu=None, quit_button="Quit"):
+            self.name = name
+            self.title = title
+            self.menu = MenuItem(name)
+
+        def run(self, **options):
+            pass
+
+    class Timer:
+        def __init__(self, callback, interval):
+            self.callback = callback
+            self.interval = interval
+
+        def start(self):
+            scheduler.schedule(self, scheduler.clock.time())  # Fires at once, like NSTimer
+
+        def stop(self):
+            scheduler.cancel(self)
+
+    def notification(title, subtitle, message, **options):
+        shown["notifications"] += 1
+
+    def alert(title=None, message="", **options):
+        shown["alerts"] += 1
+        return 1
+
+    rumps = types.ModuleType("rumps")
+    rumps.App, rumps.MenuItem, rumps.Timer = App, MenuItem, Timer
+    rumps.separator = object()
+    rumps.notification, rumps.alert = notification, alert
+    rumps.quit_application = lambda sender=None: None
+
+    pyobjctools = types.ModuleType("PyObjCTools")
+    app_helper = types.ModuleType("PyObjCTools.AppHelper")
+    app_helper.callAfter = lambda fn, *args, **kwargs: main_queue.append(lambda: fn(*args, **kwargs))
+    pyobjctools.AppHelper = app_helper
+
+    sys.modules.update({"rumps": rumps, "PyObjCTools": pyobjctools, "PyObjCTools.AppHelper": app_helper})
+    return shown
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak size where current is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def open_fds() -> int:
+    """Number of open file descriptors."""
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path)) - 1  # The listing's own descriptor
+        except OSError:
+            continue
+    return 0
+
+
+def app_threads() -> int:
+    """Live threads, leaving out the fixture server's per-connection handlers."""
+    return sum(1 for t in threading.enumerate() if "process_request_thread" not in t.name)
+
+
+@dataclass
+class Sample:
+    """Resource usage at one point of the soak."""
+    day: float
+    rss_bytes: int
+    traced_bytes: int
+    threads: int
+    fds: int
+    log_bytes: int
+
+
+@dataclass
+class Trend:
+    """Fitted growth of one metric after the warm-up."""
+    metric: str
+    first: float
+    last: float
+    slope_per_day: float
+    growth: float  # Fitted growth over the measured span
+    budget: float
+
+    @property
+    def ok(self) -> bool:
+        return self.growth <= self.budget
+
+
+@dataclass
+class SoakResult:
+    """Samples, trends and activity of a soak run."""
+    samples: List[Sample] = field(default_factory=list)
+    trends: List[Trend] = field(default_factory=list)
+    ticks: int = 0
+    actions: Dict[str, int] = field(default_factory=dict)
+    requests: Dict[str, int] = field(default_factory=dict)
+    shown: Dict[str, int] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def log_peak_bytes(self) -> int:
+        return max((s.log_bytes for s in self.samples), default=0)
+
+    @property
+    def ok(self) -> bool:
+        return all(t.ok for t in self.trends) and self.log_peak_bytes <= LOG_CAP_BYTES
+
+
+def fit_trends(samples: List[Sample], budgets: Dict[str, float], warmup: float = 0.25) -> List[Trend]:
+    """
+    Least-squares slope of each budgeted metric over the samples after the
+    warm-up fraction.
+    """
+    tail = samples[int(len(samples) * warmup):]
+    if len(tail) < 3:
+        raise SoakError(f"Need at least 3 samples after warm-up, got {len(tail)}; run longer")
+    days = [s.day for s in tail]
+    mean_day = sum(days) / len(days)
+    spread = sum((d - mean_day) ** 2 for d in days)
+    span = days[-1] - days[0]
+    trends = []
+    for metric, budget in budgets.items():
+        values = [getattr(s, metric) for s in tail]
+        mean_value = sum(values) / len(values)
+        slope = sum((d - mean_day) * (v - mean_value) for d, v in zip(days, values)) / spread
+        trends.append(Trend(metric, values[0], values[-1], slope, slope * span, budget))
+    return trends
+
+
+class SoakHarness:
+    """Runs the menu-bar app on a virtual clock and samples its resources."""
+
+    def __init__(self, days: float = 60.0, sample_hours: float = 24.0, seed: int = 1,
+                 directory: Optional[Path] = None, trace: bool = True,
+                 budgets: Optional[Dict[str, float]] = None, warmup: float = 0.25,
+                 settle_timeout: float = 30.0, prefetch: bool = True):
+        """
+        Initialize the harness.
+
+        Args:
+            days: Simulated days to run
+            sample_hours: Simulated hours between samples
+            seed: Seed for the simulated user's actions
+            directory: Settings and logs go here (default: a temporary directory)
+            trace: Track allocations with tracemalloc (slower)
+            budgets: Allowed growth per metric (default: DEFAULT_BUDGETS)
+            warmup: Fraction of samples ignored before fitting trends
+            settle_timeout: Real seconds to wait for an update to finish
+            prefetch: Run prefetch cycles on the virtual clock as well
+        """
+        self.days = days
+        self.sample_seconds = sample_hours * 3600
+        self.rng = random.Random(seed)
+        self.directory = directory
+        self.trace = trace
+        self.budgets = dict(budgets or DEFAULT_BUDGETS)
+        if not trace:
+            self.budgets.pop("traced_bytes", None)
+        self.warmup = warmup
+        self.settle_timeout = settle_timeout
+        self.prefetch = prefetch
+        self.clock = VirtualClock(time.time())
+        self.scheduler = TimerScheduler(self.clock)
+        self._main_queue: Deque[Callable[[], None]] = deque()
+
+    def run(self) -> SoakResult:
+        """Run the soak and fit the trends."""
+        shown = install_stubs(self.scheduler, self._main_queue)
+        with tempfile.TemporaryDirectory(prefix="weatherbar-soak-") as tmp, FixtureServer() as server:
+            directory = Path(self.directory or tmp)
+            previous_base = os.environ.get("WEATHERBAR_API_BASE")
+            os.environ["WEATHERBAR_API_BASE"] = server.base_url
+            try:
+                result = self._run(directory)
+            finally:
+                self.clock.restore()
+                if previous_base is None:
+                    os.environ.pop("WEATHERBAR_API_BASE", None)
+                else:
+                    os.environ["WEATHERBAR_API_BASE"] = previous_base
+            result.requests = server.stats
+        result.shown = dict(shown)
+        result.trends = fit_trends(result.samples, self.budgets, self.warmup)
+        return result
+
+    def _run(self, directory: Path) -> SoakResult:
+        from ..services.settings_service import SettingsService
+        from ..utils import logger as log_config
+
+        SettingsService.SETTINGS_DIR = directory / "settings"
+        SettingsService.SETTINGS_FILE = SettingsService.SETTINGS_DIR / "settings.json"
+        log_config.LOG_DIR = directory / "logs"
+        log_config.LOG_FILE = log_config.LOG_DIR / "weather_bar.log"
+        log_config.setup_logging(max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT)
+        # Exercise alerts and model spread as well as the plain forecast
+        SettingsService().update(alert_rules=["precip probability > 60% within 3h"],
+                                 forecast_models=["gfs_seamless", "icon_seamless"])
+
+        from ..app import WeatherMenuBarApp
+        from ..models.location import Location
+        from ..ui.menu_builder import MenuBuilder
+
+        self.clock.patch()
+        if self.trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = SoakResult()
+        app = WeatherMenuBarApp()
+        self.app = app
+        self.locations = [Location(*fields) for fields in SCENARIO_LOCATIONS]
+        self.menu_builder = MenuBuilder({
+            'toggle_mode': lambda _: None, 'set_unit_fahrenheit': lambda _: None,
+            'set_unit_celsius': lambda _: None, 'set_interval': lambda _: None,
+            'auto_detect': lambda _: None, 'set_location': lambda _: None,
+            'refresh': lambda _: None,
+        })
+        if self.prefetch:
+            # The prefetch thread waits on real time, so its cycles are driven here
+            sys.modules["rumps"].Timer(self._prefetch, app.prefetcher.interval_seconds).start()
+
+        start = self.clock.time()
+        end = start + self.days * 86400
+        next_sample = start
+        try:
+            while True:
+                timer = self.scheduler.pop_due()
+                if timer is None or self.clock.time() > end:
+                    break
+                self.clock.patch()
+                timer.callback(timer)
+                if timer is app.timer:
+                    self._act(result.actions)
+                self._settle()
+                result.ticks += 1
+                if self.clock.time() >= next_sample:
+                    result.samples.append(self._sample((self.clock.time() - start) / 86400))
+                    next_sample += self.sample_seconds
+        finally:
+            app._executor.shutdown(wait=True)
+            if self.trace:
+                tracemalloc.stop()
+            log_config.shutdown_logging()
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
+
+    def _prefetch(self, _):
+        """One prefetch cycle, as the prefetch thread would run it."""
+        self.app.prefetcher.run_once()
+        self.app.weather_service.usage.save()
+
+    def _act(self, actions: Dict[str, int]):
+        """What a user might do around an update tick (main thread)."""
+        app, roll = self.app, self.rng.random()
+        if roll < 0.03:
+            action = "mode"
+            (app._set_essential if app._settings.is_full_mode else app._set_full)(None)
+        elif roll < 0.05:
+            action = "units"
+            (app._set_celsius if app._settings.use_fahrenheit else app._set_fahrenheit)(None)
+        elif roll < 0.07:
+            action = "location"
+            app.weather_service.set_location(self.rng.choice(self.locations))
+            app._submit_update()
+        elif roll < 0.08:
+            action = "auto_detect"
+            app._auto_detect(None)
+        elif roll < 0.10:
+            action = "refresh"
+            app._refresh(None)
+        else:
+            action = "none"
+        actions[action] = actions.get(action, 0) + 1
+        # Opening the menu rebuilds it from scratch
+        self.menu_builder.build_menu(app._weather, app._settings)
+
+    def _settle(self):
+        """Run main-thread callbacks until the update worker and all fetches are idle."""
+        deadline = time.monotonic() + self.settle_timeout
+        while True:
+            if not self.app._executor.wait_idle(max(0.0, deadline - time.monotonic())):
+                raise SoakError(f"Update still running after {self.settle_timeout:.0f}s")
+            if self._main_queue:
+                while self._main_queue:
+                    self._main_queue.popleft()()
+                continue
+            if not self.app.weather_service.fetches_in_flight():
+                return
+            if time.monotonic() > deadline:
+                raise SoakError(f"Fetches still running after {self.settle_timeout:.0f}s")
+            time.sleep(0.001)
+
+    def _sample(self, day: float) -> Sample:
+        gc.collect()
+        from ..utils import logger as log_config
+        log_bytes = sum(p.stat().st_size for p in log_config.LOG_DIR.glob("*") if p.is_file())
+        return Sample(
+            day=day,
+            rss_bytes=rss_bytes(),
+            traced_bytes=tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+            threads=app_threads(),
+            fds=open_fds(),
+            log_bytes=log_bytes,
+        )
+
+
+def print_report(result: SoakResult, days: float):
+    """Print activity, the sample table and the trend verdicts."""
+    print(f"Simulated {days:g} days in {result.elapsed_seconds:.1f}s: {result.ticks} timer ticks, "
+          f"{result.requests.get('requests', 0)} upstream requests, "
+          f"{result.shown.get('notifications', 0)} notifications")
+    print("User actions: " + ", ".join(f"{k} {v}" for k, v in sorted(result.actions.items())))
+    print(f"{'day':>6} {'rss MiB':>9} {'traced MiB':>11} {'threads':>8} {'fds':>5} {'log KiB':>8}")
+    for s in result.samples:
+        print(f"{s.day:6.1f} {s.rss_bytes / MIB:9.2f} {s.traced_bytes / MIB:11.2f} "
+              f"{s.threads:8d} {s.fds:5d} {s.log_bytes / 1024:8.1f}")
+    print("Trends after warm-up:")
+    for t in result.trends:
+        scale = MIB if t.metric.endswith("_bytes") else 1
+        unit = " MiB" if scale == MIB else ""
+        print(f"  {'ok  ' if t.ok else 'FAIL'} {t.metric:<13} {t.first / scale:10.2f} -> {t.last / scale:10.2f}"
+              f"  fitted growth {t.growth / scale:+.3f}{unit} (budget {t.budget / scale:g}{unit})")
+    peak = result.log_peak_bytes
+    print(f"  {'ok  ' if peak <= LOG_CAP_BYTES else 'FAIL'} {'log_bytes':<13} peak {peak / 1024:.1f} KiB"
+          f" (rotation cap {LOG_CAP_BYTES / 1024:.0f} KiB)")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Soak the menu-bar app on a virtual clock")
+    parser.add_argument("--days", type=float, default=60.0, help="Simulated days")
+    parser.add_argument("--sample-hours", type=float, default=24.0, help="Simulated hours between samples")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--warmup", type=float, default=0.25,
+                        help="Fraction of samples ignored before fitting trends")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip allocation tracking (faster)")
+    parser.add_argument("--no-prefetch", action="store_true", help="Skip prefetch cycles (faster)")
+    parser.add_argument("--dir", type=Path, default=None, help="Keep settings and logs here")
+    for metric, budget in DEFAULT_BUDGETS.items():
+        scale = MIB if metric.endswith("_bytes") else 1
+        parser.add_argument(f"--max-{metric.split('_')[0]}", type=float, default=budget / scale,
+                            dest=metric, help=f"Allowed growth of {metric}"
+                            + (" in MiB" if scale == MIB else "") + f" (default {budget / scale:g})")
+    args = parser.parse_args(argv)
+
+    budgets = {metric: getattr(args, metric) * (MIB if metric.endswith("_bytes") else 1)
+               for metric in DEFAULT_BUDGETS}
+    harness = SoakHarness(days=args.days, sample_hours=args.sample_hours, seed=args.seed,
+                          directory=args.dir, trace=not args.no_tracemalloc,
+                          budgets=budgets, warmup=args.warmup, prefetch=not args.no_prefetch)
+    try:
+        result = harness.run()
+    except SoakError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    print_report(result, args.days)
+    sys.exit(0 if result.ok else 1)
+
+
+class SoakError(Exception):
+    """Exception raised when the soak cannot run to completion."""
+    pass
+
+
+if __name__ == "__main__":
+    main()
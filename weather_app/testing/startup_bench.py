@@ -0,0 +1,127 @@
+"""Startup import-time benchmark with a budget.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters,
+reports the median cumulative import time of the target module and the
+slowest imports behind it, and fails if the median exceeds the budget or if
+any forbidden module (e.g. ``requests``) was imported at startup::
+
+    python -m weather_app.testing.startup_bench --budget-ms 250
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_MODULE = "weather_app.app"
+DEFAULT_BUDGET_MS = 250.0
+DEFAULT_FORBIDDEN = ("requests", "urllib3")
+
+
+@dataclass
+class ImportProfile:
+    """Result of one ``-X importtime`` run."""
+    cumulative_us: Dict[str, int] = field(default_factory=dict)
+    self_us: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, stderr: str) -> 'ImportProfile':
+        """Parse the ``import time:`` lines written to stderr."""
+        profile = cls()
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            try:
+                self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+                name = name.strip()
+                profile.self_us[name] = int(self_us)
+                profile.cumulative_us[name] = int(cumulative_us)
+            except ValueError:
+                continue
+        return profile
+
+    def slowest(self, count: int = 10) -> List[tuple]:
+        """Modules with the highest self time."""
+        return sorted(self.self_us.items(), key=lambda kv: kv[1], reverse=True)[:count]
+
+
+def profile_import(module: str) -> ImportProfile:
+    """
+    Import a module in a fresh interpreter and profile it.
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"Importing {module} failed: {tail[0]}")
+    return ImportProfile.parse(result.stderr)
+
+
+def run_benchmark(module: str = DEFAULT_MODULE, runs: int = 7,
+                  budget_ms: float = DEFAULT_BUDGET_MS,
+                  forbidden=DEFAULT_FORBIDDEN, top: int = 10) -> bool:
+    """
+    Run the benchmark and print a report.
+
+    Returns:
+        True if the budget was met and no forbidden module was imported
+    """
+    # Warm-up run so .pyc files exist and the OS file cache is hot
+    profile_import(module)
+    profiles = [profile_import(module) for _ in range(runs)]
+
+    totals_ms = [p.cumulative_us.get(module, 0) / 1000 for p in profiles]
+    median_ms = statistics.median(totals_ms)
+    ok = median_ms <= budget_ms
+
+    print(f"{module}: median {median_ms:.1f} ms over {runs} runs "
+          f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f}, budget {budget_ms:.0f} ms)")
+    print("Slowest imports (self time, last run):")
+    for name, us in profiles[-1].slowest(top):
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    loaded = set(profiles[-1].cumulative_us)
+    leaked = sorted(name for name in forbidden if name in loaded)
+    if leaked:
+        ok = False
+        print(f"FAIL: imported at startup: {', '.join(leaked)}")
+    if median_ms > budget_ms:
+        print(f"FAIL: {median_ms:.1f} ms exceeds budget of {budget_ms:.0f} ms")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Measure startup import time against a budget")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--forbid", action="append", default=None,
+                        help="Module that must not be imported at startup (repeatable)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    forbidden = args.forbid if args.forbid is not None else DEFAULT_FORBIDDEN
+    try:
+        ok = run_benchmark(args.module, args.runs, args.budget_ms, forbidden, args.top)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""Multi-source web ticker: scrape any text from any page, in parallel."""
+
+from .sources import ARCHIVE_SOURCES, Source, SourceResult, load_sources, register_parser
+from .engine import HostLimiter, TickerEngine
+
+__all__ = [
+    'ARCHIVE_SOURCES',
+    'Source',
+    'SourceResult',
+    'load_sources',
+    'register_parser',
+    'HostLimiter',
+    'TickerEngine',
+]
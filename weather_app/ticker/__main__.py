@@ -0,0 +1,54 @@
+"""Run the ticker in a terminal: ``python -m weather_app.ticker``."""
+
+import argparse
+import logging
+import sys
+import threading
+from pathlib import Path
+
+from .engine import TickerEngine
+from .sources import ARCHIVE_SOURCES, SourceError, load_sources
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Parallel multi-source web ticker")
+    parser.add_argument("--sources", type=Path, help="JSON file with source definitions")
+    parser.add_argument("--interval", type=float, default=300, help="Seconds between refreshes")
+    parser.add_argument("--once", action="store_true", help="Fetch once, print and exit")
+    parser.add_argument("--per-host", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+
+    try:
+        sources = load_sources(args.sources) if args.sources else ARCHIVE_SOURCES
+    except SourceError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+    last = [None]
+
+    def show(title: str):
+        if title != last[0]:
+            last[0] = title
+            print(title, flush=True)
+
+    engine = TickerEngine(sources, per_host_limit=args.per_host, on_update=show)
+    try:
+        if args.once:
+            for future in engine.refresh():
+                try:
+                    future.result()
+                except Exception:
+                    pass
+        else:
+            engine.run_forever(args.interval, threading.Event())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
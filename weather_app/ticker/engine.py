@@ -0,0 +1,301 @@
+"""Concurrent multi-source ticker engine.
+
+Every source is fetched on a shared thread pool through the pooled session
+in ``api.transport`` and streamed through ``extract.StreamingExtractor``,
+which hangs up as soon as the target element has been read. A per-host
+limiter keeps us polite to each site (bounded concurrency plus a minimum
+gap between request starts). Sources finish independently: the ticker
+title is recomposed whenever any result arrives, so one slow site never
+holds back the others.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ..utils.fingerprint import ContentFingerprint, digest
+from ..utils.metrics import DEFAULT_SIZE_BUCKETS, counter, histogram
+from .extract import extract_from_chunks
+from .sources import Source, SourceResult
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_BYTES = histogram(
+    "weatherbar_scrape_bytes_read",
+    "Bytes read from a scraped page before the value was found",
+    ["source"],
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+SCRAPE_EARLY_EXITS = counter(
+    "weatherbar_scrape_early_exits_total",
+    "Scrapes that closed the connection before the end of the page",
+    ["source"],
+)
+
+
+class HostLimiter:
+    """
+    Per-host concurrency cap and minimum interval between request starts.
+
+    Tasks wait in a per-host queue rather than on a pool thread: one is
+    handed to the executor only once its host has a free slot and the
+    interval since the last start has passed. A host with many sources (or
+    a slow one) therefore never ties up workers that other hosts could use.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_concurrent: int = 2,
+                 min_interval: float = 1.0):
+        self.executor = executor
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = min_interval
+        self._queues: Dict[str, Deque[Tuple[Future, Callable, tuple]]] = {}
+        self._active: Dict[str, int] = {}
+        self._next_start: Dict[str, float] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, host: str, fn: Callable, *args) -> Future:
+        """Queue ``fn(*args)`` for a host; the future completes with its result."""
+        future: Future = Future()
+        with self._lock:
+            self._queues.setdefault(host, deque()).append((future, fn, args))
+            ready = self._ready(host)
+        self._start(host, ready)
+        return future
+
+    def _ready(self, host: str) -> List[Tuple[Future, Callable, tuple]]:
+        """Pop the tasks a host may start now, arming a timer for the next one (lock held)."""
+        queue = self._queues.get(host)
+        ready = []
+        while queue and self._active.get(host, 0) < self.max_concurrent:
+            now = time.monotonic()
+            start = self._next_start.get(host, 0.0)
+            if start > now:
+                if host not in self._timers:
+                    timer = threading.Timer(start - now, self._wake, args=(host,))
+                    timer.daemon = True
+                    self._timers[host] = timer
+                    timer.start()
+                break
+            future, fn, args = queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._active[host] = self._active.get(host, 0) + 1
+            self._next_start[host] = now + self.min_interval
+            ready.append((future, fn, args))
+        return ready
+
+    def _start(self, host: str, ready: List[Tuple[Future, Callable, tuple]]):
+        for future, fn, args in ready:
+            try:
+                task = self.executor.submit(fn, *args)
+            except RuntimeError as e:  # Executor shut down
+                self._finished(host, future, None, e)
+                continue
+            task.add_done_callback(lambda t, f=future: self._finished(host, f, t))
+
+    def _wake(self, host: str):
+        with self._lock:
+            self._timers.pop(host, None)
+            ready = self._ready(host)
+        self._start(host, ready)
+
+    def _finished(self, host: str, future: Future, task: Optional[Future],
+                  error: Optional[BaseException] = None):
+        with self._lock:
+            self._active[host] -= 1
+            ready = self._ready(host)
+        self._start(host, ready)
+        if task is not None and not task.cancelled():
+            error = task.exception()
+        if error is not None:
+            future.set_exception(error)
+        elif task is None or task.cancelled():
+            future.set_exception(RuntimeError("Fetch cancelled"))
+        else:
+            future.set_result(task.result())
+
+    def close(self):
+        """Cancel queued tasks and pending timers."""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            queued = [future for queue in self._queues.values() for future, _, _ in queue]
+            self._queues.clear()
+        for future in queued:
+            future.cancel()
+
+
+class TickerEngine:
+    """Fetches all sources concurrently and composes the ticker title."""
+
+    CHUNK_SIZE = 8192
+
+    def __init__(self, sources: List[Source], max_workers: int = 8,
+                 per_host_limit: int = 2, min_host_interval: float = 1.0,
+                 on_update: Optional[Callable[[str], None]] = None,
+                 separator: str = " | "):
+        """
+        Initialize the engine.
+
+        Args:
+            sources: Sources in display order
+            max_workers: Size of the shared fetch pool
+            per_host_limit: Maximum concurrent requests per host
+            min_host_interval: Minimum seconds between request starts per host
+            on_update: Called with the new title whenever a result arrives
+            separator: Text placed between source values
+        """
+        self.sources = list(sources)
+        self.separator = separator
+        self.on_update = on_update
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ticker")
+        self.limiter = HostLimiter(self._executor, per_host_limit, min_host_interval)
+        self._results: Dict[str, SourceResult] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._fingerprints: Dict[str, ContentFingerprint] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> List[Future]:
+        """
+        Start fetching every source that is not already in flight.
+
+        Returns:
+            Futures for the sources started by this call
+        """
+        started = []
+        with self._lock:
+            for source in self.sources:
+                if source.name in self._inflight:
+                    logger.debug("Source %s still in flight, skipping", source.name)
+                    continue
+                future = self.limiter.submit(urlsplit(source.url).netloc, self._fetch,
+                                             source, time.monotonic())
+                self._inflight[source.name] = future
+                started.append((source, future))
+
+        # Registered outside the lock: a finished future runs its callback inline
+        for source, future in started:
+            future.add_done_callback(lambda f, s=source: self._on_done(s, f))
+        return [future for _, future in started]
+
+    def _fetch(self, source: Source, queued_at: float) -> SourceResult:
+        """Fetch and parse one source (worker thread, holding its host's slot)."""
+        from ..api.transport import open_stream
+
+        # Time spent waiting for the host's slot counts against the timeout
+        deadline = queued_at + source.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"No request slot for {urlsplit(source.url).netloc} within {source.timeout}s")
+        fingerprint = self._fingerprint(source)
+        with self._lock:
+            previous = self._results.get(source.name)
+        start = time.perf_counter()
+        headers = dict(source.headers, **fingerprint.conditional_headers())
+        with open_stream(source.url, f"source:{source.name}",
+                         timeout=remaining, headers=headers) as response:
+            if response.status_code == 304 and previous is not None and previous.ok:
+                fingerprint.not_modified()
+                return self._unchanged(previous, start)
+            charset = 'charset' in response.headers.get('Content-Type', '').lower()
+            raw, consumed, stopped = extract_from_chunks(
+                response.iter_content(chunk_size=self.CHUNK_SIZE),
+                source.selector,
+                source.attribute,
+                encoding=response.encoding if charset else None,
+                deadline=deadline,
+            )
+            # Content-Length counts wire bytes (compressed), as does raw.tell()
+            length = response.headers.get('Content-Length')
+            if stopped and (length is None or response.raw.tell() < int(length)):
+                SCRAPE_EARLY_EXITS.inc(source=source.name)
+        SCRAPE_BYTES.observe(consumed, source=source.name)
+
+        # The matched element is the only byte range that matters
+        content_digest = digest(raw.encode())
+        if not fingerprint.changed(content_digest) and previous is not None and previous.ok:
+            fingerprint.commit(content_digest, response.headers, skipped=True)
+            return self._unchanged(previous, start)
+        value = source.parse(raw)
+        fingerprint.commit(content_digest, response.headers)
+        return SourceResult(
+            name=source.name, value=value,
+            elapsed=time.perf_counter() - start, fetched_at=datetime.now()
+        )
+
+    def _fingerprint(self, source: Source) -> ContentFingerprint:
+        with self._lock:
+            fingerprint = self._fingerprints.get(source.name)
+            if fingerprint is None:
+                fingerprint = self._fingerprints[source.name] = ContentFingerprint(
+                    f"source:{source.name}"
+                )
+            return fingerprint
+
+    @staticmethod
+    def _unchanged(previous: SourceResult, start: float) -> SourceResult:
+        return SourceResult(
+            name=previous.name, value=previous.value,
+            elapsed=time.perf_counter() - start, fetched_at=datetime.now(), changed=False
+        )
+
+    def _on_done(self, source: Source, future: Future):
+        with self._lock:
+            self._inflight.pop(source.name, None)
+            if future.cancelled():
+                return  # Dropped from its host's queue by close()
+            previous = self._results.get(source.name)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning("Source %s failed: %s", source.name, e)
+                result = self._failed(source, previous, e)
+            self._results[source.name] = result
+
+        if self.on_update is not None and result.changed:
+            self.on_update(self.compose_title())
+
+    @staticmethod
+    def _failed(source: Source, previous: Optional[SourceResult], error: Exception) -> SourceResult:
+        # Keep showing the last good value rather than blanking the ticker
+        return SourceResult(
+            name=source.name,
+            value=previous.value if previous else None,
+            error=str(error),
+            fetched_at=previous.fetched_at if previous else None,
+        )
+
+    @property
+    def results(self) -> Dict[str, SourceResult]:
+        """Latest result per source name."""
+        with self._lock:
+            return dict(self._results)
+
+    def compose_title(self) -> str:
+        """Join the values that have arrived so far, in source order."""
+        with self._lock:
+            values = [
+                self._results[s.name].value for s in self.sources
+                if s.name in self._results and self._results[s.name].value is not None
+            ]
+        return self.separator.join(values) if values else "Loading..."
+
+    def run_forever(self, interval_seconds: float, stop: Optional[threading.Event] = None):
+        """Refresh every ``interval_seconds`` until ``stop`` is set."""
+        stop = stop or threading.Event()
+        while True:
+            self.refresh()
+            if stop.wait(interval_seconds):
+                return
+
+    def close(self):
+        """Stop the fetch pool without waiting for in-flight requests."""
+        self.limiter.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,409 @@
+"""Streaming, early-exit extraction of a single value from an HTML page.
+
+Response chunks are fed to an incremental ``html.parser.HTMLParser``. Only
+the stack of currently open elements is kept (no document tree), each new
+element is matched against a compiled selector, and parsing stops as soon as
+the first matching element is complete. The caller can then close the
+connection without downloading the rest of the page, so memory and CPU per
+scrape scale with the position of the target element, not the page size.
+
+Supported selectors:
+
+* CSS: type, ``*``, ``#id``, ``.class``, ``[attr]``, ``[attr=v]`` (also
+  ``~= ^= $= *= |=``), ``:nth-child(n)``, ``:nth-of-type(n)``,
+  ``:first-child``, with descendant (space) and child (``>``) combinators.
+* XPath: ``/`` and ``//`` steps with a name or ``*`` and predicates
+  ``[@attr]``, ``[@attr='v']``, ``[contains(@attr,'v')]`` and ``[n]``; a
+  trailing ``/@attr`` or ``/text()`` selects what is returned.
+"""
+
+import codecs
+import re
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Elements that never have content or an end tag
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+
+# Start tags that implicitly close an open element of the listed kinds
+IMPLIED_END = {
+    "li": {"li"},
+    "p": {"p"},
+    "option": {"option"},
+    "td": {"td", "th"},
+    "th": {"td", "th"},
+    "tr": {"tr", "td", "th"},
+    "dt": {"dt", "dd"},
+    "dd": {"dt", "dd"},
+}
+
+
+@dataclass
+class _Step:
+    """One compound selector plus how it relates to the step before it."""
+    tag: Optional[str] = None
+    attrs: List[Tuple[str, Optional[str], str]] = field(default_factory=list)
+    classes: List[str] = field(default_factory=list)
+    nth_child: Optional[int] = None
+    nth_of_type: Optional[int] = None
+    combinator: str = " "  # " " descendant, ">" child of the previous step
+
+    def matches(self, node: '_Node') -> bool:
+        if self.tag is not None and node.tag != self.tag:
+            return False
+        if self.nth_child is not None and node.index != self.nth_child:
+            return False
+        if self.nth_of_type is not None and node.type_index != self.nth_of_type:
+            return False
+        if self.classes:
+            node_classes = node.attrs.get("class", "").split()
+            if not all(c in node_classes for c in self.classes):
+                return False
+        for name, op, value in self.attrs:
+            actual = node.attrs.get(name)
+            if actual is None:
+                return False
+            if op is None:
+                continue
+            if op == "=" and actual != value:
+                return False
+            if op == "~=" and value not in actual.split():
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+            if op == "$=" and not actual.endswith(value):
+                return False
+            if op == "*=" and value not in actual:
+                return False
+            if op == "|=" and not (actual == value or actual.startswith(value + "-")):
+                return False
+        return True
+
+
+@dataclass
+class Selector:
+    """Compiled selector: steps from outermost to target, plus what to read."""
+    steps: List[_Step]
+    attribute: Optional[str] = None  # From a trailing XPath /@attr
+    anchored: bool = False  # XPath starting with a single "/"
+
+    def matches(self, stack: List['_Node']) -> bool:
+        """Whether the innermost open element matches the selector."""
+        return self._match(len(self.steps) - 1, stack, len(stack) - 1)
+
+    def _match(self, si: int, stack: List['_Node'], ni: int) -> bool:
+        step = self.steps[si]
+        if ni < 0 or not step.matches(stack[ni]):
+            return False
+        if si == 0:
+            return not self.anchored or ni == 0
+        if step.combinator == ">":
+            return self._match(si - 1, stack, ni - 1)
+        return any(self._match(si - 1, stack, j) for j in range(ni - 1, -1, -1))
+
+
+_CSS_TOKEN = re.compile(r"""
+    (?P<child>\s*>\s*)
+  | (?P<space>\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:.-]+)\s*
+        (?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+  | :nth-child\(\s*(?P<nth>\d+)\s*\)
+  | :nth-of-type\(\s*(?P<nthtype>\d+)\s*\)
+  | (?P<first>:first-child)
+""", re.VERBOSE)
+
+
+def _parse_css(selector: str) -> Selector:
+    steps = [_Step()]
+    pos = 0
+    text = selector.strip()
+    while pos < len(text):
+        m = _CSS_TOKEN.match(text, pos)
+        if m is None or m.end() == pos:
+            raise SelectorError(f"Unsupported CSS selector near '{text[pos:]}'")
+        pos = m.end()
+        step = steps[-1]
+        if m.group("child") is not None:
+            steps.append(_Step(combinator=">"))
+        elif m.group("space") is not None:
+            steps.append(_Step(combinator=" "))
+        elif m.group("tag"):
+            step.tag = None if m.group("tag") == "*" else m.group("tag").lower()
+        elif m.group("id"):
+            step.attrs.append(("id", "=", m.group("id")))
+        elif m.group("cls"):
+            step.classes.append(m.group("cls"))
+        elif m.group("attr"):
+            value = next((v for v in (m.group("dq"), m.group("sq"), m.group("bare")) if v is not None), "")
+            step.attrs.append((m.group("attr").lower(), m.group("op"), value))
+        elif m.group("nth"):
+            step.nth_child = int(m.group("nth"))
+        elif m.group("nthtype"):
+            step.nth_of_type = int(m.group("nthtype"))
+        elif m.group("first"):
+            step.nth_child = 1
+    return Selector(steps=steps)
+
+
+_XPATH_STEP = re.compile(r"(\*|[a-zA-Z][\w-]*)((?:\[[^\]]*\])*)$")
+_XPATH_PREDICATE = re.compile(r"""
+    \[\s*(?:
+        @(?P<attr>[\w:.-]+)\s*(?:=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'))?
+      | contains\(\s*@(?P<cattr>[\w:.-]+)\s*,\s*(?:"(?P<cdq>[^"]*)"|'(?P<csq>[^']*)')\s*\)
+      | (?P<pos>\d+)
+    )\s*\]
+""", re.VERBOSE)
+
+
+def _parse_xpath(selector: str) -> Selector:
+    text = selector.strip()
+    attribute = None
+    tail = re.search(r"/(@[\w:.-]+|text\(\))$", text)
+    if tail:
+        if tail.group(1).startswith("@"):
+            attribute = tail.group(1)[1:]
+        text = text[:tail.start()]
+
+    anchored = text.startswith("/") and not text.startswith("//")
+    steps = []
+    for combinator, body in re.findall(r"(//|/)([^/]+)", text):
+        m = _XPATH_STEP.match(body)
+        if m is None:
+            raise SelectorError(f"Unsupported XPath step '{body}'")
+        step = _Step(tag=None if m.group(1) == "*" else m.group(1).lower(),
+                     combinator=">" if combinator == "/" else " ")
+        for pred in _XPATH_PREDICATE.finditer(m.group(2)):
+            if pred.group("attr"):
+                value = pred.group("dq") if pred.group("dq") is not None else pred.group("sq")
+                step.attrs.append((pred.group("attr").lower(), None if value is None else "=", value or ""))
+            elif pred.group("cattr"):
+                value = pred.group("cdq") if pred.group("cdq") is not None else pred.group("csq")
+                step.attrs.append((pred.group("cattr").lower(), "*=", value))
+            else:
+                step.nth_of_type = int(pred.group("pos"))
+        steps.append(step)
+    if not steps:
+        raise SelectorError(f"Empty XPath '{selector}'")
+    return Selector(steps=steps, attribute=attribute, anchored=anchored)
+
+
+@lru_cache(maxsize=128)
+def compile_selector(selector: str) -> Selector:
+    """
+    Compile a CSS selector, or an XPath expression if it starts with "/".
+
+    Raises:
+        SelectorError: If the selector uses unsupported syntax
+    """
+    if selector.lstrip().startswith("/"):
+        return _parse_xpath(selector)
+    return _parse_css(selector)
+
+
+class _Node:
+    """An open element plus counters for the children seen so far."""
+
+    __slots__ = ("tag", "attrs", "index", "type_index", "child_count", "type_counts")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], index: int, type_index: int):
+        self.tag = tag
+        self.attrs = attrs
+        self.index = index
+        self.type_index = type_index
+        self.child_count = 0
+        self.type_counts: Dict[str, int] = {}
+
+
+class _Found(Exception):
+    """Internal signal used to abort HTMLParser.feed once the value is known."""
+
+
+class StreamingExtractor(HTMLParser):
+    """Incremental parser that stops at the first element matching a selector."""
+
+    def __init__(self, selector: str, attribute: Optional[str] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            selector: CSS selector or XPath expression
+            attribute: Attribute to read instead of the element text
+        """
+        super().__init__(convert_charrefs=True)
+        self.selector_text = selector
+        self.selector = compile_selector(selector)
+        self.attribute = attribute or self.selector.attribute
+        self._document = _Node("#document", {}, 0, 0)
+        self._stack: List[_Node] = []
+        self._capture_depth: Optional[int] = None
+        self._text: List[str] = []
+        self.value: Optional[str] = None
+        self.done = False
+
+    def feed_text(self, data: str) -> bool:
+        """
+        Feed more of the document.
+
+        Returns:
+            True once the value has been found and no more input is needed
+        """
+        if self.done:
+            return True
+        try:
+            self.feed(data)
+        except _Found:
+            self.done = True
+        return self.done
+
+    def finish(self):
+        """Signal the end of input, flushing any buffered markup."""
+        if self.done:
+            return
+        try:
+            self.close()
+        except _Found:
+            self.done = True
+
+    def result(self) -> str:
+        """
+        Return the extracted value.
+
+        Raises:
+            ExtractionError: If no element matched
+        """
+        if not self.done and self._capture_depth is not None:
+            # Document ended while the matching element was still open
+            self.value = "".join(self._text)
+            self.done = True
+        if self.value is None:
+            raise ExtractionError(f"No element matches '{self.selector_text}'")
+        return self.value
+
+    def _parent(self) -> _Node:
+        return self._stack[-1] if self._stack else self._document
+
+    def _pop_to(self, depth: int):
+        """Close open elements until the stack has ``depth`` entries."""
+        while len(self._stack) > depth:
+            self._stack.pop()
+            if self._capture_depth is not None and len(self._stack) < self._capture_depth:
+                self.value = "".join(self._text)
+                raise _Found()
+
+    def handle_starttag(self, tag, attrs):
+        implied = IMPLIED_END.get(tag)
+        while implied and self._stack and self._stack[-1].tag in implied:
+            self._pop_to(len(self._stack) - 1)
+
+        parent = self._parent()
+        parent.child_count += 1
+        type_index = parent.type_counts.get(tag, 0) + 1
+        parent.type_counts[tag] = type_index
+        node = _Node(tag, {k: v or "" for k, v in attrs}, parent.child_count, type_index)
+        self._stack.append(node)
+
+        if self._capture_depth is None and self.selector.matches(self._stack):
+            if self.attribute:
+                value = node.attrs.get(self.attribute)
+                if value is not None:
+                    self.value = value
+                    raise _Found()
+            else:
+                self._capture_depth = len(self._stack)
+
+        if tag in VOID_ELEMENTS:
+            self._pop_to(len(self._stack) - 1)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._pop_to(len(self._stack) - 1)
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth].tag == tag:
+                self._pop_to(depth)
+                return
+
+    def handle_data(self, data):
+        if self._capture_depth is not None:
+            self._text.append(data)
+
+
+def _decoder_for(encoding: Optional[str]):
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def extract_from_chunks(chunks: Iterable[bytes], selector: str,
+                        attribute: Optional[str] = None, encoding: Optional[str] = None,
+                        deadline: Optional[float] = None) -> Tuple[str, int, bool]:
+    """
+    Extract a value from a stream of byte chunks, stopping early.
+
+    Args:
+        chunks: Response body chunks
+        selector: CSS selector or XPath expression
+        attribute: Attribute to read instead of the element text
+        encoding: Body encoding (UTF-8 if unknown)
+        deadline: ``time.monotonic()`` value after which to give up
+
+    Returns:
+        Tuple of (value, bytes consumed, True if it stopped before the
+        chunks ran out)
+
+    Raises:
+        ExtractionError: If nothing matches or the deadline passes
+    """
+    extractor = StreamingExtractor(selector, attribute)
+    decoder = _decoder_for(encoding)
+    consumed = 0
+    for chunk in chunks:
+        consumed += len(chunk)
+        if extractor.feed_text(decoder.decode(chunk)):
+            return extractor.result(), consumed, True
+        if deadline is not None and time.monotonic() > deadline:
+            raise ExtractionError(f"Deadline exceeded after {consumed} bytes")
+    extractor.feed_text(decoder.decode(b"", final=True))
+    extractor.finish()
+    return extractor.result(), consumed, False
+
+
+def extract_value(html: Union[bytes, str], selector: str, attribute: Optional[str] = None) -> str:
+    """
+    Return the text (or an attribute) of the first element matching a selector.
+
+    Args:
+        html: Page content
+        selector: CSS selector or XPath expression
+        attribute: Attribute to read instead of the element text
+
+    Raises:
+        ExtractionError: If nothing matches
+    """
+    extractor = StreamingExtractor(selector, attribute)
+    text = html.decode("utf-8", errors="replace") if isinstance(html, bytes) else html
+    extractor.feed_text(text)
+    extractor.finish()
+    return extractor.result()
+
+
+class ExtractionError(Exception):
+    """Exception raised when a value cannot be extracted from a page."""
+    pass
+
+
+class SelectorError(ExtractionError):
+    """Exception raised for unsupported selector syntax."""
+    pass
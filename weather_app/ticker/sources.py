@@ -0,0 +1,165 @@
+"""Ticker source definitions.
+
+A source is a URL, a selector for the element holding the value, and a
+parser that turns the element's text into the string shown in the ticker.
+Parsers are registered by name so sources can be declared in JSON.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_5) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/83.0.4103.97 Safari/537.36"
+)
+
+Parser = Callable[[str], str]
+
+PARSERS: Dict[str, Parser] = {}
+
+
+def register_parser(name: str):
+    """Decorator registering a value parser under a name."""
+    def decorator(func: Parser) -> Parser:
+        PARSERS[name] = func
+        return func
+    return decorator
+
+
+@register_parser("text")
+def parse_text(raw: str) -> str:
+    """Whitespace-normalized text."""
+    return " ".join(raw.split())
+
+
+@register_parser("temperature")
+def parse_temperature(raw: str) -> str:
+    """Leading number of a temperature string such as ``'72°'``."""
+    return f"{round(float(raw.split('°')[0].strip()), 2)}°"
+
+
+@register_parser("number")
+def parse_number(raw: str) -> str:
+    """Numeric value with thousands separators removed."""
+    return f"{float(raw.replace(',', '').strip()):g}"
+
+
+@dataclass
+class Source:
+    """One scraped value shown in the ticker."""
+    name: str
+    url: str
+    selector: str  # CSS selector (or XPath when it starts with "/")
+    parser: str = "text"  # Name of a registered parser
+    attribute: Optional[str] = None  # Read this attribute instead of the text
+    label: str = "{value}"  # Display template, e.g. "RH: {value}"
+    timeout: float = 10.0
+    headers: Dict[str, str] = field(default_factory=lambda: {"User-Agent": BROWSER_USER_AGENT})
+
+    def parse(self, raw: str) -> str:
+        """Run the configured parser and label template over a raw value."""
+        parser = PARSERS.get(self.parser)
+        if parser is None:
+            raise SourceError(f"Unknown parser '{self.parser}' for source {self.name}")
+        return self.label.format(value=parser(raw))
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'name': self.name,
+            'url': self.url,
+            'selector': self.selector,
+            'parser': self.parser,
+            'attribute': self.attribute,
+            'label': self.label,
+            'timeout': self.timeout,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Source':
+        """Create Source from dictionary."""
+        source = cls(
+            name=data['name'],
+            url=data['url'],
+            selector=data['selector'],
+            parser=data.get('parser', 'text'),
+            attribute=data.get('attribute'),
+            label=data.get('label', '{value}'),
+            timeout=data.get('timeout', 10.0),
+        )
+        if data.get('headers'):
+            source.headers.update(data['headers'])
+        return source
+
+
+@dataclass
+class SourceResult:
+    """Latest outcome for a source."""
+    name: str
+    value: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    fetched_at: Optional[datetime] = None
+    changed: bool = True  # False when the source content was identical to last time
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.value is not None
+
+
+# The scrapers from archive/QT_BS4_Rumps.py and archive/QT_GUI.py
+ARCHIVE_SOURCES = [
+    Source(
+        name="temperature",
+        url="https://weather.com/weather/tenday/l/San+Diego+CA?canonicalCityId="
+            "cb5c473781cc06501376639dce8f0823a99187dcb42c79471a4303c076d66452",
+        selector="span.DailyContent--temp--1s3a7",
+        parser="temperature",
+        label="{value}F",
+    ),
+    Source(
+        name="humidity",
+        url="https://www.timeanddate.com/weather/usa/san-diego",
+        selector="table tbody tr:nth-child(6) td",
+        label="RH: {value}",
+    ),
+    Source(
+        name="aapl",
+        url="https://finance.yahoo.com/quote/AAPL/",
+        selector='fin-streamer[data-symbol="AAPL"]',
+        attribute="value",
+        parser="number",
+        label="AAPL {value}",
+    ),
+    Source(
+        name="time",
+        url="https://www.timeanddate.com/worldclock/usa/los-angeles",
+        selector="#ct",
+        label="{value}",
+    ),
+]
+
+
+def load_sources(path: Path) -> List[Source]:
+    """
+    Load source definitions from a JSON file containing a list of sources.
+
+    Raises:
+        SourceError: If the file cannot be read or is malformed
+    """
+    try:
+        with open(path, 'r') as f:
+            return [Source.from_dict(item) for item in json.load(f)]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise SourceError(f"Failed to load sources from {path}: {e}") from e
+
+
+class SourceError(Exception):
+    """Exception raised when a source cannot be loaded or parsed."""
+    pass
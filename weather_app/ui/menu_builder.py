@@ -1,16 +1,25 @@
-"""Build rumps menu structure from weather data."""
+"""Build rumps menu structure from weather data.
+
+The menu's text is produced first (``build_lines``) and only then wrapped in
+rumps items, so front-ends without rumps (see ``ui.terminal``) show the same
+content.
+"""
 
-import rumps
 from datetime import datetime
 from typing import List, Callable, Optional
 
+try:
+    import rumps
+except ImportError:  # Not on macOS: only the text content is available
+    rumps = None
+
 from ..models.weather_data import CompleteWeatherData, DailyForecast, HourlyForecast
 from ..models.settings import Settings
 from .icons import get_icon, get_description
 from ..utils.formatters import (
     format_temp, format_wind, format_time, format_hour,
     format_pressure, format_visibility, format_uv_index,
-    format_day_name, format_percent
+    format_day_name, format_percent, format_temp_band
 )
 
 
@@ -48,7 +57,28 @@ class MenuBuilder:
         temp = format_temp(weather.current.temperature, settings.use_fahrenheit, include_unit=False)
         return f"{icon} {temp}"
 
-    def build_menu(self, weather: Optional[CompleteWeatherData], settings: Settings) -> List[rumps.MenuItem]:
+    def build_lines(self, weather: Optional[CompleteWeatherData], settings: Settings) -> List[Optional[str]]:
+        """
+        Text of the weather part of the menu for the current mode.
+
+        Args:
+            weather: Current weather data (or None if not available)
+            settings: Current settings
+
+        Returns:
+            One string per menu item, None for a separator
+        """
+        if weather is None:
+            return ["Loading weather data..."]
+        if settings.is_full_mode:
+            return self._full_lines(weather, settings)
+        return self._essential_lines(weather, settings)
+
+    @staticmethod
+    def _items(lines: List[Optional[str]]) -> List['rumps.MenuItem']:
+        return [rumps.separator if line is None else rumps.MenuItem(line) for line in lines]
+
+    def build_menu(self, weather: Optional[CompleteWeatherData], settings: Settings) -> List['rumps.MenuItem']:
         """
         Build complete menu based on current mode.
 
@@ -59,15 +89,9 @@ class MenuBuilder:
         Returns:
             List of menu items
         """
-        items = []
-
+        items = self._items(self.build_lines(weather, settings))
         if weather is None:
-            items.append(rumps.MenuItem("Loading weather data..."))
             items.append(rumps.separator)
-        elif settings.is_full_mode:
-            items.extend(self._build_full_menu(weather, settings))
-        else:
-            items.extend(self._build_essential_menu(weather, settings))
 
         # Settings submenu
         items.append(rumps.separator)
@@ -84,96 +108,98 @@ class MenuBuilder:
 
         return items
 
-    def _build_essential_menu(self, weather: CompleteWeatherData, settings: Settings) -> List[rumps.MenuItem]:
-        """Build essential mode menu items."""
+    def _essential_lines(self, weather: CompleteWeatherData, settings: Settings) -> List[Optional[str]]:
+        """Essential mode menu text."""
         items = []
 
         # Location header
-        items.append(rumps.MenuItem(f"\U0001F4CD {weather.location_name}"))
-        items.append(rumps.separator)
+        items.append(f"\U0001F4CD {weather.location_name}")
+        items.append(None)
 
         # Current conditions
         icon = get_icon(weather.current.weather_code, weather.current.is_day)
         desc = get_description(weather.current.weather_code)
         temp = format_temp(weather.current.temperature, settings.use_fahrenheit)
-        items.append(rumps.MenuItem(f"{icon}  {temp} - {desc}"))
+        items.append(f"{icon}  {temp} - {desc}")
 
         # Humidity and High/Low
         today = weather.today
         if today:
             high = format_temp(today.temp_high, settings.use_fahrenheit, include_unit=False)
             low = format_temp(today.temp_low, settings.use_fahrenheit, include_unit=False)
-            items.append(rumps.MenuItem(f"\U0001F4A7 {weather.current.humidity}%  |  High: {high}  |  Low: {low}"))
+            items.append(f"\U0001F4A7 {weather.current.humidity}%  |  High: {high}  |  Low: {low}")
 
         # 3-day forecast
-        items.append(rumps.separator)
-        items.append(rumps.MenuItem("\u2014 3-Day Forecast \u2014"))
+        items.append(None)
+        items.append("\u2014 3-Day Forecast \u2014")
 
         for day in weather.daily[:3]:
             day_str = format_day_name(day.date)
             icon = get_icon(day.weather_code)
             high = format_temp(day.temp_high, settings.use_fahrenheit, include_unit=False)
             low = format_temp(day.temp_low, settings.use_fahrenheit, include_unit=False)
-            items.append(rumps.MenuItem(f"  {day_str:8} {icon}  {high}/{low}"))
+            items.append(f"  {day_str:8} {icon}  {high}/{low}")
 
         return items
 
-    def _build_full_menu(self, weather: CompleteWeatherData, settings: Settings) -> List[rumps.MenuItem]:
-        """Build full mode menu items."""
+    def _full_lines(self, weather: CompleteWeatherData, settings: Settings) -> List[Optional[str]]:
+        """Full mode menu text."""
         items = []
         use_f = settings.use_fahrenheit
 
         # Location header
-        items.append(rumps.MenuItem(f"\U0001F4CD {weather.location_name}"))
-        items.append(rumps.separator)
+        items.append(f"\U0001F4CD {weather.location_name}")
+        items.append(None)
 
         # Current Conditions section
-        items.append(rumps.MenuItem("\u2014 Current Conditions \u2014"))
+        items.append("\u2014 Current Conditions \u2014")
 
         icon = get_icon(weather.current.weather_code, weather.current.is_day)
         desc = get_description(weather.current.weather_code)
         temp = format_temp(weather.current.temperature, use_f)
         feels = format_temp(weather.current.feels_like, use_f)
-        items.append(rumps.MenuItem(f"  {icon}  {temp} ({desc})"))
-        items.append(rumps.MenuItem(f"  Feels like {feels}"))
-        items.append(rumps.MenuItem(f"  \U0001F4A7 Humidity: {weather.current.humidity}%"))
-        items.append(rumps.MenuItem(f"  \U0001F4A8 Wind: {format_wind(weather.current.wind_speed, weather.current.wind_direction, use_f)}"))
-        items.append(rumps.MenuItem(f"  \U0001F4CA Pressure: {format_pressure(weather.current.pressure)}"))
-        items.append(rumps.MenuItem(f"  \U0001F441 Visibility: {format_visibility(weather.current.visibility, use_f)}"))
-        items.append(rumps.MenuItem(f"  \u2600\ufe0f UV Index: {format_uv_index(weather.current.uv_index)}"))
+        items.append(f"  {icon}  {temp} ({desc})")
+        items.append(f"  Feels like {feels}")
+        items.append(f"  \U0001F4A7 Humidity: {weather.current.humidity}%")
+        items.append(f"  \U0001F4A8 Wind: {format_wind(weather.current.wind_speed, weather.current.wind_direction, use_f)}")
+        items.append(f"  \U0001F4CA Pressure: {format_pressure(weather.current.pressure)}")
+        items.append(f"  \U0001F441 Visibility: {format_visibility(weather.current.visibility, use_f)}")
+        items.append(f"  \u2600\ufe0f UV Index: {format_uv_index(weather.current.uv_index)}")
 
         # Sun section
         today = weather.today
         if today:
-            items.append(rumps.separator)
-            items.append(rumps.MenuItem("\u2014 Sun \u2014"))
-            items.append(rumps.MenuItem(f"  \U0001F305 Sunrise: {format_time(today.sunrise)}"))
-            items.append(rumps.MenuItem(f"  \U0001F307 Sunset: {format_time(today.sunset)}"))
+            items.append(None)
+            items.append("\u2014 Sun \u2014")
+            items.append(f"  \U0001F305 Sunrise: {format_time(today.sunrise)}")
+            items.append(f"  \U0001F307 Sunset: {format_time(today.sunset)}")
 
         # Hourly forecast section (next 6 hours)
-        items.append(rumps.separator)
-        items.append(rumps.MenuItem("\u2014 Hourly Forecast \u2014"))
+        items.append(None)
+        items.append("\u2014 Hourly Forecast \u2014")
         for hour in weather.hourly[:6]:
             hour_str = format_hour(hour.time)
             icon = get_icon(hour.weather_code)
             temp = format_temp(hour.temperature, use_f, include_unit=False)
+            band = weather.ensemble.band_at(hour.time) if weather.ensemble else None
+            spread = f" ({format_temp_band(*band)})" if band else ""
             precip = f" {format_percent(hour.precipitation_probability)}" if hour.precipitation_probability > 0 else ""
-            items.append(rumps.MenuItem(f"  {hour_str:8} {icon}  {temp}{precip}"))
+            items.append(f"  {hour_str:8} {icon}  {temp}{spread}{precip}")
 
         # Daily forecast section
-        items.append(rumps.separator)
-        items.append(rumps.MenuItem("\u2014 7-Day Forecast \u2014"))
+        items.append(None)
+        items.append("\u2014 7-Day Forecast \u2014")
         for day in weather.daily:
             day_str = format_day_name(day.date)
             icon = get_icon(day.weather_code)
             high = format_temp(day.temp_high, use_f, include_unit=False)
             low = format_temp(day.temp_low, use_f, include_unit=False)
             precip = f" \U0001F4A7{day.precipitation_probability}%" if day.precipitation_probability > 10 else ""
-            items.append(rumps.MenuItem(f"  {day_str:8} {icon}  {high}/{low}{precip}"))
+            items.append(f"  {day_str:8} {icon}  {high}/{low}{precip}")
 
         return items
 
-    def _build_settings_menu(self, settings: Settings) -> rumps.MenuItem:
+    def _build_settings_menu(self, settings: Settings) -> 'rumps.MenuItem':
         """Build settings submenu."""
         settings_menu = rumps.MenuItem("\u2699\ufe0f Settings")
 
@@ -245,7 +271,7 @@ class MenuBuilder:
 
         return settings_menu
 
-    def build_error_menu(self, error_message: str, settings: Settings) -> List[rumps.MenuItem]:
+    def build_error_menu(self, error_message: str, settings: Settings) -> List['rumps.MenuItem']:
         """Build menu when weather data is unavailable."""
         items = []
         items.append(rumps.MenuItem("\u26a0\ufe0f Weather Unavailable"))
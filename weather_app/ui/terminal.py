@@ -0,0 +1,417 @@
+"""Terminal front-end: a one-line ticker or a full-screen panel.
+
+For Linux boxes and tmux panes, where the rumps menu is not available. The
+text comes from ``MenuBuilder`` (``build_menu_title`` and ``build_lines``),
+and the data from ``WeatherService`` through an ``UpdateExecutor``, exactly
+as in the menu-bar app.
+
+The main thread sleeps in one ``select`` call. Its timeout is the time left
+until the next refresh. It wakes early only for a byte on the wake pipe,
+which carries finished updates from the worker and signals such as
+SIGWINCH, or for a key press in the panel. Nothing ticks in between, so an
+idle ticker costs no CPU. Frames are compared cell by cell with the
+previous one and only the changed runs are rewritten.
+"""
+
+import logging
+import os
+import selectors
+import shutil
+import signal
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from typing import IO, Callable, Deque, List, Optional, Tuple
+
+from ..models.weather_data import CompleteWeatherData
+from ..models.settings import Settings
+from ..services.settings_service import SettingsService
+from ..services.update_executor import CancelToken, UpdateExecutor
+from ..services.weather_service import WeatherService
+from ..utils.formatters import format_percent, format_temp, format_time
+from .menu_builder import MenuBuilder
+
+logger = logging.getLogger(__name__)
+
+LAYOUTS = ("line", "panel")
+
+# Characters that take no cell of their own
+_ZERO_WIDTH = {"\u200d", "\ufe0e", "\ufe0f"}
+
+_HIDE_CURSOR, _SHOW_CURSOR = "\x1b[?25l", "\x1b[?25h"
+_ALT_SCREEN_ON, _ALT_SCREEN_OFF = "\x1b[?1049h", "\x1b[?1049l"
+_CLEAR_SCREEN, _CLEAR_EOL = "\x1b[2J", "\x1b[K"
+
+PANEL_KEYS = "q quit · r refresh · u units · m mode"
+
+# (row, column, text, clear to end of line)
+Op = Tuple[int, int, str, bool]
+
+
+def cells(text: str) -> List[str]:
+    """
+    Split text into terminal cells.
+
+    Wide characters take two cells, the second one empty. Zero-width
+    characters (variation selectors, joiners, combining marks) stay with
+    the cell before them.
+    """
+    out: List[str] = []
+    for ch in text:
+        if ch in _ZERO_WIDTH or unicodedata.combining(ch):
+            if out:
+                out[-2 if out[-1] == "" and len(out) > 1 else -1] += ch
+            continue
+        out.append(ch)
+        if unicodedata.east_asian_width(ch) in ("W", "F"):
+            out.append("")
+    return out
+
+
+def _fit(row: List[str], width: int) -> List[str]:
+    """Clip a row of cells to the width without splitting a wide character."""
+    if len(row) <= width:
+        return row
+    if row[width] == "":
+        return row[:width - 1] + [" "]
+    return row[:width]
+
+
+def _uncertain(cell: str) -> bool:
+    # Terminals disagree on the width of sequences such as "☀️"
+    return len(cell) > 1
+
+
+class ScreenDiff:
+    """The last frame drawn, and the writes that turn it into the next one."""
+
+    def __init__(self, width: int):
+        self.width = max(1, width)
+        self._rows: List[List[str]] = []
+
+    def invalidate(self, width: Optional[int] = None):
+        """Forget the frame (after a resize or clearing the screen)."""
+        if width is not None:
+            self.width = max(1, width)
+        self._rows = []
+
+    def update(self, rows: List[str]) -> List[Op]:
+        """
+        Record a new frame.
+
+        Returns:
+            The runs of cells that changed, as (row, column, text, clear)
+        """
+        new = [_fit(cells(row), self.width) for row in rows]
+        ops = []
+        for i in range(max(len(new), len(self._rows))):
+            row = new[i] if i < len(new) else []
+            old = self._rows[i] if i < len(self._rows) else None
+            if row == old:
+                continue
+            if old is None:
+                if row:  # Rows not drawn yet are blank
+                    ops.append((i, 0, "".join(row), False))
+                continue
+            start = 0
+            while start < min(len(row), len(old)) and row[start] == old[start]:
+                start += 1
+            for k in range(start):
+                if _uncertain(row[k]):
+                    start = k  # The cursor column after such a cell is a guess
+                    break
+            while start > 0 and start < len(row) and row[start] == "":
+                start -= 1  # Never start on the second half of a wide character
+            end, clear = len(row), len(row) < len(old)
+            if len(row) == len(old) and not any(_uncertain(c) for c in row[start:] + old[start:]):
+                while end > start and row[end - 1] == old[end - 1]:
+                    end -= 1
+                while end < len(row) and row[end] == "":
+                    end += 1
+            ops.append((i, start, "".join(row[start:end]), clear))
+        self._rows = new
+        return ops
+
+
+class TerminalFrontend:
+    """Shows the forecast in a terminal until interrupted."""
+
+    def __init__(self, service: WeatherService, settings_service: SettingsService,
+                 layout: str = "panel", interval: Optional[float] = None,
+                 output: IO[str] = sys.stdout, keys: IO[str] = sys.stdin):
+        """
+        Initialize the front-end.
+
+        Args:
+            service: Source of the forecast
+            settings_service: Units, display mode and update interval
+            layout: "line" for a one-line ticker, "panel" for a full screen
+            interval: Seconds between refreshes (default: the settings'
+                update interval)
+            output: Terminal to draw on
+            keys: Terminal to read key presses from (panel only)
+
+        Raises:
+            ValueError: If the layout is unknown, or the panel is asked for
+                without a terminal
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}' (expected one of {', '.join(LAYOUTS)})")
+        self.tty = output.isatty()
+        if layout == "panel" and not (self.tty and keys.isatty()):
+            raise ValueError("The panel needs a terminal; use the line layout for pipes")
+        self.service = service
+        self.settings_service = settings_service
+        self.layout = layout
+        self.interval = interval
+        self.output = output
+        self.keys = keys
+        self.builder = MenuBuilder({})
+        self._settings = settings_service.load()
+        self._weather: Optional[CompleteWeatherData] = None
+        self._status = "Loading..."
+        self._executor = UpdateExecutor(dispatch=self._post, name="terminal-update")
+        self._posted: Deque[Callable[[], None]] = deque()
+        self._wake_r, self._wake_w = os.pipe()
+        for fd in (self._wake_r, self._wake_w):
+            os.set_blocking(fd, False)
+        self._screen = ScreenDiff(self._size()[0])
+        self._resized = False
+        self._running = False
+        self._last_line: Optional[str] = None
+
+    def run(self):
+        """Draw and refresh until q, Ctrl-C or SIGTERM."""
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        if self.layout == "panel":
+            selector.register(self.keys.fileno(), selectors.EVENT_READ, "keys")
+        restore_signals = self._install_signals()
+        restore_terminal = self._enter_terminal()
+        self._running = True
+        try:
+            self._draw()
+            self._submit_update()
+            next_refresh = time.monotonic() + self._interval()
+            while self._running:
+                timeout = max(0.0, next_refresh - time.monotonic())
+                for key, _ in selector.select(timeout):
+                    if key.data == "wake":
+                        self._drain_wake()
+                    else:
+                        self._on_keys(os.read(key.fd, 64).decode(errors="ignore"))
+                while self._posted:
+                    self._posted.popleft()()
+                if self._resized:
+                    self._resized = False
+                    self._resize()
+                if time.monotonic() >= next_refresh:
+                    self._submit_update()
+                    next_refresh = time.monotonic() + self._interval()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._running = False
+            self._executor.shutdown()
+            restore_terminal()
+            restore_signals()
+            selector.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def stop(self):
+        """Leave ``run`` (any thread)."""
+        self._post(self._stop)
+
+    def _stop(self):
+        self._running = False
+
+    def _post(self, fn: Callable[[], None]):
+        """Run a callable on the main thread (any thread)."""
+        self._posted.append(fn)
+        self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Pipe full (already readable) or closed
+
+    def _drain_wake(self):
+        try:
+            while os.read(self._wake_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _install_signals(self) -> Callable[[], None]:
+        """Wake the loop for resizes and stop it on SIGTERM (main thread only)."""
+        if threading.current_thread() is not threading.main_thread():
+            return lambda: None
+        previous = {}
+
+        def on_resize(signum, frame):
+            self._resized = True
+
+        def on_term(signum, frame):
+            self._running = False
+
+        for name, handler in (("SIGWINCH", on_resize), ("SIGTERM", on_term)):
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                previous[signum] = signal.signal(signum, handler)
+        # Handlers only run once select returns; the wakeup byte makes it return
+        previous_fd = signal.set_wakeup_fd(self._wake_w)
+
+        def restore():
+            signal.set_wakeup_fd(previous_fd)
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        return restore
+
+    def _enter_terminal(self) -> Callable[[], None]:
+        """Set up the terminal for the layout; returns the undo."""
+        if not self.tty:
+            return lambda: None
+        if self.layout == "line":
+            self._write(_HIDE_CURSOR)
+            return lambda: self._write(_SHOW_CURSOR + "\n")
+
+        import termios
+        import tty
+        fd = self.keys.fileno()
+        attributes = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        self._write(_ALT_SCREEN_ON + _HIDE_CURSOR + _CLEAR_SCREEN)
+
+        def restore():
+            self._write(_SHOW_CURSOR + _ALT_SCREEN_OFF)
+            termios.tcsetattr(fd, termios.TCSADRAIN, attributes)
+        return restore
+
+    def _interval(self) -> float:
+        return self.interval or self._settings.update_interval_minutes * 60
+
+    def _submit_update(self):
+        self._executor.submit(self._do_update, on_result=self._apply_update, on_error=self._update_failed)
+
+    def _do_update(self, token: CancelToken) -> Tuple[CompleteWeatherData, Settings]:
+        """Fetch the forecast (worker thread)."""
+        weather = self.service.get_weather(on_update=self._details_arrived)
+        token.check()
+        return weather, self.settings_service.load()
+
+    def _apply_update(self, result: Tuple[CompleteWeatherData, Settings]):
+        self._weather, self._settings = result
+        self._status = f"Updated {format_time(self._weather.fetched_at)}"
+        self._draw()
+
+    def _details_arrived(self, shown: CompleteWeatherData, merged: CompleteWeatherData):
+        """Late model spread or air quality (details thread)."""
+        def apply():
+            if self._weather is shown:
+                self._weather = merged
+                self._draw()
+        self._post(apply)
+
+    def _update_failed(self, error: Exception):
+        logger.error("Weather update failed: %s", error)
+        self._status = f"⚠️ {error}"
+        self._draw()
+
+    def _on_keys(self, keys: str):
+        for key in keys.lower():
+            if key == "q":
+                self._running = False
+            elif key == "r":
+                self._status = "Refreshing..."
+                self._draw()
+                self._submit_update()
+            elif key == "u":
+                unit = "celsius" if self._settings.use_fahrenheit else "fahrenheit"
+                self._settings = self.settings_service.update(temperature_unit=unit)
+                self._status = "Loading..."
+                self._draw()
+                self._submit_update()  # Forecasts are fetched in the display units
+            elif key == "m":
+                mode = "essential" if self._settings.is_full_mode else "full"
+                self._settings = self.settings_service.update(display_mode=mode)
+                self._draw()
+
+    def _size(self) -> Tuple[int, int]:
+        size = shutil.get_terminal_size()
+        return size.columns, size.lines
+
+    def _resize(self):
+        self._screen.invalidate(self._size()[0])
+        if self.tty:
+            self._write(_CLEAR_SCREEN if self.layout == "panel" else "\r" + _CLEAR_EOL)
+        self._draw()
+
+    def compose_line(self) -> str:
+        """The one-line ticker."""
+        w, s = self._weather, self._settings
+        if w is None:
+            return f"WeatherBar  {self._status}"
+        parts = [self.builder.build_menu_title(w, s), w.location_name]
+        today = w.today
+        if today:
+            high = format_temp(today.temp_high, s.use_fahrenheit, include_unit=False)
+            low = format_temp(today.temp_low, s.use_fahrenheit, include_unit=False)
+            parts.append(f"H {high} L {low}")
+            if today.precipitation_probability:
+                parts.append(f"\U0001F4A7{format_percent(today.precipitation_probability)}")
+        if self._status.startswith("⚠"):
+            parts.append(self._status)
+        return "  ".join(parts)
+
+    def compose_panel(self, width: int, height: int) -> List[str]:
+        """Every row of the full-screen panel."""
+        w, s = self._weather, self._settings
+        rows = [f" {self.builder.build_menu_title(w, s)}" if w else " WeatherBar", ""]
+        for line in self.builder.build_lines(w, s):
+            rows.append("─" * width if line is None else f" {line}")
+        body = max(0, height - 1)
+        rows = rows[:body] + [""] * (body - len(rows))
+        footer = f" {self._status}"
+        gap = width - len(cells(footer)) - len(PANEL_KEYS) - 1
+        rows.append(footer + " " * gap + PANEL_KEYS if gap >= 2 else footer)
+        return rows
+
+    def _draw(self):
+        """Write what changed since the last frame (main thread)."""
+        if self.layout == "line":
+            line = self.compose_line()
+            if not self.tty:
+                # Pipes get one line per change, nothing else
+                if line != self._last_line:
+                    self._last_line = line
+                    self._write(line + "\n")
+                return
+            ops = self._screen.update([line])
+            self._write("".join(
+                "\r" + (f"\x1b[{col}C" if col else "") + text + (_CLEAR_EOL if clear else "")
+                for _, col, text, clear in ops
+            ))
+            return
+        width, height = self._size()
+        ops = self._screen.update(self.compose_panel(width, height))
+        self._write("".join(
+            f"\x1b[{row + 1};{col + 1}H{text}" + (_CLEAR_EOL if clear else "")
+            for row, col, text, clear in ops
+        ))
+
+    def _write(self, text: str):
+        if text:
+            self.output.write(text)
+            self.output.flush()
+
+
+def run(layout: str = "panel", interval: Optional[float] = None):
+    """Run the terminal front-end on the user's settings."""
+    settings_service = SettingsService()
+    frontend = TerminalFrontend(WeatherService(settings_service), settings_service,
+                                layout=layout, interval=interval)
+    frontend.run()
@@ -1,9 +1,13 @@
-from .logger import setup_logging, get_logger
+from .logger import setup_logging, shutdown_logging, get_logger
+from .metrics import REGISTRY, start_exporter
 from .formatters import format_temp, format_wind, format_time, format_pressure, format_visibility
 
 __all__ = [
     'setup_logging',
+    'shutdown_logging',
     'get_logger',
+    'REGISTRY',
+    'start_exporter',
     'format_temp',
     'format_wind',
     'format_time',
@@ -0,0 +1,148 @@
+"""Vectorized aggregation of multi-model and ensemble forecasts.
+
+A multi-model or ensemble response carries one series per member for each
+variable (``temperature_2m_gfs_seamless``, ``temperature_2m_member07``,
+...). ``stack_members`` turns those into one ``members x steps`` array, and
+``summarize`` reduces it along the member axis, so percentiles, spread and
+agreement cost a handful of NumPy calls whatever the member count. Only the
+reduced rows become Python values.
+
+Needs the optional ``numpy`` package; without it ``load_numpy`` returns
+None and callers skip the ensemble.
+"""
+
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from ..models.ensemble import EnsembleSummary
+
+TEMPERATURE_TOLERANCE = {True: 3.6, False: 2.0}  # Degrees from the median that count as agreeing (F, C)
+WET_THRESHOLD = {True: 0.004, False: 0.1}  # Measurable precipitation per hour (in, mm)
+
+_numpy = None
+_loaded = False
+
+
+def load_numpy():
+    """numpy, or None if it is not installed."""
+    global _numpy, _loaded
+    if not _loaded:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+        _loaded = True
+    return _numpy
+
+
+def member_keys(section: Dict[str, Sequence], variable: str) -> List[str]:
+    """
+    Keys of every member series of a variable, in response order.
+
+    A single model answers with the plain name; several models or ensemble
+    members add a suffix (``_<model>``, ``_memberNN``, or both).
+    """
+    prefix = variable + "_"
+    return [key for key in section if key == variable or key.startswith(prefix)]
+
+
+def stack_members(section: Dict[str, Sequence], variable: str):
+    """
+    Member series of a variable as a float64 ``members x steps`` array.
+
+    Missing values (JSON null) become NaN. Returns None if the section has
+    no series for the variable.
+    """
+    np = load_numpy()
+    keys = member_keys(section, variable)
+    if not keys:
+        return None
+    return np.array([section[key] for key in keys], dtype=np.float64)
+
+
+def _rows(values, digits: int = 1) -> List[Optional[float]]:
+    """Python floats for a 1-D array, NaN as None."""
+    return [None if v != v else v for v in values.round(digits).tolist()]
+
+
+def summarize(hourly: Dict[str, Sequence], source: str, use_fahrenheit: bool,
+              now: Optional[datetime] = None, hours: int = 24,
+              window_hours: int = 6) -> Optional[EnsembleSummary]:
+    """
+    Reduce the member series of an hourly section to an EnsembleSummary.
+
+    Args:
+        hourly: Hourly section with ``time``, ``temperature_2m*`` and
+            ``precipitation*`` series
+        source: Description of the models, stored on the summary
+        use_fahrenheit: Units of the response (sets the agreement
+            tolerance and the wet threshold)
+        now: Steps before the current hour are dropped
+        hours: Steps kept from now on
+        window_hours: Steps covered by the precipitation window totals
+
+    Returns:
+        The summary, or None if numpy is missing or the section is empty
+    """
+    np = load_numpy()
+    if np is None or hourly.get("time") is None or not len(hourly["time"]):
+        return None
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    times = np.array(hourly["time"], dtype="datetime64[m]")
+    first = int(times.searchsorted(np.datetime64(now, "m")))
+    steps = slice(first, first + hours)
+    times = times[steps]
+
+    temperature = stack_members(hourly, "temperature_2m")
+    precipitation = stack_members(hourly, "precipitation")
+    if temperature is None or precipitation is None or not len(times):
+        return None
+    temperature, precipitation = temperature[:, steps], precipitation[:, steps]
+
+    with warnings.catch_warnings():
+        # All-NaN steps (e.g. past a model's horizon) reduce to NaN quietly
+        warnings.simplefilter("ignore", RuntimeWarning)
+        t10, t50, t90 = np.nanpercentile(temperature, [10, 50, 90], axis=0)
+        spread = np.nanstd(temperature, axis=0)
+        valid = ~np.isnan(temperature)
+        near = (np.abs(temperature - t50) <= TEMPERATURE_TOLERANCE[use_fahrenheit]) & valid
+        t_agreement = near.sum(axis=0) / valid.sum(axis=0)
+
+        p10, p90 = np.nanpercentile(precipitation, [10, 90], axis=0)
+        valid = ~np.isnan(precipitation)
+        wet = (precipitation >= WET_THRESHOLD[use_fahrenheit]) & valid
+        wet_share = wet.sum(axis=0) / valid.sum(axis=0)
+        p_agreement = np.maximum(wet_share, 1 - wet_share)
+
+        totals = np.nansum(precipitation[:, :window_hours], axis=1)
+        total_p10, total_p90 = np.percentile(totals, [10, 90])
+        wet_members = int((totals >= WET_THRESHOLD[use_fahrenheit]).sum())
+
+    digits = 2 if use_fahrenheit else 1
+    return EnsembleSummary(
+        source=source,
+        members=int(temperature.shape[0]),
+        time=times.astype("datetime64[s]").astype(datetime).tolist(),
+        temperature_p10=_rows(t10),
+        temperature_p50=_rows(t50),
+        temperature_p90=_rows(t90),
+        temperature_spread=_rows(spread),
+        temperature_agreement=_rows(t_agreement, 2),
+        precipitation_p10=_rows(p10, digits + 1),
+        precipitation_p90=_rows(p90, digits + 1),
+        precipitation_probability=[None if v is None else int(round(v * 100))
+                                   for v in _rows(wet_share, 2)],
+        precipitation_agreement=_rows(p_agreement, 2),
+        window_hours=window_hours,
+        window_wet_members=wet_members,
+        window_total_p10=round(float(total_p10), digits + 1),
+        window_total_p90=round(float(total_p90), digits + 1),
+    )
+
+
+def source_label(models: Sequence[str], ensemble: bool) -> str:
+    """Value of EnsembleSummary.source for a request."""
+    return ("ensemble:" if ensemble else "") + ",".join(models)
+
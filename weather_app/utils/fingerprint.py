@@ -0,0 +1,105 @@
+"""Content fingerprints for skipping work on unchanged responses.
+
+A fingerprint remembers a source's HTTP validators (``ETag`` and
+``Last-Modified``) and a digest of the bytes that matter. Callers send the
+validators as conditional headers and compare digests; when nothing changed
+they reuse their previous result and skip parsing, model construction and
+UI updates. Every skip is counted per source, when the caller reports it
+(a 304, or ``commit(..., skipped=True)``).
+"""
+
+import hashlib
+import threading
+from typing import Dict, Mapping, Optional
+
+from .metrics import counter
+
+UNCHANGED_SKIPS = counter(
+    "weatherbar_unchanged_skips_total",
+    "Responses recognised as unchanged, so parsing and rendering were skipped",
+    ["source"],
+)
+CHANGE_CHECKS = counter(
+    "weatherbar_change_checks_total",
+    "Fingerprint comparisons by source and result (changed, unchanged, not_modified)",
+    ["source", "result"],
+)
+
+
+def digest(*parts: bytes) -> str:
+    """Short, fast digest of one or more byte strings."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.hexdigest()
+
+
+class ContentFingerprint:
+    """Validators and content digest for one source."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.digest: Optional[str] = None
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def not_modified(self):
+        """Record a 304 response."""
+        CHANGE_CHECKS.inc(source=self.source, result="not_modified")
+        self._skip()
+
+    def changed(self, new_digest: str) -> bool:
+        """
+        Compare a new digest with the stored one, without remembering it.
+
+        Callers commit() the digest once the content has been parsed, so a
+        response that fails to parse is not mistaken for unchanged next time,
+        and report there whether they skipped parsing.
+
+        Returns:
+            True if the content changed (or was never seen)
+        """
+        with self._lock:
+            changed = new_digest != self.digest
+        CHANGE_CHECKS.inc(source=self.source, result="changed" if changed else "unchanged")
+        return changed
+
+    def commit(self, new_digest: str, headers: Optional[Mapping[str, str]] = None,
+               skipped: bool = False):
+        """
+        Remember a digest, and the validators from its response headers.
+
+        Args:
+            new_digest: Digest of the content the caller now holds
+            headers: Response headers to take validators from
+            skipped: The caller reused its previous result instead of parsing
+        """
+        with self._lock:
+            if headers is not None:
+                self.etag = headers.get("ETag") or self.etag
+                self.last_modified = headers.get("Last-Modified") or self.last_modified
+            self.digest = new_digest
+        if skipped:
+            self._skip()
+
+    def _skip(self):
+        with self._lock:
+            self.skipped += 1
+        UNCHANGED_SKIPS.inc(source=self.source)
+
+    def reset(self):
+        """Forget validators and digest so the next response counts as changed."""
+        with self._lock:
+            self.etag = self.last_modified = self.digest = None
+
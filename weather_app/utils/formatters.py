@@ -1,6 +1,7 @@
 """Formatting utilities for weather data display."""
 
 from datetime import datetime
+from typing import List, Optional
 
 
 def format_temp(temp: float, use_fahrenheit: bool = True, include_unit: bool = True) -> str:
@@ -22,6 +23,23 @@ def format_temp(temp: float, use_fahrenheit: bool = True, include_unit: bool = T
     return f"{temp_rounded}\u00b0"
 
 
+def format_temp_band(low: float, high: float) -> str:
+    """
+    Format a temperature range for display.
+
+    Args:
+        low: Lower bound
+        high: Upper bound
+
+    Returns:
+        Formatted range (e.g., "61–74°"), or a single value if both round alike
+    """
+    low, high = round(low), round(high)
+    if low == high:
+        return f"{low}\u00b0"
+    return f"{low}\u2013{high}\u00b0"
+
+
 def format_wind(speed: float, direction: int, use_mph: bool = True) -> str:
     """
     Format wind speed and direction for display.
@@ -179,3 +197,55 @@ def format_percent(value: int) -> str:
         Formatted percentage string
     """
     return f"{value}%"
+
+
+# Upper bound of each US EPA AQI category
+AQI_CATEGORIES = [
+    (50, "Good"),
+    (100, "Moderate"),
+    (150, "Unhealthy for sensitive groups"),
+    (200, "Unhealthy"),
+    (300, "Very unhealthy"),
+]
+
+
+def format_aqi(aqi: float) -> str:
+    """
+    Format a US AQI value with its category.
+
+    Args:
+        aqi: US air quality index
+
+    Returns:
+        Formatted string (e.g., "42 Good")
+    """
+    for upper, label in AQI_CATEGORIES:
+        if aqi <= upper:
+            return f"{round(aqi)} {label}"
+    return f"{round(aqi)} Hazardous"
+
+
+SPARK_LEVELS = "▁▂▃▄▅▆▇█"
+
+
+def format_precip_strip(values: List[Optional[float]], use_inches: bool = True) -> str:
+    """
+    Format a run of precipitation amounts as a sparkline.
+
+    Args:
+        values: Precipitation per step (None where unknown)
+        use_inches: If True, values are inches; otherwise millimetres
+
+    Returns:
+        Sparkline string (e.g., "▁▁▃▅▇▅▂▁"), "·" marking unknown steps
+    """
+    # Scaled against heavy rain over 15 minutes so light showers stay low
+    heavy = 0.1 if use_inches else 2.5
+    chars = []
+    for value in values:
+        if value is None:
+            chars.append("·")
+            continue
+        level = min(value / heavy, 1.0) * (len(SPARK_LEVELS) - 1)
+        chars.append(SPARK_LEVELS[int(round(level))])
+    return "".join(chars)
@@ -0,0 +1,76 @@
+"""Length-prefixed JSON framing for the local socket protocol.
+
+Each frame is a 4-byte big-endian payload length followed by that many
+bytes of UTF-8 JSON. Frames larger than ``MAX_FRAME_BYTES`` (or the limit
+passed by the caller) are refused before anything is allocated for them.
+"""
+
+import json
+import socket
+import struct
+from typing import Any, Optional
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 1 << 20
+
+
+def encode_frame(message: Any, max_bytes: int = MAX_FRAME_BYTES) -> bytes:
+    """Serialize a message into one frame."""
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    if len(payload) > max_bytes:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds {max_bytes}")
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_frame(sock: socket.socket, message: Any, max_bytes: int = MAX_FRAME_BYTES):
+    """Send one message as a frame."""
+    sock.sendall(encode_frame(message, max_bytes))
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            if received == 0:
+                return None
+            raise FrameError("Connection closed mid-frame")
+        received += n
+    return bytes(buf)
+
+
+def recv_frame(sock: socket.socket, max_bytes: int = MAX_FRAME_BYTES) -> Optional[Any]:
+    """
+    Read one frame.
+
+    Args:
+        sock: Connected socket
+        max_bytes: Largest payload accepted
+
+    Returns:
+        The decoded message, or None if the peer closed the connection
+        cleanly between frames
+
+    Raises:
+        FrameError: If the frame is oversized, truncated or not valid JSON
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > max_bytes:
+        raise FrameError(f"Frame of {length} bytes exceeds {max_bytes}")
+    payload = _recv_exactly(sock, length) if length else b""
+    if payload is None:
+        raise FrameError("Connection closed mid-frame")
+    try:
+        return json.loads(payload)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise FrameError(f"Malformed frame: {e}") from e
+
+
+class FrameError(Exception):
+    """Exception raised when a frame cannot be read or written."""
+    pass
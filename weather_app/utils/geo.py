@@ -0,0 +1,164 @@
+"""Spatial helpers for cache keys.
+
+Open-Meteo answers from model grid cells several kilometres wide, so two
+requests a few hundred metres apart get the same forecast. ``CellGrid``
+snaps coordinates to a degree grid (or a geohash prefix) and
+``SpatialIndex`` finds an existing cached point within a radius, so nearby
+requests share one entry even across cell boundaries.
+"""
+
+import math
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash(latitude: float, longitude: float, precision: int) -> str:
+    """Geohash of a point with ``precision`` characters."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+class CellGrid:
+    """Maps coordinates to cache cells: a degree grid or geohash prefixes."""
+
+    def __init__(self, degrees: float = 0.05, geohash_precision: int = 0):
+        """
+        Initialize the grid.
+
+        Args:
+            degrees: Cell size in degrees; 0 disables snapping
+            geohash_precision: If > 0, use geohash cells of this length instead
+        """
+        self.degrees = max(0.0, degrees)
+        self.geohash_precision = max(0, geohash_precision)
+        if self.geohash_precision:
+            lon_bits = math.ceil(5 * self.geohash_precision / 2)
+            lat_bits = 5 * self.geohash_precision // 2
+            self._cell_lat = 180.0 / (1 << lat_bits)
+            self._cell_lon = 360.0 / (1 << lon_bits)
+        else:
+            self._cell_lat = self._cell_lon = self.degrees
+        # Degree cells around the globe, when they tile it exactly
+        columns = round(360.0 / self.degrees) if self.degrees else 0
+        self._columns = columns if columns and abs(columns * self.degrees - 360.0) < 1e-9 else 0
+
+    @property
+    def cell_km(self) -> float:
+        """Approximate cell height in kilometres."""
+        return self._cell_lat * KM_PER_DEGREE
+
+    def cell(self, latitude: float, longitude: float) -> Hashable:
+        """Cell containing a point."""
+        if self.geohash_precision:
+            return geohash(latitude, longitude, self.geohash_precision)
+        if not self.degrees:
+            return (latitude, longitude)
+        column = round(longitude / self.degrees)
+        if self._columns:
+            # The cells either side of the antimeridian are the same cell
+            column = (column + self._columns // 2) % self._columns - self._columns // 2
+        return (round(latitude / self.degrees), column)
+
+    def neighbourhood(self, latitude: float, longitude: float) -> List[Hashable]:
+        """The cell containing a point and the eight around it."""
+        if not self._cell_lat:
+            return [self.cell(latitude, longitude)]
+        cells = []
+        for dlat in (0, -1, 1):
+            for dlon in (0, -1, 1):
+                lat = max(-90.0, min(90.0, latitude + dlat * self._cell_lat))
+                lon = (longitude + dlon * self._cell_lon + 180.0) % 360.0 - 180.0
+                cell = self.cell(lat, lon)
+                if cell not in cells:
+                    cells.append(cell)
+        return cells
+
+
+class SpatialIndex:
+    """Points bucketed by cell for nearest-within-radius lookups."""
+
+    def __init__(self, grid: CellGrid, radius_km: Optional[float] = None):
+        """
+        Initialize the index.
+
+        Args:
+            grid: Cell layout used for bucketing
+            radius_km: Match radius; defaults to half a cell
+        """
+        self.grid = grid
+        self.radius_km = grid.cell_km / 2 if radius_km is None else radius_km
+        self._cells: Dict[Hashable, Dict[Hashable, Tuple[float, float]]] = {}
+        self._points: Dict[Hashable, Hashable] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def add(self, key: Hashable, latitude: float, longitude: float):
+        """Index a point under a key (replacing any previous point for it)."""
+        cell = self.grid.cell(latitude, longitude)
+        with self._lock:
+            self._discard(key)
+            self._cells.setdefault(cell, {})[key] = (latitude, longitude)
+            self._points[key] = cell
+
+    def remove(self, key: Hashable):
+        """Forget a key."""
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: Hashable):
+        cell = self._points.pop(key, None)
+        if cell is not None:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._cells[cell]
+
+    def point(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Coordinates indexed under a key, if any."""
+        with self._lock:
+            cell = self._points.get(key)
+            return None if cell is None else self._cells[cell][key]
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Hashable]:
+        """Key of the closest indexed point within the radius, if any."""
+        best, best_km = None, self.radius_km
+        with self._lock:
+            for cell in self.grid.neighbourhood(latitude, longitude):
+                for key, (lat, lon) in self._cells.get(cell, {}).items():
+                    km = haversine_km(latitude, longitude, lat, lon)
+                    if km <= best_km:
+                        best, best_km = key, km
+        return best
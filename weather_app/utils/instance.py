@@ -0,0 +1,208 @@
+"""Single-instance lock with state handoff.
+
+The running instance holds an exclusive ``flock`` on a lock file (released
+by the kernel however the process ends, so a crash never leaves a stale
+lock) and listens on a Unix socket next to it. A new instance that cannot
+take the lock asks the running one, over that socket, for its state; the
+old instance replies with its caches and schedule and then quits, and the
+new one takes the lock once it is gone. Only the process recorded in the
+lock file is ever signalled, and only if it does not leave on its own.
+"""
+
+import fcntl
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from .framing import FrameError, recv_frame, send_frame
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_MAX_BYTES = 32 << 20  # Handed-over caches can exceed the default frame limit
+
+
+class InstanceLock:
+    """Exclusive lock file plus the path of the owner's handoff socket."""
+
+    def __init__(self, directory: Path, name: str):
+        """
+        Initialize the lock (not acquired yet).
+
+        Args:
+            directory: Directory holding ``<name>.lock`` and ``<name>.sock``
+            name: Instance name
+        """
+        self.directory = Path(directory)
+        self.lock_path = self.directory / f"{name}.lock"
+        self.socket_path = self.directory / f"{name}.sock"
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """
+        Take the lock, waiting up to ``timeout`` seconds for the owner to exit.
+
+        Returns:
+            True if this process now holds the lock
+        """
+        if self._fd is not None:
+            return True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False
+                time.sleep(0.05)
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Drop the lock (the kernel also drops it when the process exits)."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def owner_pid(self) -> Optional[int]:
+        """Process id recorded by the current owner, if any."""
+        try:
+            return int(self.lock_path.read_text().strip())
+        except (OSError, ValueError):
+            return None
+
+
+class HandoffServer:
+    """Answers a successor's handoff request with this instance's state."""
+
+    def __init__(self, path: Path, export_state: Callable[[], dict],
+                 on_handoff: Callable[[], None]):
+        """
+        Initialize the server.
+
+        Args:
+            path: Socket path to listen on
+            export_state: Returns the JSON-safe state to hand over
+            on_handoff: Called after the state was sent; should shut this
+                instance down
+        """
+        self.path = Path(path)
+        self.export_state = export_state
+        self.on_handoff = on_handoff
+        self._listener: Optional[socket.socket] = None
+
+    def start(self) -> 'HandoffServer':
+        """Bind the socket and serve on a daemon thread."""
+        if self.path.exists():
+            self.path.unlink()  # Left by an instance that did not exit cleanly
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(str(self.path))
+        os.chmod(self.path, 0o600)
+        self._listener.listen(1)
+        threading.Thread(target=self._serve, name="handoff", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def _serve(self):
+        while self._listener is not None:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            with sock:
+                sock.settimeout(10)
+                try:
+                    request = recv_frame(sock)
+                    if not isinstance(request, dict) or request.get("op") != "handoff":
+                        send_frame(sock, {"ok": False, "error": "Unknown request"})
+                        continue
+                    send_frame(sock, {"ok": True, "pid": os.getpid(), "state": self.export_state()},
+                               max_bytes=HANDOFF_MAX_BYTES)
+                except (OSError, FrameError) as e:
+                    logger.warning("Handoff request failed: %s", e)
+                    continue
+            logger.info("State handed over to a new instance; shutting down")
+            self.stop()
+            self.on_handoff()
+            return
+
+
+def request_handoff(path: Path, timeout: float = 10.0) -> Optional[dict]:
+    """
+    Ask the running instance for its state (it shuts down after replying).
+
+    Returns:
+        The handed-over state, or None if no instance answered
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            send_frame(sock, {"op": "handoff"})
+            response = recv_frame(sock, max_bytes=HANDOFF_MAX_BYTES)
+    except (OSError, FrameError) as e:
+        logger.warning("Running instance did not hand over its state: %s", e)
+        return None
+    if not isinstance(response, dict) or not response.get("ok"):
+        return None
+    return response.get("state")
+
+
+def claim_instance(lock: InstanceLock, timeout: float = 10.0) -> Optional[dict]:
+    """
+    Become the only running instance, taking over from any current one.
+
+    Args:
+        lock: The instance lock
+        timeout: Seconds to wait for the previous instance to exit
+
+    Returns:
+        State handed over by the previous instance, or None
+
+    Raises:
+        InstanceError: If the previous instance could not be replaced
+    """
+    if lock.acquire():
+        return None
+
+    state = request_handoff(lock.socket_path, timeout)
+    if lock.acquire(timeout):
+        return state
+
+    pid = lock.owner_pid()
+    if pid is not None and pid != os.getpid():
+        logger.warning("Previous instance (pid %d) did not exit; terminating it", pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError as e:
+            raise InstanceError(f"Cannot stop previous instance {pid}: {e}") from e
+        if lock.acquire(timeout):
+            return state
+    raise InstanceError(f"Another instance holds {lock.lock_path}")
+
+
+class InstanceError(Exception):
+    """Exception raised when the single-instance lock cannot be taken."""
+    pass
@@ -1,19 +1,69 @@
-"""Logging configuration for WeatherBar app."""
+"""Logging configuration for WeatherBar app.
 
+Records are handed to a ``QueueHandler`` on the calling thread and written by
+a ``QueueListener`` thread, so neither the UI thread nor update threads ever
+block on disk. The log file is rotated by size (default) or time.
+"""
+
+import atexit
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
+from typing import Optional
 
 LOG_DIR = Path.home() / "Library" / "Logs" / "WeatherBar"
 LOG_FILE = LOG_DIR / "weather_bar.log"
 
+# Rotation defaults: 1 MB per file, keep 5 old files
+MAX_BYTES = 1_000_000
+BACKUP_COUNT = 5
+
+# Argument types that are safe to format later on the listener thread
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None), BaseException)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
 
-def setup_logging(debug: bool = False):
+    The stock handler merges ``msg % args`` on the calling thread. Here the
+    merge is deferred when every argument is immutable, so the hot path only
+    pays for creating the record and enqueueing it. Tracebacks are still
+    rendered eagerly so the record does not keep frames alive.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE_ARGS) for a in args):
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            return record
+        return super().prepare(record)
+
+
+def setup_logging(debug: bool = False, rotate_when: Optional[str] = None,
+                  max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT,
+                  console: bool = True):
     """
     Configure logging for the application.
 
     Args:
         debug: If True, enable debug level logging
+        rotate_when: Rotate on time instead of size (e.g. "midnight", "H");
+            see logging.handlers.TimedRotatingFileHandler
+        max_bytes: Size at which the log file is rotated (size rotation only)
+        backup_count: Number of rotated files to keep
+        console: Also echo warnings and errors to stderr (off for
+            full-screen front-ends)
+
+    Returns:
+        The started QueueListener
     """
+    global _listener
+
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
     level = logging.DEBUG if debug else logging.INFO
@@ -24,8 +74,15 @@ def setup_logging(debug: bool = False):
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-    # File handler
-    file_handler = logging.FileHandler(LOG_FILE)
+    # Rotating file handler, only ever touched by the listener thread
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when=rotate_when, backupCount=backup_count, delay=True
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
 
@@ -34,16 +91,43 @@ def setup_logging(debug: bool = False):
     console_handler.setLevel(logging.WARNING)
     console_handler.setFormatter(formatter)
 
+    if _listener is not None:
+        shutdown_logging()
+
+    # Unbounded queue: enqueueing never blocks the caller
+    log_queue = queue.SimpleQueue()
+    handlers = (file_handler, console_handler) if console else (file_handler,)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
 
     # Reduce noise from third-party libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("requests").setLevel(logging.WARNING)
 
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logging)
+
 
 def get_logger(name: str) -> logging.Logger:
     """
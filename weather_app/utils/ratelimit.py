@@ -0,0 +1,68 @@
+"""Client-side rate limiting shared by concurrent workers."""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Blocking token bucket.
+
+    Workers call ``acquire`` before each request. When the upstream answers
+    429 with a Retry-After, ``pause`` holds every worker back for that long,
+    not just the one that was refused.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Requests per second; 0 or less disables limiting
+            burst: Requests allowed back to back after an idle period
+        """
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a token.
+
+        Args:
+            timeout: Longest wait in seconds; None waits as long as needed
+
+        Returns:
+            True if a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return True
+                    self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for ``seconds`` from now."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._last = self._paused_until